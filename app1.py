@@ -3,11 +3,38 @@ import os
 import streamlit as st
 import matplotlib.pyplot as plt
 from io import BytesIO
+from contextlib import contextmanager
 import datetime 
 import base64
 import json
 import gspread
-from gspread_dataframe import set_with_dataframe # <--- DIPERLUKAN UNTUK save_data
+from storage import GSheetsBackend, SQLiteBackend, FakeSheetsBackend, VersionConflict, filter_range, merge_rows
+from rules import ceklist_rules, cek_param, KANAL_TV, VERSI_RULES
+from processing import (
+    siapkan_data, siapkan_visualisasi, buat_grafik_parameter, ke_excel,
+    tambah_kolom_turunan, tambah_kolom_turunan_catatan,
+)
+from metrics import mulai_rerun, selesai_rerun, ukur, pasang_hook_api
+from sheets_client import SheetsQuotaClient
+from shared_store import SharedStore
+from disk_cache import DiskSnapshotCache
+from sla import SLAIndex
+from grid_slot import GridSlot
+from peta_bitrate import PetaBitrate
+from prakiraan import PrakiraanDrift
+from korelasi import AMBANG_KORELASI, JAM_PER_SLOT, analisis_korelasi, korelasi_bergulir
+from transisi import IndeksTransisi
+from pencarian import PencarianCatatan
+from kualitas_daya import AnalisisDaya, BATAS_IMBALANCE, BATAS_SAG, BATAS_SWELL, TEGANGAN_NOMINAL
+from sun_outage import jadwal_sun_outage, trouble_saat_outage
+from penilaian_ulang import KOLOM_VERSI, daftarkan_versi, gabung_ringkasan, nilai_ulang, nilai_ulang_arsip
+from arsip import ArsipBackend, PartisiParquet, PartisiSheet, BULAN_AKTIF
+from riwayat import JurnalRiwayat, RiwayatBackend, INTERVAL_CHECKPOINT
+from laporan import daftar_bulan, buat_laporan_bulanan, laporan_ke_excel, laporan_ke_pdf
+from kelengkapan import (
+    SLOT_METERING, SHIFT_CEKLIST, JAM_MULAI_SHIFT, jumlah_slot,
+    slot_hilang_metering, slot_hilang_ceklist, hilang_per_hari, hilang_per_operator,
+)
 
 # ===========================
 # Konfigurasi Halaman (Landscape)
@@ -22,12 +49,27 @@ st.set_page_config(
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
 
+# Mulai rekaman waktu per fase untuk rerun ini (panel admin & log performa)
+mulai_rerun()
+
+# Username yang boleh melihat panel performa
+ADMIN_USERS = {"admin"}
+
 # ===========================
 # Nama Sheet
 # ===========================
 data_sheet = "Sheet1"
 notes_sheet = "CATATAN_HARIAN" 
 
+# ===========================
+# Baca Konfigurasi Opsional dari Secrets
+# ===========================
+def _baca_secrets(bagian):
+    """Membaca satu bagian st.secrets sebagai dict. Kosong jika tidak ada."""
+    if not st.secrets.load_if_toml_exists():
+        return {}
+    return dict(st.secrets.get(bagian, {}))
+
 # ===========================
 # INISIALISASI GSPREAD CLIENT (Menggunakan @st.cache_resource)
 # ===========================
@@ -53,61 +95,191 @@ def get_gspread_client():
     
     # Otorisasi gspread client
     client = gspread.service_account_from_dict(gcp_credentials)
-    return client
+    # Hitung setiap request API Sheets (jumlah & bytes) untuk panel performa
+    pasang_hook_api(client)
+
+    # Satu client per proses untuk semua sesi: batasi kuota, gabungkan baca identik, retry 429/5xx
+    kuota = _baca_secrets("sheets_quota")
+    return SheetsQuotaClient(
+        client,
+        per_minute=int(kuota.get("per_minute", 60)),
+        max_retries=int(kuota.get("max_retries", 5)),
+        backoff_base=float(kuota.get("backoff_base", 1.0)),
+        backoff_max=float(kuota.get("backoff_max", 32.0)),
+    )
     
-# Inisialisasi client dan ambil ID sheet sekali
-gs_client = get_gspread_client()
-spreadsheet_id = st.secrets["connections"]["gsheets"]["spreadsheet_id"]
+# ===========================
+# Pilih Backend Penyimpanan (gsheets / sqlite / fake)
+# ===========================
+@st.cache_resource(ttl=None)
+def get_storage_backend():
+    """Membuat backend penyimpanan sesuai env STORAGE_BACKEND atau [storage] backend di secrets (default: gsheets)."""
+    konfigurasi = _baca_secrets("storage")
+    jenis = os.environ.get("STORAGE_BACKEND", konfigurasi.get("backend", "gsheets"))
+
+    if jenis == "sqlite":
+        backend = SQLiteBackend(os.environ.get("STORAGE_SQLITE_PATH", konfigurasi.get("path", "metering.db")))
+    elif jenis == "fake":
+        # Google Sheets tiruan di memori, untuk test & demo tanpa akun Google
+        backend = FakeSheetsBackend(latency=float(konfigurasi.get("latency", 0.0)))
+    else:
+        backend = GSheetsBackend(get_gspread_client(), st.secrets["connections"]["gsheets"]["spreadsheet_id"])
+
+    # Riwayat versi opsional (env RIWAYAT_DIR atau secrets [riwayat] dir): setiap penulisan metering & catatan
+    # dicatat sebagai delta di folder lokal, isi penuh disimpan setiap [riwayat] checkpoint versi
+    riwayat = _baca_secrets("riwayat")
+    folder_riwayat = os.environ.get("RIWAYAT_DIR", riwayat.get("dir"))
+    if folder_riwayat:
+        jurnal = JurnalRiwayat(folder_riwayat, namespace=backend.key,
+                               interval=int(riwayat.get("checkpoint", INTERVAL_CHECKPOINT)))
+        backend = RiwayatBackend(backend, jurnal, {data_sheet: ["TANGGAL", "WAKTU"], notes_sheet: None})
+
+    # Tiering opsional ([arsip] enabled = true atau env ARSIP_ENABLED=1): Sheet1 hanya berisi periode aktif,
+    # bulan-bulan lama dipindah ke partisi arsip (worksheet "Sheet1_ARSIP_YYYY_MM" atau Parquet lokal)
+    arsip = _baca_secrets("arsip")
+    if str(os.environ.get("ARSIP_ENABLED", arsip.get("enabled", False))).lower() in ("1", "true"):
+        partisi = PartisiParquet(arsip.get("folder", "arsip")) if arsip.get("lokasi") == "parquet" else PartisiSheet(backend)
+        backend = ArsipBackend(backend, partisi, [data_sheet], bulan_aktif=int(arsip.get("bulan_aktif", BULAN_AKTIF)))
+    return backend
+
+# Inisialisasi backend sekali; key backend (ID spreadsheet untuk gsheets) dipakai sebagai kunci cache get_data
+storage = get_storage_backend()
+spreadsheet_id = storage.key
 
 
 # ===========================
-# Fungsi untuk Load Data (MODIFIKASI FINAL)
+# Fungsi untuk Load Data (Snapshot Bersama Antar Sesi)
 # ===========================
-@st.cache_data(ttl=600)
-def get_data(sheet_id, worksheet_name): # <-- HANYA MENGGUNAKAN ARGUMEN HASHABLE
-    """Memuat data dari Google Sheet. Membuat DataFrame kosong jika error."""
+@st.cache_resource(ttl=None)
+def get_shared_store(sheet_id):
+    """Satu SharedStore per proses: semua sesi membaca snapshot DataFrame yang sama tanpa disalin.
+
+    Jika folder cache diatur (env SNAPSHOT_CACHE_DIR atau secrets [cache] dir), snapshot juga
+    dibagi ke semua proses worker di mesin yang sama lewat disk: satu refresher per TTL.
+    Thread refresher me-refresh data metering & catatan sebelum TTL habis; interval dan
+    jitter diatur lewat secrets [refresher] (interval detik, jitter 0-1, ttl detik).
+    """
+    folder = os.environ.get("SNAPSHOT_CACHE_DIR", _baca_secrets("cache").get("dir"))
+    disk = DiskSnapshotCache(folder, namespace=sheet_id) if folder else None
+    refresher = _baca_secrets("refresher")
+    store = SharedStore(storage, parse=siapkan_data, ttl=float(refresher.get("ttl", 600)), disk=disk)
+    if refresher.get("enabled", True):
+        store.mulai_refresher(
+            [data_sheet, notes_sheet],
+            interval=float(os.environ.get("REFRESH_INTERVAL", refresher.get("interval", 240))),
+            jitter=float(refresher.get("jitter", 0.1)),
+        )
+    return store
+
+shared_store = get_shared_store(spreadsheet_id)
+
+@st.cache_resource(ttl=None)
+def pantau_manifest_arsip(sheet_id):
+    """Manifest arsip dibaca ulang setiap snapshot hot dimuat ulang penuh (versi hot berubah, mis. proses lain mengarsipkan)."""
+    def terima(snap, delta):
+        if snap.sheet == data_sheet and delta is None:
+            storage.lupakan_manifest()
+
+    shared_store.subscribe(terima)
+    return True
+
+@st.cache_resource(ttl=None, show_spinner="Memindahkan data bulan lama ke arsip...")
+def arsipkan_bulanan(sheet_id, bulan):
+    """Tiering otomatis sekali per proses per bulan: bacaan sebelum periode aktif dipindah ke partisi arsip.
+    Error tidak ditangkap di sini agar kegagalan tidak ikut di-cache; percobaan berikutnya pada rerun selanjutnya."""
+    return storage.arsipkan(data_sheet)
+
+if isinstance(storage, ArsipBackend):
+    pantau_manifest_arsip(spreadsheet_id)
     try:
-        # Panggil client yang sudah di-cache
-        client = get_gspread_client() 
-        ss = client.open_by_key(sheet_id)
-        ws = ss.worksheet(worksheet_name)
-        
-        df = pd.DataFrame(ws.get_all_records())
-        df = df.dropna(how='all') 
-        
-        # Logika memastikan kolom tanggal berupa datetime
-        if 'TANGGAL_CATATAN' in df.columns: 
-            df['TANGGAL_CATATAN'] = pd.to_datetime(df['TANGGAL_CATATAN'], errors='coerce')
-        elif 'TANGGAL' in df.columns: 
-            df['TANGGAL'] = pd.to_datetime(df['TANGGAL'], errors='coerce')
-        elif 'TANGGAL_CEKLIST' in df.columns: 
-            df['TANGGAL_CEKLIST'] = pd.to_datetime(df['TANGGAL_CEKLIST'], errors='coerce')
-            
-        return df
+        if arsipkan_bulanan(spreadsheet_id, datetime.date.today().strftime("%Y-%m")):
+            shared_store.invalidate(data_sheet)
     except Exception as e:
-        st.error(f"Gagal mengambil data dari Google Sheets. Pastikan 'spreadsheet_id' dan nama sheet benar. Error: {e}")
-        return pd.DataFrame()
+        # Gagal (mis. kuota/konflik): aplikasi tetap jalan dengan partisi hot apa adanya
+        st.toast(f"⚠️ Pengarsipan bulanan gagal, dicoba lagi nanti: {e}")
+
+@st.cache_data(max_entries=16, show_spinner="Membuka partisi arsip...")
+def data_arsip(sheet_id, start, end, revisi):
+    """Bacaan partisi arsip pada rentang, diparse seperti snapshot; revisi hot ikut kunci karena pengarsipan & koreksi menaikkannya."""
+    with ukur("query_arsip"):
+        return siapkan_data(storage.query_arsip(data_sheet, "TANGGAL", start, end))
+
+def data_metering_rentang(start, end):
+    """Data metering rentang tanggal: partisi hot dari snapshot bersama, partisi arsip hanya bila rentang mencapainya."""
+    df_hot = filter_range(shared_store.get(data_sheet), "TANGGAL", start, end)
+    awal_hot = storage.awal_hot(data_sheet) if isinstance(storage, ArsipBackend) else None
+    if awal_hot is None or pd.Timestamp(start) >= awal_hot:
+        return df_hot
+    df_arsip = data_arsip(spreadsheet_id, start, end, shared_store.revisi(data_sheet))
+    if df_arsip.empty or df_hot.empty:
+        return df_hot if df_arsip.empty else df_arsip
+    return merge_rows(df_arsip, df_hot, ["TANGGAL", "WAKTU"])
+
+def bulan_arsip():
+    """Bulan (YYYY-MM) yang tersimpan di partisi arsip metering."""
+    if not isinstance(storage, ArsipBackend):
+        return []
+    return storage.manifest(data_sheet)["BULAN"].tolist()
+
+def get_data(sheet_id, worksheet_name):
+    """Mengambil snapshot data bersama (hanya-baca) sambil mencatat durasinya. DataFrame kosong jika error."""
+    with ukur("get_data"):
+        try:
+            df_snapshot = shared_store.get(worksheet_name)
+        except Exception as e:
+            st.error(f"Gagal mengambil data dari Google Sheets. Pastikan 'spreadsheet_id' dan nama sheet benar. Error: {e}")
+            return pd.DataFrame()
+
+    # Beri tahu operator bila ada baris baru dari sesi lain sejak rerun sebelumnya
+    kunci_revisi = f"revisi_{worksheet_name}"
+    revisi_lama = st.session_state.get(kunci_revisi)
+    revisi_baru = shared_store.revisi(worksheet_name)
+    if revisi_lama is not None and revisi_baru != revisi_lama:
+        delta = shared_store.changes_since(worksheet_name, revisi_lama)
+        if delta is not None and not delta.empty:
+            st.toast(f"🔄 {len(delta)} baris {worksheet_name} diperbarui oleh sesi lain/penyimpanan terbaru.")
+    st.session_state[kunci_revisi] = revisi_baru
+    return df_snapshot
 
 # ===========================
-# Fungsi untuk Save Data (MODIFIKASI FINAL DENGAN GSPREAD)
+# Fungsi untuk Save Data (MODIFIKASI FINAL DENGAN BACKEND PENYIMPANAN)
 # ===========================
-def save_data(df_to_save, sheet_name):
-    """Menyimpan (mengganti) DataFrame ke sheet tertentu dalam Google Sheet menggunakan gspread."""
-    try:
-        client = get_gspread_client()
-        ss = client.open_by_key(spreadsheet_id)
-        ws = ss.worksheet(sheet_name)
+def save_data(df_to_save, sheet_name, mode="replace", keys=None):
+    """Menyimpan DataFrame ke sheet tertentu melalui backend penyimpanan.
 
-        # Hapus data yang ada (termasuk header)
-        ws.clear()
-        
-        # Tulis DataFrame ke worksheet (membutuhkan library gspread-dataframe)
-        set_with_dataframe(ws, df_to_save, include_index=False)
+    mode="replace" mengganti seluruh isi sheet, "append" menambah baris di akhir,
+    "upsert" mengganti baris dengan kunci `keys` yang sama lalu menambah sisanya.
+    """
+    try:
+        with ukur("save_data"):
+            if mode == "append":
+                storage.append(sheet_name, df_to_save)
+            elif mode == "upsert":
+                storage.upsert(sheet_name, df_to_save, keys)
+            else:
+                storage.replace(sheet_name, df_to_save)
+        # Data berubah: terapkan baris yang disimpan sebagai delta ke snapshot bersama
+        # (muat ulang penuh hanya jika ada penulis lain di antaranya)
+        with ukur("terapkan_delta"):
+            shared_store.catat_tulis(sheet_name, df_to_save, keys=keys, ganti=(mode == "replace"))
         return True
+    except VersionConflict:
+        # Sheet diubah operator lain berkali-kali selama proses simpan
+        shared_store.invalidate(sheet_name)
+        st.error("Data sedang diubah oleh operator lain. Silakan muat ulang halaman lalu simpan kembali.")
+        return False
     except Exception as e:
         st.error(f"Error saat menyimpan data ke Google Sheets: {e}")
         return False
 
+def _format_umur(detik):
+    """Umur data dalam teks singkat: '45 detik' / '12 menit' / '2 jam'."""
+    if detik < 60:
+        return f"{int(detik)} detik"
+    if detik < 3600:
+        return f"{int(detik // 60)} menit"
+    return f"{int(detik // 3600)} jam"
+
 # Panggilan data utama (untuk digunakan di seluruh aplikasi)
 df = get_data(spreadsheet_id, data_sheet)
 
@@ -122,252 +294,6 @@ def hitung_vswr(power_output, reflected):
     gamma = (reflected / power_output) ** 0.5
     return round((1 + gamma) / (1 - gamma), 2)
 
-# ===========================
-# Mapping Ceklist Harian Digital (Deskripsi + Rekomendasi)
-# ===========================
-# ... (ceklist_rules Anda di sini - terlalu panjang untuk disalin, tetapi asumsikan ada di kode Anda)
-
-ceklist_rules = {
-    "Transmitter (Exciter & PA)": {
-        "Normal": {
-            "deskripsi": "Daya output stabil, suhu normal, tidak ada alarm",
-            "rekom": "Tidak ada tindakan, kondisi transmitter normal"
-        },
-        "Warning": {
-            "deskripsi": "Daya output menurun, suhu meningkat",
-            "rekom": "Periksa pendingin udara, bersihkan filter, pantau daya output"
-        },
-        "Trouble": {
-            "deskripsi": "Daya output turun drastis, suhu overheat",
-            "rekom": "Periksa exciter/PA, lakukan kalibrasi RF, panggil teknisi servis"
-        }
-    },
-    "Antena": {
-        "Normal": {
-            "deskripsi": "VSWR normal, sinyal stabil, kondisi fisik antena baik",
-            "rekom": "Tidak ada tindakan, kondisi antena baik"
-        },
-        "Warning": {
-            "deskripsi": "VSWR meningkat, mulai terjadi pantulan daya — indikasi konektor longgar atau feeder mulai menurun kualitasnya",
-            "rekom": "Periksa dan kencangkan konektor, bersihkan jalur feeder, pastikan tidak ada korosi atau kelembapan pada konektor"
-        },
-        "Trouble": {
-            "deskripsi": "VSWR tinggi, sinyal tidak stabil atau hilang — kemungkinan antena retak, bocor air, atau feeder rusak",
-            "rekom": "Ganti feeder/antena, lakukan perbaikan fisik segera"
-        }
-    },
-    "Encoder": {
-        "Normal": {
-            "deskripsi": "Bitrate stabil, output normal",
-            "rekom": "Tidak ada tindakan, encoder berfungsi baik"
-        },
-        "Warning": {
-            "deskripsi": "Bitrate turun 10–20%, terjadi delay atau patah-patah pada video output",
-            "rekom": "Restart encoder, cek software dan jaringan"
-        },
-        "Trouble": {
-            "deskripsi": "Output encoder tidak ada (blank)",
-            "rekom": "Cek hardware encoder, ganti unit jika rusak"
-        }
-    },
-        "IRD (Integrated Receiver Decoder)": {
-        "Normal": {
-            "deskripsi": "Sinyal input dan output video/audio normal",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Kualitas sinyal menurun, kadang terjadi glitch pada video/audio",
-            "rekom": "Periksa level sinyal input, cek konektor dan kabel, pastikan suhu perangkat stabil atau tidak terlalu panas"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak ada sinyal, video/audio tidak keluar",
-            "rekom": "Cek sumber input RF atau IP, reboot IRD, dan pastikan konfigurasi parameter input sesuai"
-        }
-    },
-    "Multiplexer": {
-        "Normal": {
-            "deskripsi": "Semua input-output terbaca normal dan bitrate stabil",
-            "rekom": "Tidak ada tindakan, kondisi MUX baik"
-        },
-        "Warning": {
-            "deskripsi": "Input sesekali hilang atau bitrate turun",
-            "rekom": "Restart MUX, cek port input/output"
-        },
-        "Trouble": {
-            "deskripsi": "Input tidak terbaca sama sekali, ada indikator lampu merah menyala",
-            "rekom": "Servis MUX, cek perangkat keras & software, cek kabel inputan, IRD dan encoder"
-        }
-    },
-    "Parabola + LNB": {
-        "Normal": {
-            "deskripsi": "Arah parabola tepat, sinyal kuat, LNB dalam kondisi baik",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Arah parabola bergeser, sinyal melemah",
-            "rekom": "Atur ulang arah parabola, cek dan kencangkan konektor LNB"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak ada sinyal sama sekali",
-            "rekom": "Ganti LNB, periksa kabel feeder, atur ulang pointing parabola"
-        }
-    },
-    "AVR": {
-        "Normal": {
-            "deskripsi": "Tegangan output stabil",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Tegangan naik turun ringan",
-            "rekom": "Periksa setting AVR, pendinginan, sambungan kabel"
-        },
-        "Trouble": {
-            "deskripsi": "Tegangan fluktuasi besar, tidak stabil",
-            "rekom": "Servis AVR, ganti komponen internal jika perlu"
-        }
-    },
-    "Grounding": {
-        "Normal": {
-            "deskripsi": "Resistansi < 5 Ohm, kabel & rod rapi, sistem grounding baik, mampu mengalirkan arus petir dan gangguan listrik dengan aman",
-            "rekom": "Tidak ada tindakan, ukur resistensi berkala terutama saat musim hujan"
-        },
-        "Warning": {
-            "deskripsi": "Resistansi 5–7 Ohm, efektifitas penyaluran arus petir mulai menurun — potensi sambaran petir tidak sepenuhnya tersalur ke tanah, ada korosi di sambungan",
-            "rekom": "Tambah atau perbaiki rod grounding, periksa sambungan kabel ground dan pastikan tidak berkarat"
-        },
-        "Trouble": {
-            "deskripsi": "Resistansi > 7 Ohm,  proteksi petir tidak berfungsi — arus petir berpotensi merusak peralatan transmisi",
-            "rekom": "Perbaiki jalur ground, pasang rod tambahan, ganti kabel/rod rusak, dan lakukan pengujian resistansi tanah setelah perbaikan"
-        }
-    },
-    "Cooling System": {
-        "Normal": {
-            "deskripsi": "Semua kipas normal, hembusan angin kuat",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Putaran kipas melemah atau bising",
-            "rekom": "Bersihkan kipas, cek bearing, cek kabel listrik"
-        },
-        "Trouble": {
-            "deskripsi": "Kipas mati total",
-            "rekom": "Ganti kipas baru, cek suplai listrik"
-        }
-    },
-    "AC Ruangan Transmisi": {
-        "Normal": {
-            "deskripsi": "Suhu ruangan 18–24°C stabil",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Suhu 25–26°C",
-            "rekom": "Bersihkan filter AC, periksa freon"
-        },
-        "Trouble": {
-            "deskripsi": "AC mati/tidak dingin, suhu >27°C ",
-            "rekom": "Isi freon, servis AC, periksa kompresor dan kapasitor, ganti unit"
-        }
-    },
-    "UPS": {
-        "Normal": {
-            "deskripsi": "Backup normal, baterai bagus, tidak ada alarm",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Backup singkat, alarm indikator berbunyi",
-            "rekom": "Periksa aki, bersihkan ventilasi UPS, pastikan suhu ruangan tidak panas"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak ada backup sama sekali saat listrik padam",
-            "rekom": "Ganti aki, servis UPS"
-        }
-    },
-    "Genset": {
-        "Normal": {
-            "deskripsi": "Mesin hidup normal, beban stabil, bahan bakar cukup",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Mesin sulit dinyalakan, bahan bakar hampir habis",
-            "rekom": "Cek aki starter, isi bahan bakar, bersihkah / ganti filter"
-        },
-        "Trouble": {
-            "deskripsi": "Mesin tidak hidup/drop",
-            "rekom": "Servis genset, ganti oli, filter, atau aki"
-        }
-    },
-    "Router": {
-        "Normal": {
-            "deskripsi": "Koneksi internet lancar dan stabil",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Koneksi internet melambat",
-            "rekom": "Restart router, cek kabel LAN/fiber"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak ada koneksi internet",
-            "rekom": "Ganti router atau hubungi ISP"
-        }
-    },
-    "Switch Hub": {
-        "Normal": {
-            "deskripsi": "Semua port aktif, koneksi lancar",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Satu atau beberapa port mati/tidak berfungsi",
-            "rekom": "Gunakan port cadangan atau ganti port rusak"
-        },
-        "Trouble": {
-            "deskripsi": "Semua port mati, perangkat tidak menyala",
-            "rekom": "Ganti switch hub, cek power supply"
-        }
-    },
-    "Multiviewer": {
-        "Normal": {
-            "deskripsi": "Semua channel tampil normal di monitor",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Beberapa channel hilang atau delay",
-            "rekom": "Restart sistem, cek input/output matrix"
-        },
-        "Trouble": {
-            "deskripsi": "Semua channel blank",
-            "rekom": "Servis atau ganti multiviewer"
-        }
-    },
-    "Set Top Box": {
-        "Normal": {
-            "deskripsi": "Channel terkunci normal, gambar dan suara lancar",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Channel sulit terkunci, sinyal melemah",
-            "rekom": "Scan ulang channel, reset STB"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak bisa lock channel sama sekali",
-            "rekom": "Ganti STB atau periksa antena"
-        }
-    },
-    "RCS (Remote Control System)": {
-        "Normal": {
-            "deskripsi": "Sistem remote berjalan normal, semua perangkat terpantau",
-            "rekom": "Tidak ada tindakan"
-        },
-        "Warning": {
-            "deskripsi": "Respon lambat, data kadang delay",
-            "rekom": "Cek jaringan dan software RCS"
-        },
-        "Trouble": {
-            "deskripsi": "Tidak bisa remote/monitoring mati total",
-            "rekom": "Cek hardware/software RCS, restart server"
-        }
-    }
-}
-# ... (Akhir ceklist_rules)
 
 # ===========================
 # Background Image Function & Styling
@@ -517,6 +443,7 @@ def login_form():
         if login_button:
             if username == "admin" and password == "admin123":
                 st.session_state['logged_in'] = True
+                st.session_state['username'] = username
                 st.rerun()
             else:
                 st.error("❌ Username atau Password salah!")
@@ -543,236 +470,33 @@ def show_input_kalkulator():
             st.info(f"Hasil perhitungan VSWR: **{vswr_calc}**")
 
     # ======================
-    # RULES PARAMETER (LOKAL DI DALAM FUNGSI)
+    # PRAKIRAAN DRIFT
     # ======================
-    rules_param = {
-        "Power Output (Watt)": [
-            {"min": 10000, "max": 11900, "status": "Normal",
-             "rekom": "Output sesuai standar, tidak perlu tindakan",
-             "keterangan": "Daya pemancar dalam batas aman dan sesuai standar operasional."},
-            {"min": 8000, "max": 9999, "status": "Warning",
-             "rekom": "Catat penurunan, cek beban pemancar",
-             "keterangan": "Terjadi sedikit penurunan daya, namun masih dalam batas toleransi aman."},
-            {"min": 0, "max": 7999, "status": "Trouble",
-             "rekom": "Jika drop: periksa exciter, amplifier, kabel RF",
-             "keterangan": "Daya terlalu rendah, berpotensi menyebabkan gangguan transmisi siaran."},
-            {"min": 11901, "max": 20000, "status": "Trouble",
-             "rekom": "Jika over: periksa setting & kalibrasi daya output",
-             "keterangan": "Daya melebihi batas standar, berisiko merusak perangkat pemancar."}
-        ],
-        "VSWR": [
-            {"min": 0, "max": 1.24, "status": "Normal",
-             "rekom": "VSWR aman, tidak perlu tindakan",
-             "keterangan": "Nilai VSWR stabil dan menunjukkan efisiensi pancaran optimal."},
-            {"min": 1.25, "max": 1.30, "status": "Warning",
-             "rekom": "Kencangkan konektor RF, cek feeder dan kondisi fisik antena",
-             "keterangan": "Refleksi sinyal mulai meningkat, perlu pengecekan konektor dan antena."},
-            {"min": 1.31, "max": 10.0, "status": "Trouble",
-             "rekom": "Segera turunkan daya, periksa antena & feeder",
-             "keterangan": "VSWR tinggi menandakan ketidaksesuaian impedansi, berpotensi merusak pemancar."}
-        ],
-        "C/N (dB)": [
-            {"min": 40, "max": 50, "status": "Normal",
-             "rekom": "Sinyal satelit sangat stabil, tidak perlu tindakan",
-             "keterangan": "Kualitas sinyal satelit sangat baik dan stabil."},
-            {"min": 30, "max": 39.9, "status": "Warning",
-             "rekom": "Pantau sinyal, Pantau kondisi cuaca. Jika hujan, ini normal. Jika cuaca cerah, periksa konektor, kabel, dan arah dish.",
-             "keterangan": "Kualitas sinyal menurun, kemungkinan akibat cuaca atau gangguan perangkat antena."},
-            {"min": 0,  "max": 29.9, "status": "Trouble",
-             "rekom": "Atur ulang parabola, cek LNB/dish, lakukan perbaikan segera, ganti kalau perlu",
-             "keterangan": "Kualitas sinyal sangat buruk, berisiko menyebabkan hilangnya siaran."}
-        ],
-        "Margin (dB)": [
-            {"min": 20, "max": 30, "status": "Normal",
-             "rekom": "Link sangat aman, tidak perlu tindakan",
-             "keterangan": "Koneksi link dalam kondisi optimal dan stabil."},
-            {"min": 10, "max": 19.9, "status": "Warning",
-             "rekom": "periksa konektor RF dan pastikan tidak ada halangan di jalur dish",
-             "keterangan": "Margin mulai menurun, perlu pemeriksaan jalur transmisi."},
-            {"min": 0,  "max": 9.9, "status": "Trouble",
-             "rekom": "atur ulang dish, periksa LNB, dan cek kabel coaxial, pastikan tidak ada korosi atau konektor longgar.",
-             "keterangan": "Margin sangat rendah, transmisi berpotensi tidak stabil."}
-        ],
-        "Tegangan Listrik (Volt)": [
-            {"min": 215, "max": 225, "status": "Normal",
-             "rekom": "Tegangan stabil, tidak perlu tindakan",
-             "keterangan": "Suplai listrik dalam kondisi stabil dan sesuai standar operasional."},
-            {"min": 210, "max": 214, "status": "Warning",
-             "rekom": "Pantau voltase, hidupkan stabilizer bila perlu",
-             "keterangan": "Tegangan sedikit menurun, masih dalam batas aman namun perlu pemantauan."},
-            {"min": 226, "max": 230, "status": "Warning",
-             "rekom": "Pantau voltase, hidupkan stabilizer bila perlu",
-             "keterangan": "Tegangan sedikit tinggi, perlu pengawasan agar tidak naik berlebih."},
-            {"min": 0, "max": 209, "status": "Trouble",
-             "rekom": "Periksa suplai PLN/UPS, cek kabel distribusi, pakai genset jika darurat",
-             "keterangan": "Tegangan terlalu rendah, dapat mengganggu kinerja peralatan elektronik."},
-            {"min": 231, "max": 300, "status": "Trouble",
-             "rekom": "Tegangan over. Periksa suplai PLN/UPS, cek kabel distribusi, pakai genset jika darurat",
-             "keterangan": "Tegangan berlebih, berpotensi menyebabkan kerusakan pada perangkat."}
-        ],
-        "Suhu TX (°C)": [
-            {"min": 0, "max": 15.9, "status": "Warning",
-             "rekom": "Suhu terlalu dingin, pantau risiko embun atau lembap di peralatan, naikkan suhu ac/pendingin ruangan",
-             "keterangan": "Suhu di bawah standar operasional, berisiko menyebabkan kondensasi pada komponen."},
-            {"min": 16, "max": 20.9, "status": "Normal",
-             "rekom": "Suhu normal, tidak perlu tindakan",
-             "keterangan": "Suhu stabil dan aman untuk perangkat transmisi."},
-            {"min": 21, "max": 25.9, "status": "Warning",
-             "rekom": "Cek pendingin ruangan jika ada ac yang mati turunkan suhu, bersihkan filter AC",
-             "keterangan": "Suhu sedikit tinggi, perlu pemantauan agar tidak meningkat lebih lanjut."},
-            {"min": 26, "max": 100, "status": "Trouble",
-             "rekom": "Segera servis AC / tambah pendingin ruangan",
-             "keterangan": "Suhu terlalu tinggi, berpotensi menyebabkan overheating pada perangkat pemancar."}
-        ]
-    }
-
-    # ==================================================
-    # RULES BITRATE KANAL TV (LOKAL DI DALAM FUNGSI)
-    # ==================================================
-    rules_bitrate = {
-        "Bitrate NET TV (Mbps)": [
-            {"min": 0, "max": 0.99, "status": "Trouble",
-             "rekom": "Laporkan ke pihak NET TV pusat untuk konfirmasi. Tidak dilakukan tindakan lokal sebelum instruksi diterima. Catat waktu dan durasi bitrate 0 Mbps.",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 1.0, "max": 1.49, "status": "Warning",
-             "rekom": "Pantau kestabilan bitrate pada transcoder NET TV. Jika fluktuasi >10–15 menit, catat waktu kejadian dan laporkan ke pihak NET TV.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 1.5, "max": 2.0, "status": "Normal",
-             "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 2 Mbps. Tetap pantau kestabilan.",
-             "keterangan": "Siaran NET TV berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate RTV (Mbps)": [
-            {"min": 0, "max": 1.99, "status": "Trouble",
-             "rekom": "Laporkan ke pihak RTV untuk pengecekan siaran. Tunda tindakan lokal sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 2.0, "max": 3.49, "status": "Warning",
-             "rekom": "Pantau bitrate dari encoder RTV. Jika penurunan berulang, catat polanya dan informasikan ke RTV.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 3.5, "max": 4.0, "status": "Normal",
-             "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 4 Mbps. Tetap pantau kestabilan.",
-             "keterangan": "Siaran RTV berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate JAMBI TV (Mbps)": [
-            {"min": 0, "max": 0.99, "status": "Trouble",
-             "rekom": "Laporkan ke pihak Jambi TV terkait penurunan bitrate. Tunggu konfirmasi sebelum tindakan teknis. Catat waktu & parameter jaringan.",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 1.0, "max": 1.49, "status": "Warning",
-             "rekom": "Pantau output encoder Jambi TV dan koneksi IP ke MUX. Jika fluktuatif, laporkan ke pihak Jambi TV.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 1.5, "max": 2.0, "status": "Normal",
-             "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 2 Mbps. Tetap pantau kestabilan",
-             "keterangan": "Siaran JAMBI TV berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate JEK TV (Mbps)": [
-            {"min": 0, "max": 0.99, "status": "Trouble",
-             "rekom": "Laporkan ke pihak JEK TV untuk pengecekan siaran. Tunda tindakan sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 1.0, "max": 1.49, "status": "Warning",
-             "rekom": "Cek converter JEK TV. Jika hanya kanal ini turun, laporkan ke pihak RTV.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 1.5, "max": 2.0, "status": "Normal",
-             "rekom": "Bitrate stabil, tidak perlu maintenance. Lanjutkan pemantauan harian.",
-             "keterangan": "Siaran JEK TV berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate SINPO TV (Mbps)": [
-            {"min": 0, "max": 0.99, "status": "Trouble",
-             "rekom": "Laporkan ke pihak SINPO TV . Tunda tindakan sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 1.0, "max": 1.49, "status": "Warning",
-             "rekom": "Pantau fluktuasi bitrate SINPO TV. Jika tidak kembali normal dalam 10–15 menit, hubungi pihak SINPO.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 1.5, "max": 2.0, "status": "Normal",
-             "rekom": "Bitrate stabil, tidak perlu maintenance. Lanjutkan pemantauan harian",
-             "keterangan": "Siaran SINPO TV berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate TVRI NASIONAL (Mbps)": [
-            {"min": 0, "max": 1.99, "status": "Trouble",
-             "rekom": "Jika bitrate 0 Mbps atau siaran hilang, cek IRD Harmonic dan lakukan Encrypt siaran. Jika tetap hilang, koordinasikan dengan TVRI pusat. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 2.0, "max": 3.49, "status": "Warning",
-             "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat .",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 3.5, "max": 4.0, "status": "Normal",
-             "rekom": "Bitrate stabil, tidak perlu tindakan.",
-             "keterangan": "Siaran TVRI NASIONAL berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate TVRI WORLD (Mbps)": [
-            {"min": 0, "max": 1.99, "status": "Trouble",
-             "rekom": "Jika bitrate 0 Mbps atau siaran hilang, cek IRD Harmonic dan lakukan Encrypt siaran. Jika tetap hilang, koordinasikan dengan TVRI pusat. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 2.0, "max": 3.49, "status": "Warning",
-             "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 3.5, "max": 4.0, "status": "Normal",
-             "rekom": "Tidak ada masalah, jalur aman. Pantau jika ada event internasional besar.",
-             "keterangan": "Siaran TVRI World berjalan lancar dan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate TVRI SPORT (Mbps)": [
-            {"min": 0, "max": 1.99, "status": "Trouble",
-             "rekom": "Jika bitrate 0 Mbps: (1) Cabut-pasang kartu encrypt IRD Ericsson. (2) Jika belum normal, pasang kabel LAN dari IRD ke pc lalu masuk ke sistem IRD menggunakan IP, lalu centang kolom Decrypt & Decode. Jika tetap gagal, hubungi TVRI pusat. Atau pantau jadwal Sun Outage",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 2.0, "max": 3.49, "status": "Warning",
-             "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 3.5, "max": 4.0, "status": "Normal",
-             "rekom": "Kondisi baik, stream lancar. Tetap pantau bitrate saat live event.",
-             "keterangan": "Siaran TVRI SPORT berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-        "Bitrate TVRI JAMBI (Mbps)": [
-            {"min": 0, "max": 1.99, "status": "Trouble",
-             "rekom": "Jika bitrate 0 Mbps, cek sistem encoder (lihat status inputan masing-masing port yaitu SDI, HDMI, & CVBS. Kalau status inputan merah berarti tidak ada inputan, selanjutnya ganti ke port yang status nya hijau. Jika menggunakan IRD, restart IRD",
-             "keterangan": "Bitrate hilang atau sangat rendah"},
-            {"min": 2.0, "max": 3.49, "status": "Warning",
-             "rekom": "Pantau perubahan bitrate pada encoder/IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat.",
-             "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
-            {"min": 3.5, "max": 4.0, "status": "Normal",
-             "rekom": "Normal, encoder/IRD dan MUX berfungsi baik. Tidak perlu tindakan.",
-             "keterangan": "Siaran TVRI JAMBI berjalan normal dengan bitrate sesuai standar kontrak."}
-        ],
-    }
-    
-    # ==================================================
-    # GABUNGKAN KEDUA DICTIONARY RULES MENJADI SATU
-    # ==================================================
-    rules_param.update(rules_bitrate)
-
-    # ==================================================
-    # FUNGSI PEMERIKSA PARAMETER (VERSI BARU - LOKAL)
-    # ==================================================
-    def cek_param(nama, nilai):
-        """
-        Mengecek status, keterangan, dan rekomendasi dari suatu parameter teknis
-        berdasarkan nilai aktual dan rentang batas pada rules_param.
-        Fungsi ini mengembalikan dictionary, bukan tuple.
-        """
-        if nama not in rules_param:
-            return {
-                "Parameter": nama,
-                "Nilai": nilai,
-                "Status": "N/A",
-                "Keterangan": "Parameter tidak terdaftar dalam aturan pengukuran.",
-                "Rekomendasi": "Periksa kembali nama parameter atau tambahkan ke rules_param."
-            }
-
-        for rule in rules_param[nama]:
-            if rule["min"] <= nilai <= rule["max"]:
-                hasil = {
-                    "Parameter": nama,
-                    "Nilai": nilai,
-                    "Status": rule["status"],
-                    "Keterangan": rule.get("keterangan", "Tidak ada keterangan."), # Pakai .get() agar aman
-                    "Rekomendasi": rule.get("rekom", "Tidak ada rekomendasi.")
-                }
-                return hasil
-
-        # Jika nilai tidak masuk rentang manapun
-        return {
-            "Parameter": nama,
-            "Nilai": nilai,
-            "Status": "N/A",
-            "Keterangan": "Nilai di luar jangkauan aturan yang ditetapkan.",
-            "Rekomendasi": "Periksa ulang input nilai atau tambahkan batas baru pada rules_param."
-        }
+    st.subheader("📈 Prakiraan Drift Parameter")
+    df_meter = get_data(spreadsheet_id, data_sheet)
+    with ukur("prakiraan_drift"):
+        model_drift = get_prakiraan_drift(spreadsheet_id)
+        model_drift.sinkron(df_meter, shared_store.revisi(data_sheet))
+        df_drift = model_drift.tabel()
+    kolom_drift = st.columns(len(df_drift))
+    for kolom, baris in zip(kolom_drift, df_drift.to_dict("records")):
+        if baris["Tren / Hari"] is None:
+            kolom.metric(baris["Parameter"], "-")
+            kolom.caption("Bacaan belum cukup untuk prakiraan.")
+            continue
+        kolom.metric(baris["Parameter"], f"{baris['Bacaan Terakhir']:.2f}", f"{baris['Tren / Hari']:+.3f} / hari",
+                     delta_color="off")
+        for status, ikon in (("Trouble", "🔴"), ("Warning", "🟠")):
+            hari = baris[f"{status} (hari)"]
+            if hari is None or pd.isna(hari):
+                continue
+            if hari == 0:
+                kolom.caption(f"{ikon} Tren sudah di level {status}")
+            else:
+                kolom.caption(f"{ikon} Proyeksi {status} dalam {hari:g} hari")
+            break
+        else:
+            kolom.caption(f"🟢 Tidak ada proyeksi Warning/Trouble dalam {model_drift.horizon_hari} hari")
 
     # ======================
     # FORM INPUT DATA
@@ -782,7 +506,7 @@ def show_input_kalkulator():
         
         col1_form, col2_form = st.columns(2)
         tanggal = col1_form.date_input("Tanggal")
-        waktu_options = ["02:00", "06:00", "10:00", "14:00", "18:00", "22:00"]
+        waktu_options = SLOT_METERING
         waktu = col2_form.selectbox("Waktu", waktu_options)
 
         # Perbaikan: min_value=0.0 untuk parameter yang bisa 0
@@ -941,38 +665,123 @@ def show_input_kalkulator():
                 "CATATAN/KETERANGAN": catatan, 
             }
 
-            # Menggunakan fungsi get_data() yang baru
-            df_existing = get_data(spreadsheet_id, data_sheet) 
-            
-            if not df_existing.empty and 'TANGGAL' in df_existing.columns:
-                 df_existing['TANGGAL'] = pd.to_datetime(df_existing['TANGGAL'], errors='coerce')
-
-            df_new = pd.DataFrame([data_input])
-            df_new['TANGGAL'] = pd.to_datetime(df_new['TANGGAL'])
-
-            if df_existing.empty:
-                df_all = df_new
-            else:
-                # Periksa apakah kolom DUP_CHECK ada sebelum mengaksesnya
-                if 'TANGGAL' in df_existing.columns and 'WAKTU' in df_existing.columns:
-                    df_existing['DUP_CHECK'] = df_existing['TANGGAL'].dt.strftime('%Y-%m-%d') + '_' + df_existing['WAKTU'].astype(str)
-                else:
-                    df_existing['DUP_CHECK'] = None # Buat kolom kosong jika TANGGAL/WAKTU tidak ada
-                    
-                df_new['DUP_CHECK'] = df_new['TANGGAL'].dt.strftime('%Y-%m-%d') + '_' + df_new['WAKTU'].astype(str)
-                
-                df_existing_filtered = df_existing[~df_existing['DUP_CHECK'].isin(df_new['DUP_CHECK'])]
-                df_all = pd.concat([df_existing_filtered.drop(columns=['DUP_CHECK'], errors='ignore'), df_new.drop(columns=['DUP_CHECK'], errors='ignore')], ignore_index=True)
-
-            if 'TANGGAL' in df_all.columns:
-                 df_all['TANGGAL'] = pd.to_datetime(df_all['TANGGAL']).dt.strftime('%Y-%m-%d')
+            # Kolom turunan (DATETIME, STATUS, imbalance) dihitung sekali di sini dan ikut disimpan
+            df_new = tambah_kolom_turunan(pd.DataFrame([data_input]))
 
-            # Menyimpan data metering ke Google Sheet
-            if save_data(df_all, data_sheet):
+            # Menyimpan data metering (baris dengan TANGGAL & WAKTU sama diganti)
+            if save_data(df_new, data_sheet, mode="upsert", keys=["TANGGAL", "WAKTU"]):
                 st.success(f"✅ Data berhasil ditambahkan ke Google Sheet **{data_sheet}**!")
+                # Bitrate Trouble saat jendela sun outage: kemungkinan interferensi matahari, bukan gangguan perangkat
+                tanggal_simpan = pd.to_datetime(tanggal)
+                df_outage = trouble_saat_outage(df_new, jadwal_sun_outage_rentang(tanggal_simpan, tanggal_simpan))
+                if not df_outage.empty:
+                    st.warning(
+                        f"☀️ Bitrate Trouble pada **{df_outage['Kanal Trouble'].iloc[0]}** bertepatan dengan jendela "
+                        "sun outage. Periksa kembali setelah jendela berakhir sebelum eskalasi gangguan perangkat."
+                    )
+# ===========================
+# Indeks SLA (dibangun sekali per revisi data)
+# ===========================
+@st.cache_resource(max_entries=2)
+def get_sla_index(sheet_id, revisi):
+    """Prefix sum status per kanal untuk revisi snapshot metering ini; query rentang tanggal jadi O(1)."""
+    return SLAIndex(shared_store.get(data_sheet))
+
+@st.cache_resource(max_entries=2)
+def get_grid_slot(sheet_id, revisi):
+    """Histori metering di grid 4 jam (array float padat per parameter) untuk revisi snapshot ini."""
+    with ukur("grid_slot"):
+        return GridSlot(shared_store.get(data_sheet))
+
+@st.cache_resource(max_entries=2)
+def get_peta_bitrate(sheet_id, revisi):
+    """Pivot hari x slot status bitrate semua kanal untuk revisi snapshot ini."""
+    with ukur("peta_bitrate"):
+        return PetaBitrate(shared_store.get(data_sheet))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def gambar_peta_bitrate(sheet_id, revisi, kanal, start, end):
+    """PNG heatmap satu kanal & rentang; kembali ke kanal yang sudah dilihat langsung dari cache."""
+    return get_peta_bitrate(sheet_id, revisi).gambar(kanal, start, end, jadwal_sun_outage_rentang(start, end))
+
+@st.cache_data(ttl=None, show_spinner="Menghitung jadwal sun outage...")
+def get_jadwal_sun_outage(tahun, konfigurasi):
+    """Jendela sun outage satu tahun; dihitung sekali per tahun & konfigurasi lokasi/antena."""
+    with ukur("sun_outage"):
+        return jadwal_sun_outage(tahun, **dict(konfigurasi))
+
+def jadwal_sun_outage_rentang(start, end):
+    """Gabungan jadwal sun outage untuk semua tahun pada rentang tanggal."""
+    # Lokasi stasiun, bujur satelit, diameter antena dapat diubah lewat bagian [sun_outage] di secrets
+    konfigurasi = tuple(sorted(_baca_secrets("sun_outage").items()))
+    jadwal = [get_jadwal_sun_outage(tahun, konfigurasi) for tahun in range(start.year, end.year + 1)]
+    jadwal = [j for j in jadwal if not j.empty] or jadwal[:1]
+    return pd.concat(jadwal, ignore_index=True)
+
+@st.cache_resource(max_entries=2)
+def get_analisis_daya(sheet_id, revisi):
+    """Imbalance, deviasi fasa, dan kejadian sag/swell seluruh histori untuk revisi snapshot ini."""
+    with ukur("analisis_daya"):
+        return AnalisisDaya(shared_store.get(data_sheet))
+
+@st.cache_resource(ttl=None)
+def get_prakiraan_drift(sheet_id):
+    """Model prakiraan drift bersama semua sesi; diperbarui bertahap dari delta setiap penyimpanan/refresh."""
+    model = PrakiraanDrift()
+
+    def terima(snap, delta):
+        if snap.sheet == data_sheet:
+            model.sinkron(snap.df, snap.revisi, delta)
+
+    shared_store.subscribe(terima)
+    return model
+
+@st.cache_resource(ttl=None)
+def get_indeks_transisi(sheet_id):
+    """Indeks transisi kondisi perangkat bersama semua sesi; setiap simpan ceklist hanya menambah catatan baru."""
+    indeks = IndeksTransisi()
+
+    def terima(snap, delta):
+        if snap.sheet == notes_sheet:
+            indeks.sinkron(snap.df, snap.revisi, delta)
+
+    shared_store.subscribe(terima)
+    return indeks
+
+@st.cache_resource(ttl=None)
+def get_pencarian(sheet_id):
+    """Inverted index catatan metering & ceklist bersama semua sesi; baris yang disimpan ditambahkan bertahap."""
+    pencarian = PencarianCatatan(data_sheet, notes_sheet)
+    shared_store.subscribe(lambda snap, delta: pencarian.sinkron(snap.sheet, snap.df, snap.revisi, delta))
+    return pencarian
+
+@st.cache_resource(ttl=None)
+def get_arsip_rules(sheet_id, versi):
+    """Arsip batas semua versi rules; versi yang berlaku didaftarkan sekali per proses."""
+    return daftarkan_versi(storage)
+
+@st.cache_data(max_entries=24, show_spinner="Menyusun laporan bulanan...")
+def laporan_bulanan(sheet_id, bulan, format_file, revisi_meter, revisi_catatan):
+    """File laporan bulanan (Excel/PDF), di-cache per bulan + revisi data: unduh ulang langsung tersedia."""
+    with ukur("laporan_bulanan"):
+        awal_bulan = pd.Timestamp(f"{bulan}-01")
+        df_meter = data_metering_rentang(awal_bulan, awal_bulan + pd.offsets.MonthEnd(0))
+        laporan = buat_laporan_bulanan(df_meter, shared_store.get(notes_sheet), bulan)
+        if format_file == "PDF":
+            return laporan_ke_pdf(laporan, f"Laporan SLA & Maintenance MUX TVRI Jambi - {bulan}")
+        return laporan_ke_excel(laporan)
+
 # ===========================
 # Fungsi Halaman Visualisasi (Pengganti Tab 2)
 # ===========================
+@contextmanager
+def bagian_halaman(judul):
+    """Error di satu bagian halaman hanya ditampilkan di bagian itu; bagian lain tetap dirender."""
+    try:
+        yield
+    except Exception as e:
+        st.error(f"⚠️ Bagian {judul} gagal ditampilkan: {e}")
+
 def show_visualisasi_data():
     st.title("📊 Visualisasi Data")
     
@@ -984,13 +793,12 @@ def show_visualisasi_data():
         return 
     
     try:
-        df_viz["TANGGAL"] = pd.to_datetime(df_viz["TANGGAL"])
-        df_viz["DATETIME"] = pd.to_datetime(df_viz["TANGGAL"].astype(str) + " " + df_viz["WAKTU"].astype(str), errors="coerce")
-        df_viz = df_viz.dropna(subset=["DATETIME"]).sort_values("DATETIME")
+        df_viz = siapkan_visualisasi(df_viz)
         
         # ... (Sisa logika visualisasi menggunakan df_viz)
         
         df_group = pd.DataFrame() # Initialize
+        rentang_grafik = None  # (tanggal awal, tanggal akhir) untuk grid slot
 
         st.subheader("Grafik Tren Parameter")
         opsi_agregasi = st.radio("Pilih Periode Visualisasi:", ["Harian", "Bulan"], horizontal=True) 
@@ -1009,6 +817,7 @@ def show_visualisasi_data():
                 )
                 
                 df_group = df_viz[df_viz["TANGGAL"].dt.date == pilih_tanggal]
+                rentang_grafik = (pilih_tanggal, pilih_tanggal)
             else:
                 st.info("Tidak ada data untuk ditampilkan.")
 
@@ -1045,6 +854,7 @@ def show_visualisasi_data():
                     end_datetime_exclusive = pd.to_datetime(end_date) + pd.Timedelta(days=1)
                     
                     df_group = df_viz[(df_viz["DATETIME"] >= start_datetime) & (df_viz["DATETIME"] < end_datetime_exclusive)].copy()
+                    rentang_grafik = (start_date, end_date)
             else:
                 st.info("Tidak ada data untuk ditampilkan.")
 
@@ -1056,41 +866,137 @@ def show_visualisasi_data():
             default=["POWER OUTPUT (WATT)", "VSWR"]
         )
 
-        if parameter and not df_group.empty:
-            fig, ax = plt.subplots(figsize=(12, 5))
+        # Grid 4 jam: slot tanpa bacaan tampil sebagai celah (bukan garis lurus melompati slot)
+        col_grid, col_celah = st.columns(2)
+        pakai_grid = col_grid.checkbox("Selaraskan ke slot 4 jam (tandai slot hilang)", value=True, key="viz_grid")
+        maks_celah = col_celah.number_input(
+            "Interpolasi celah maksimal (slot)", min_value=0, max_value=6, value=0, step=1,
+            key="viz_celah", disabled=not pakai_grid,
+            help="Celah berurutan sepanjang ini atau kurang diisi interpolasi linear; 0 = tanpa interpolasi."
+        )
+        slot_kosong = None
+        if pakai_grid and parameter and rentang_grafik is not None:
+            try:
+                grid = get_grid_slot(spreadsheet_id, shared_store.revisi(data_sheet))
+                df_grid = grid.frame(parameter, *rentang_grafik, maks_celah=int(maks_celah))
+                slot_kosong = grid.slot_hilang(parameter, *rentang_grafik)
+                df_group = df_grid.iloc[0:0] if df_grid[parameter].isna().all().all() else df_grid
+            except Exception as e:
+                # Grafik tetap tampil dari bacaan mentah bila penyelarasan slot gagal
+                slot_kosong = None
+                st.warning(f"⚠️ Penyelarasan slot 4 jam gagal, menampilkan bacaan tanpa grid: {e}")
 
-            if opsi_agregasi == "Harian":
-                if len(df_group) <= 1:
-                     for col in parameter:
-                        ax.plot(df_group["DATETIME"], df_group[col], 'o-', label=col)
-                else:
-                    for col in parameter:
-                        ax.plot(df_group["DATETIME"], df_group[col], 'o-', label=col)
-                
-                if len(df_group["DATETIME"]) > 0:
-                    ax.set_xticks(df_group["DATETIME"])
-                    ax.set_xticklabels(df_group["DATETIME"].dt.strftime("%H:%M"), rotation=45)
-                ax.set_xlabel("Jam")
-
-            else:  # Rentang Tanggal
-                for col in parameter:
-                    ax.plot(df_group["DATETIME"], df_group[col], marker="o", label=col)
-                ax.set_xlabel("Tanggal dan Waktu")
-
-            ax.set_ylabel("Nilai")
-            ax.set_title(f"Grafik Parameter Transmisi ({opsi_agregasi})")
-            ax.legend()
-            ax.grid(True)
-            plt.tight_layout()
-            st.pyplot(fig)
+        if parameter and not df_group.empty:
+            with ukur("render_grafik"):
+                fig = buat_grafik_parameter(df_group, parameter, opsi_agregasi, slot_hilang=slot_kosong)
+                st.pyplot(fig)
 
         elif parameter and df_group.empty:
             st.warning("⚠️ Tidak ada data untuk rentang yang dipilih.")
         
+        # Batas tanggal bersama untuk bagian SLA & peta bitrate
+        max_date_sla = df_viz["TANGGAL"].max().date()
+        min_date_sla = df_viz["TANGGAL"].min().date()
+
+        # SLA / Availability per kanal untuk rentang tanggal
+        with bagian_halaman("SLA & Availability Kanal"):
+            st.subheader("📶 SLA & Availability Kanal")
+            col_start_sla, col_end_sla = st.columns(2)
+            start_date_sla = col_start_sla.date_input(
+                "Tanggal Awal SLA",
+                value=max(min_date_sla, max_date_sla.replace(day=1)),
+                min_value=min_date_sla,
+                max_value=max_date_sla,
+                key="sla_start_date"
+            )
+            end_date_sla = col_end_sla.date_input(
+                "Tanggal Akhir SLA",
+                value=max_date_sla,
+                min_value=min_date_sla,
+                max_value=max_date_sla,
+                key="sla_end_date"
+            )
+            if start_date_sla > end_date_sla:
+                st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir untuk tabel SLA.")
+            else:
+                with ukur("sla"):
+                    df_sla = get_sla_index(spreadsheet_id, shared_store.revisi(data_sheet)).tabel(start_date_sla, end_date_sla)
+                st.dataframe(df_sla, use_container_width=True, hide_index=True)
+                st.caption("Availability = bacaan dengan status kanal OK; Sesuai Kontrak = bitrate di rentang Normal.")
+
+        # Peta status bitrate: pola berulang pada jam tertentu (sun outage, penurunan encoder malam hari)
+        with bagian_halaman("Peta Status Bitrate"):
+            st.subheader("🟩 Peta Status Bitrate (Hari × Slot)")
+            col_kanal, col_start_peta, col_end_peta = st.columns(3)
+            kanal_peta = col_kanal.selectbox("Kanal", list(KANAL_TV), key="peta_kanal")
+            start_date_peta = col_start_peta.date_input(
+                "Tanggal Awal Peta",
+                value=max(min_date_sla, max_date_sla - datetime.timedelta(days=60)),
+                min_value=min_date_sla,
+                max_value=max_date_sla,
+                key="peta_start_date"
+            )
+            end_date_peta = col_end_peta.date_input(
+                "Tanggal Akhir Peta",
+                value=max_date_sla,
+                min_value=min_date_sla,
+                max_value=max_date_sla,
+                key="peta_end_date"
+            )
+            if start_date_peta > end_date_peta:
+                st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir untuk peta bitrate.")
+            else:
+                revisi_meter = shared_store.revisi(data_sheet)
+                with ukur("render_peta_bitrate"):
+                    st.image(gambar_peta_bitrate(spreadsheet_id, revisi_meter, kanal_peta, start_date_peta, end_date_peta))
+                    df_peta = get_peta_bitrate(spreadsheet_id, revisi_meter).ringkasan(kanal_peta, start_date_peta, end_date_peta)
+                st.dataframe(df_peta, use_container_width=True, hide_index=True)
+                st.caption("Sel yang dilingkari bertepatan dengan jendela sun outage (interferensi matahari pada downlink satelit).")
+
+                with st.expander("☀️ Jadwal Sun Outage & Bitrate Trouble Terkait"):
+                    jadwal_peta = jadwal_sun_outage_rentang(start_date_peta, end_date_peta)
+                    awal_peta = pd.Timestamp(start_date_peta)
+                    akhir_peta = pd.Timestamp(end_date_peta) + pd.Timedelta(days=1)
+                    st.dataframe(
+                        jadwal_peta[(jadwal_peta["Mulai"] >= awal_peta) & (jadwal_peta["Mulai"] < akhir_peta)],
+                        use_container_width=True, hide_index=True,
+                    )
+                    df_rentang_peta = df_viz[(df_viz["DATETIME"] >= awal_peta) & (df_viz["DATETIME"] < akhir_peta)]
+                    df_trouble_outage = trouble_saat_outage(df_rentang_peta, jadwal_peta)
+                    if df_trouble_outage.empty:
+                        st.caption("Tidak ada bacaan bitrate Trouble yang bertepatan dengan jendela sun outage.")
+                    else:
+                        st.markdown(f"**{len(df_trouble_outage)} bacaan bitrate Trouble** bertepatan dengan jendela sun outage:")
+                        st.dataframe(df_trouble_outage, use_container_width=True, hide_index=True)
+
+        # Laporan bulanan untuk mitra kanal & manajemen
+        with bagian_halaman("Laporan Bulanan"):
+            st.subheader("🗓️ Laporan Bulanan SLA & Maintenance")
+            col_bulan, col_format = st.columns(2)
+            pilihan_bulan = sorted(set(daftar_bulan(df_viz)) | set(bulan_arsip()), reverse=True)
+            bulan_laporan = col_bulan.selectbox("Bulan", pilihan_bulan, key="bulan_laporan")
+            format_laporan = col_format.radio("Format", ["Excel", "PDF"], horizontal=True, key="format_laporan")
+            if bulan_laporan:
+                # Pastikan snapshot catatan sudah dimuat agar revisinya ikut menjadi kunci cache
+                shared_store.snapshot(notes_sheet)
+                isi_laporan = laporan_bulanan(
+                    spreadsheet_id, bulan_laporan, format_laporan,
+                    shared_store.revisi(data_sheet), shared_store.revisi(notes_sheet),
+                )
+                st.download_button(
+                    label=f"⬇️ Download Laporan {bulan_laporan} ({format_laporan})",
+                    data=isi_laporan,
+                    file_name=f"laporan_sla_{bulan_laporan}.{'pdf' if format_laporan == 'PDF' else 'xlsx'}",
+                    mime="application/pdf" if format_laporan == "PDF"
+                    else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
         # Data Tersimpan + Pilihan Tampilan
         st.subheader("📑 Data Tersimpan (Metering)")
 
-        df_display = df_viz.sort_values(by="DATETIME", ascending=False).drop(columns=['DATETIME'], errors='ignore').copy()
+        # Status per parameter tetap ada di file download; tabel cukup menampilkan STATUS TERBURUK
+        kolom_status = [kol for kol in df_viz.columns if kol.startswith("STATUS ") and kol != "STATUS TERBURUK"]
+        df_display = df_viz.iloc[::-1].drop(columns=['DATETIME'] + kolom_status, errors='ignore')
 
         if 'TANGGAL' in df_display.columns:
             df_display['TANGGAL'] = df_display['TANGGAL'].dt.strftime('%Y-%m-%d')
@@ -1111,6 +1017,9 @@ def show_visualisasi_data():
         st.write("Pilih rentang tanggal untuk data yang ingin diunduh.")
 
         min_date_dl = df_viz["TANGGAL"].min().date()
+        if bulan_arsip():
+            # Rentang download boleh mencapai partisi arsip
+            min_date_dl = min(min_date_dl, pd.Timestamp(f"{bulan_arsip()[0]}-01").date())
         max_date_dl = df_viz["TANGGAL"].max().date()
 
         col_start_dl, col_end_dl = st.columns(2)
@@ -1131,25 +1040,20 @@ def show_visualisasi_data():
             key="dl_end_date"
         )
         
-        df_download = df_viz.copy()
-
         if start_date_dl > end_date_dl:
             st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir untuk proses download.")
             df_download = pd.DataFrame() 
         else:
-            start_datetime_dl = pd.to_datetime(start_date_dl)
-            end_datetime_exclusive_dl = pd.to_datetime(end_date_dl) + pd.Timedelta(days=1)
-            
-            df_download = df_viz[(df_viz["DATETIME"] >= start_datetime_dl) & (df_viz["DATETIME"] < end_datetime_exclusive_dl)].copy()
+            with ukur("data_download"):
+                df_download = data_metering_rentang(start_date_dl, end_date_dl).copy()
 
         df_download = df_download.drop(columns=['DATETIME'], errors='ignore')
         if 'TANGGAL' in df_download.columns:
             df_download['TANGGAL'] = df_download['TANGGAL'].dt.strftime('%Y-%m-%d')
 
         if not df_download.empty:
-            buffer = BytesIO()
-            df_download.to_excel(buffer, index=False) 
-            buffer.seek(0)
+            with ukur("export_excel"):
+                buffer = ke_excel(df_download)
 
             st.download_button(
                 label="⬇️ Download Data (Excel)",
@@ -1173,7 +1077,7 @@ def show_ceklist_harian():
     st.title("✅ Ceklist Harian Digital")
     st.write("Pilih kondisi tiap parameter.")
     
-    HOUR_OPTIONS = ['Shift 1: 00.00 - 08.00', 'Shift 2: 08:00 - 16.00', 'Shift 3: 16:00 - 00.00']
+    HOUR_OPTIONS = SHIFT_CEKLIST
 
     # --- Definisikan Kolom Final untuk Konsistensi Data ---
     FINAL_COLUMNS = [
@@ -1198,60 +1102,110 @@ def show_ceklist_harian():
         
     st.markdown("---")
     
-    # --- CHECKLIST ITEMS (OUTSIDE FORM FOR INSTANT UPDATE) ---
+    # --- CHECKLIST ITEMS (SETIAP KARTU ADALAH FRAGMENT: KLIK RADIO HANYA MERENDER KARTU ITU) ---
     st.subheader("Pilihan Kondisi Perangkat")
-    hasil_ceklist = {}
-    
-    for param, kondisi in ceklist_rules.items():
-        st.markdown(f"**{param}**")
+    for param in ceklist_rules.keys():
+        kartu_ceklist(param)
+
+    # --- ACTION BUTTONS ---
+    col_rekom, col_simpan = st.columns(2)
+    with col_rekom:
+        rekomendasi_ceklist()
+    simpan_catatan = col_simpan.button("💾 Simpan Catatan Harian")
+
+    if simpan_catatan:
+        hasil_ceklist = hasil_ceklist_sesi()
+        data_simpan_horizontal = {
+            "TANGGAL_CEKLIST": [pd.to_datetime(tanggal_catatan).strftime("%Y-%m-%d")],
+            "JAM_CEKLIST": [jam_catatan],
+            "OPERATOR_CEKLIST": [operator_catatan],
+        }
         
-        if f"ceklist_{param}" not in st.session_state:
-            st.session_state[f"ceklist_{param}"] = "Normal"
+        for param, data in hasil_ceklist.items():
+            kondisi_key = f"{param}_KONDISI"
+            rekom_key = f"{param}_REKOMENDASI"
             
-        pilihan = st.radio(
-            f"Kondisi {param}", 
-            ["Normal", "Warning", "Trouble"], 
-            horizontal=True, 
-            key=f"ceklist_{param}",
-            label_visibility="collapsed"
-        )
-        
-        deskripsi = kondisi[pilihan]['deskripsi']
-        rekomendasi = kondisi[pilihan]['rekom']
+            data_simpan_horizontal[kondisi_key] = [data["Kondisi"]]
+            data_simpan_horizontal[rekom_key] = [data["Rekomendasi"]] 
 
-        # === CARD PUTIH UNTUK DESKRIPSI SETIAP PARAMETER ===
-        st.markdown(
-            f"""
-            <div style="
-                background-color: rgba(255, 255, 255, 0.85);
-                padding: 10px 15px;
-                border-radius: 10px;
-                margin-top: 5px;
-                margin-bottom: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                border: 1px solid rgba(200,200,200,0.4);
-            ">
-                <b>📌 {deskripsi}</b><br>
-                <small><i>{rekomendasi}</i></small>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        df_new_notes = pd.DataFrame(data_simpan_horizontal)
+        df_new_notes = df_new_notes.reindex(columns=FINAL_COLUMNS, fill_value=None)
+        df_new_notes = tambah_kolom_turunan_catatan(df_new_notes)
         
+        # Tambahkan catatan baru di akhir sheet 'CATATAN_HARIAN' (tanpa membaca ulang seluruh sheet)
+        if save_data(df_new_notes, notes_sheet, mode="append"):
+            st.success(f"✅ Catatan harian berhasil disimpan ke Google Sheet **{notes_sheet}**!")
+
+    # --- Tampilkan & Download Data Catatan Harian (fragment terpisah) ---
+    riwayat_ceklist()
+    keandalan_perangkat()
+    unduh_ceklist()
+
+
+# ===========================
+# Fragment Halaman Ceklist (rerun parsial)
+# ===========================
+def hasil_ceklist_sesi():
+    """Kondisi, deskripsi, dan rekomendasi tiap parameter dari pilihan radio di session_state."""
+    hasil_ceklist = {}
+    for param, kondisi in ceklist_rules.items():
+        pilihan = st.session_state.get(f"ceklist_{param}", "Normal")
         hasil_ceklist[param] = {
             "Kondisi": pilihan,
-            "Deskripsi": deskripsi,
-            "Rekomendasi": rekomendasi
+            "Deskripsi": kondisi[pilihan]['deskripsi'],
+            "Rekomendasi": kondisi[pilihan]['rekom']
         }
+    return hasil_ceklist
 
-    # --- ACTION BUTTONS ---
-    col_rekom, col_simpan = st.columns(2)
-    lihat_rekom = col_rekom.button("📋 Tampilkan Rekomendasi")
-    simpan_catatan = col_simpan.button("💾 Simpan Catatan Harian")
 
-    if lihat_rekom:
+@st.experimental_fragment
+def kartu_ceklist(param):
+    """Satu kartu parameter: radio kondisi + deskripsi. Klik radio hanya me-rerun kartu ini."""
+    kondisi = ceklist_rules[param]
+    st.markdown(f"**{param}**")
+    
+    if f"ceklist_{param}" not in st.session_state:
+        st.session_state[f"ceklist_{param}"] = "Normal"
+        
+    pilihan = st.radio(
+        f"Kondisi {param}", 
+        ["Normal", "Warning", "Trouble"], 
+        horizontal=True, 
+        key=f"ceklist_{param}",
+        label_visibility="collapsed"
+    )
+    
+    deskripsi = kondisi[pilihan]['deskripsi']
+    rekomendasi = kondisi[pilihan]['rekom']
+
+    # === CARD PUTIH UNTUK DESKRIPSI SETIAP PARAMETER ===
+    st.markdown(
+        f"""
+        <div style="
+            background-color: rgba(255, 255, 255, 0.85);
+            padding: 10px 15px;
+            border-radius: 10px;
+            margin-top: 5px;
+            margin-bottom: 10px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            border: 1px solid rgba(200,200,200,0.4);
+        ">
+            <b>📌 {deskripsi}</b><br>
+            <small><i>{rekomendasi}</i></small>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+@st.experimental_fragment
+def rekomendasi_ceklist():
+    """Tombol & card rekomendasi maintenance; dibaca dari pilihan terbaru saat tombol diklik."""
+    if not st.button("📋 Tampilkan Rekomendasi"):
+        return
+
     # Card besar putih solid
-        st.markdown(
+    st.markdown(
         """
         <div style="
             background-color: #ffffff;
@@ -1270,7 +1224,7 @@ def show_ceklist_harian():
     )
 
     # tampilkan tiap item
-    for p, data in hasil_ceklist.items():
+    for p, data in hasil_ceklist_sesi().items():
         # warna tulisan sesuai status
         if data["Kondisi"] == "Normal":
             color = "#1b1b1b"
@@ -1298,80 +1252,355 @@ def show_ceklist_harian():
 
     st.markdown("</div>", unsafe_allow_html=True)
 
-    if simpan_catatan:
-        data_simpan_horizontal = {
-            "TANGGAL_CEKLIST": [pd.to_datetime(tanggal_catatan).strftime("%Y-%m-%d")],
-            "JAM_CEKLIST": [jam_catatan],
-            "OPERATOR_CEKLIST": [operator_catatan],
-        }
-        
-        for param, data in hasil_ceklist.items():
-            kondisi_key = f"{param}_KONDISI"
-            rekom_key = f"{param}_REKOMENDASI"
-            
-            data_simpan_horizontal[kondisi_key] = [data["Kondisi"]]
-            data_simpan_horizontal[rekom_key] = [data["Rekomendasi"]] 
 
-        df_new_notes = pd.DataFrame(data_simpan_horizontal)
-        df_new_notes = df_new_notes.reindex(columns=FINAL_COLUMNS, fill_value=None)
-        
-        # PANGGILAN BARU: Menggunakan get_data() yang sudah di-cache
-        df_existing_notes = get_data(spreadsheet_id, notes_sheet)
-        
-        if not df_existing_notes.empty and 'TANGGAL_CEKLIST' in df_existing_notes.columns:
-             df_existing_notes['TANGGAL_CEKLIST'] = pd.to_datetime(df_existing_notes['TANGGAL_CEKLIST'], errors='coerce').dt.strftime('%Y-%m-%d')
-        
-        if not df_existing_notes.empty:
-             df_existing_notes = df_existing_notes.reindex(columns=FINAL_COLUMNS, fill_value=None)
-             df_all_notes = pd.concat([df_existing_notes, df_new_notes], ignore_index=True)
-        else:
-             df_all_notes = df_new_notes
+def tabel_catatan(df_notes):
+    """Data catatan harian siap tampil (terbaru di atas) dari snapshot bersama `df_notes`."""
+    # Salin dulu: snapshot dipakai bersama semua sesi dan kolomnya diubah di bawah
+    df_notes_display = df_notes.copy()
+    if df_notes_display.empty:
+        return df_notes_display
+
+    # TANGGAL_WAKTU sudah tersimpan bersama catatan (tidak dihitung ulang di sini)
+    if 'TANGGAL_WAKTU' in df_notes_display.columns:
+        df_notes_display = df_notes_display.iloc[::-1].sort_values(by='TANGGAL_WAKTU', ascending=False, kind='stable')
+    
+    if 'TANGGAL_CEKLIST' in df_notes_display.columns:
+        df_notes_display['TANGGAL_CEKLIST'] = df_notes_display['TANGGAL_CEKLIST'].dt.strftime('%Y-%m-%d')
+    
+    cols_to_drop = ['TANGGAL_WAKTU'] 
+    return df_notes_display.drop(columns=cols_to_drop, errors='ignore')
 
-        # Simpan DataFrame gabungan ke Google Sheet 'CATATAN_HARIAN'
-        if save_data(df_all_notes, notes_sheet):
-            st.success(f"✅ Catatan harian berhasil disimpan ke Google Sheet **{notes_sheet}**!")
 
-    # --- Tampilkan Data Catatan Harian ---
+@st.experimental_fragment
+def riwayat_ceklist():
     st.subheader("📑 Data Tersimpan (Catatan Harian)")
-    df_notes_display = get_data(spreadsheet_id, notes_sheet) # PANGGILAN BARU
+    df_notes_display = tabel_catatan(get_data(spreadsheet_id, notes_sheet))
 
     if df_notes_display.empty:
         st.info("Belum ada catatan harian yang tersimpan.")
     else:
-        if 'TANGGAL_CEKLIST' in df_notes_display.columns:
-            df_notes_display['TANGGAL_CEKLIST'] = pd.to_datetime(df_notes_display['TANGGAL_CEKLIST'], errors='coerce')
-        
-        if 'TANGGAL_CEKLIST' in df_notes_display.columns and 'JAM_CEKLIST' in df_notes_display.columns:
-            
-            df_notes_display['TANGGAL_WAKTU'] = df_notes_display['TANGGAL_CEKLIST'].dt.strftime('%Y-%m-%d') + ' ' + df_notes_display['JAM_CEKLIST'].astype(str).str.split(':').str[0]
-            df_notes_display['TANGGAL_WAKTU'] = pd.to_datetime(df_notes_display['TANGGAL_WAKTU'], errors='coerce')
-            
-            df_notes_display = df_notes_display.sort_values(by='TANGGAL_WAKTU', ascending=False)
-        
-        if 'TANGGAL_CEKLIST' in df_notes_display.columns:
-            df_notes_display['TANGGAL_CEKLIST'] = df_notes_display['TANGGAL_CEKLIST'].dt.strftime('%Y-%m-%d')
-        
-        cols_to_drop = ['TANGGAL_WAKTU'] 
-        df_notes_display = df_notes_display.drop(columns=cols_to_drop, errors='ignore')
-        
         st.dataframe(df_notes_display, use_container_width=True)
 
-    # --- Download Data Catatan Harian ---
-    if not df_notes_display.empty:
-        st.subheader("📥 Download Data (Catatan Harian)")
-        buffer_notes = BytesIO()
-        
-        df_notes_download = df_notes_display.copy()
-        
-        df_notes_download.to_excel(buffer_notes, index=False)
-        buffer_notes.seek(0)
-
-        st.download_button(
-            label="⬇️ Download Catatan Harian (Excel)",
-            data=buffer_notes,
-            file_name="catatan_harian_mux_tvri.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+@st.experimental_fragment
+def keandalan_perangkat():
+    df_notes = get_data(spreadsheet_id, notes_sheet)
+    if df_notes.empty:
+        return
+
+    st.subheader("🔁 Keandalan Perangkat (MTBF / MTTR)")
+    with ukur("indeks_transisi"):
+        indeks = get_indeks_transisi(spreadsheet_id)
+        indeks.sinkron(df_notes, shared_store.revisi(notes_sheet))
+        df_statistik = indeks.statistik()
+    st.dataframe(df_statistik, use_container_width=True, hide_index=True)
+    st.caption("Gangguan = kondisi Warning/Trouble berturut-turut. MTBF = total waktu Normal ÷ jumlah gangguan; "
+               "MTTR = rata-rata lama gangguan sampai kembali Normal.")
+
+    perangkat = st.selectbox("Riwayat kondisi perangkat", indeks.perangkat, key="transisi_perangkat")
+    st.dataframe(indeks.riwayat(perangkat), use_container_width=True, hide_index=True)
+
+
+@st.cache_data(max_entries=4)
+def excel_catatan(sheet_id, revisi, _df_notes):
+    """File Excel catatan harian, dibuat sekali per revisi snapshot (bukan setiap rerun).
+    Snapshot diterima sebagai argumen (tidak di-hash, kunci cukup revisi) agar tidak ada pemanggilan UI di dalam cache."""
+    with ukur("export_excel"):
+        return ke_excel(tabel_catatan(_df_notes)).getvalue()
+
+
+@st.experimental_fragment
+def unduh_ceklist():
+    df_notes = get_data(spreadsheet_id, notes_sheet)
+    if df_notes.empty:
+        return
+
+    st.subheader("📥 Download Data (Catatan Harian)")
+    st.download_button(
+        label="⬇️ Download Catatan Harian (Excel)",
+        data=excel_catatan(spreadsheet_id, shared_store.revisi(notes_sheet), df_notes),
+        file_name="catatan_harian_mux_tvri.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+
+# ===========================
+# Fungsi Halaman Kelengkapan Data (Slot Hilang)
+# ===========================
+def _tampilkan_kelengkapan(df_data, df_hilang, total_slot, slot, kolom_tanggal, kolom_operator, label):
+    hilang = len(df_hilang)
+    col_total, col_hilang, col_patuh = st.columns(3)
+    col_total.metric(f"Slot {label} Diharapkan", total_slot)
+    col_hilang.metric("Slot Hilang", hilang)
+    col_patuh.metric("Kepatuhan", f"{(total_slot - hilang) / total_slot * 100:.1f}%" if total_slot else "-")
+
+    st.markdown("**Slot hilang per hari** (hanya hari yang tidak lengkap)")
+    df_hari = hilang_per_hari(df_hilang, slot)
+    if df_hari.empty:
+        st.success(f"✅ Semua slot {label.lower()} pada rentang ini sudah tercatat.")
+    else:
+        st.dataframe(df_hari, use_container_width=True, hide_index=True)
+
+    st.markdown("**Kepatuhan per operator**")
+    st.dataframe(
+        hilang_per_operator(df_data, df_hilang, kolom_tanggal, kolom_operator),
+        use_container_width=True, hide_index=True
+    )
+
+
+def show_kelengkapan_data():
+    st.title("🕳️ Kelengkapan Data")
+    st.write("Slot bacaan metering (6 per hari) dan shift ceklist (3 per hari) yang belum tercatat.")
+
+    hari_ini = datetime.date.today()
+    col_start, col_end = st.columns(2)
+    start_date = col_start.date_input("Tanggal Awal", value=hari_ini - datetime.timedelta(days=30), key="gap_start_date")
+    end_date = col_end.date_input("Tanggal Akhir", value=hari_ini, max_value=hari_ini, key="gap_end_date")
+    if start_date > end_date:
+        st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir.")
+        return
+
+    # Slot hari ini yang jamnya belum lewat tidak dihitung hilang
+    sekarang = pd.Timestamp.now()
+
+    tab_meter, tab_ceklist = st.tabs(["📈 Metering", "✅ Ceklist Harian"])
+    with tab_meter, ukur("deteksi_slot_hilang"):
+        df_meter = data_metering_rentang(start_date, end_date)
+        df_hilang = slot_hilang_metering(df_meter, start_date, end_date, sebelum=sekarang)
+        total_slot = jumlah_slot(start_date, end_date, SLOT_METERING, sebelum=sekarang)
+        _tampilkan_kelengkapan(df_meter, df_hilang, total_slot, SLOT_METERING, "TANGGAL", "OPERATOR", "Metering")
+
+    with tab_ceklist, ukur("deteksi_slot_hilang"):
+        df_notes = filter_range(get_data(spreadsheet_id, notes_sheet), "TANGGAL_CEKLIST", start_date, end_date)
+        df_hilang_notes = slot_hilang_ceklist(df_notes, start_date, end_date, sebelum=sekarang)
+        total_shift = jumlah_slot(start_date, end_date, JAM_MULAI_SHIFT, sebelum=sekarang)
+        _tampilkan_kelengkapan(df_notes, df_hilang_notes, total_shift, SHIFT_CEKLIST, "TANGGAL_CEKLIST", "OPERATOR_CEKLIST", "Ceklist")
+
+
+# ===========================
+# Fungsi Halaman Korelasi Parameter
+# ===========================
+def show_korelasi_parameter():
+    st.title("🔗 Korelasi Parameter")
+    st.write("Parameter metering & bitrate kanal yang bergerak bersama pada rentang terpilih "
+             "(bacaan diselaraskan ke slot 4 jam).")
+
+    df_meter = get_data(spreadsheet_id, data_sheet)
+    grid = get_grid_slot(spreadsheet_id, shared_store.revisi(data_sheet))
+    if df_meter.empty or len(grid) == 0:
+        st.info("⚠️ Belum ada data. Silakan input dulu di menu **Input Data & Kalkulator**.")
+        return
+
+    min_date = pd.Timestamp(grid.waktu[0]).date()
+    max_date = pd.Timestamp(grid.waktu[-1]).date()
+    col_start, col_end = st.columns(2)
+    start_date = col_start.date_input(
+        "Tanggal Awal", value=max(min_date, max_date - datetime.timedelta(days=30)),
+        min_value=min_date, max_value=max_date, key="kor_start_date"
+    )
+    end_date = col_end.date_input("Tanggal Akhir", value=max_date, min_value=min_date, max_value=max_date, key="kor_end_date")
+    col_lag, col_ambang = st.columns(2)
+    maks_lag_jam = col_lag.select_slider("Lag maksimal (jam)", options=[0, 4, 8, 12, 24], value=0, key="kor_lag")
+    ambang = col_ambang.slider("Ambang |korelasi|", min_value=0.3, max_value=0.95, value=AMBANG_KORELASI, step=0.05, key="kor_ambang")
+    if start_date > end_date:
+        st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir.")
+        return
+
+    with ukur("korelasi"):
+        hasil = analisis_korelasi(grid, start_date, end_date, maks_lag_jam // JAM_PER_SLOT, ambang)
+
+    st.subheader("Kelompok yang Bergerak Bersama")
+    if hasil["kelompok"].empty:
+        st.info("Tidak ada kelompok parameter dengan |korelasi| ≥ ambang pada rentang ini.")
+    else:
+        st.dataframe(hasil["kelompok"], use_container_width=True, hide_index=True)
+        st.dataframe(hasil["pasangan"], use_container_width=True, hide_index=True)
+        st.caption("Lag positif: Parameter A berubah lebih dulu, Parameter B mengikuti setelah sekian jam.")
+
+    st.subheader("Matriks Korelasi")
+    st.dataframe(
+        hasil["matriks"].style.background_gradient(cmap="RdBu_r", vmin=-1, vmax=1).format("{:.2f}", na_rep="-"),
+        use_container_width=True
+    )
+
+    st.subheader("Korelasi Bergulir")
+    col_a, col_b, col_jendela = st.columns(3)
+    param_a = col_a.selectbox("Parameter A", grid.kolom, index=grid.kolom.index("C/N (dB)") if "C/N (dB)" in grid.kolom else 0, key="kor_param_a")
+    param_b = col_b.selectbox("Parameter B", grid.kolom, index=grid.kolom.index("MARGIN (dB)") if "MARGIN (dB)" in grid.kolom else 0, key="kor_param_b")
+    jendela_hari = col_jendela.number_input("Jendela (hari)", min_value=1, max_value=30, value=7, step=1, key="kor_jendela")
+    with ukur("korelasi_bergulir"):
+        df_bergulir = korelasi_bergulir(grid, param_a, param_b, start_date, end_date, int(jendela_hari))
+    st.line_chart(df_bergulir, x="DATETIME", y="Korelasi")
+
+
+# ===========================
+# Fungsi Halaman Kualitas Daya 3 Fasa
+# ===========================
+def show_kualitas_daya():
+    st.title("⚡ Kualitas Daya 3 Fasa")
+    st.write(
+        f"Imbalance tegangan R/S/T (Normal ≤ {BATAS_IMBALANCE['Normal']:g}%, Warning ≤ {BATAS_IMBALANCE['Warning']:g}%), "
+        f"deviasi tiap fasa dari {TEGANGAN_NOMINAL:g} V, serta kejadian sag (< {BATAS_SAG * TEGANGAN_NOMINAL:g} V) "
+        f"dan swell (> {BATAS_SWELL * TEGANGAN_NOMINAL:g} V)."
+    )
+
+    df_meter = get_data(spreadsheet_id, data_sheet)
+    analisis = get_analisis_daya(spreadsheet_id, shared_store.revisi(data_sheet))
+    if df_meter.empty or len(analisis.waktu) == 0:
+        st.info("⚠️ Belum ada data. Silakan input dulu di menu **Input Data & Kalkulator**.")
+        return
+
+    min_date = pd.Timestamp(analisis.waktu[0]).date()
+    max_date = pd.Timestamp(analisis.waktu[-1]).date()
+    col_start, col_end = st.columns(2)
+    start_date = col_start.date_input(
+        "Tanggal Awal", value=max(min_date, max_date - datetime.timedelta(days=30)),
+        min_value=min_date, max_value=max_date, key="daya_start_date"
+    )
+    end_date = col_end.date_input("Tanggal Akhir", value=max_date, min_value=min_date, max_value=max_date, key="daya_end_date")
+    if start_date > end_date:
+        st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir.")
+        return
+
+    col_ringkasan, col_kejadian = st.columns([1, 2])
+    with col_ringkasan:
+        st.subheader("Ringkasan")
+        st.dataframe(analisis.ringkasan(start_date, end_date).astype({"Nilai": str}), use_container_width=True, hide_index=True)
+    with col_kejadian:
+        st.subheader("Kejadian Sag / Swell")
+        df_kejadian = analisis.kejadian_rentang(start_date, end_date)
+        if df_kejadian.empty:
+            st.success("✅ Tidak ada kejadian sag/swell pada rentang ini.")
+        else:
+            st.dataframe(df_kejadian, use_container_width=True, hide_index=True)
+
+    with ukur("render_grafik"):
+        fig = analisis.grafik(start_date, end_date)
+        st.pyplot(fig)
+        plt.close(fig)
+
+
+# ===========================
+# Fungsi Halaman Pencarian Catatan
+# ===========================
+def show_pencarian_catatan():
+    st.title("🔎 Pencarian Catatan")
+    st.write('Cari di catatan/keterangan metering, operator, kondisi & rekomendasi ceklist. '
+             'Gunakan "tanda kutip" untuk frasa dan akhiran * untuk awalan kata (mis. konektor*).')
+
+    pencarian = get_pencarian(spreadsheet_id)
+    with ukur("indeks_pencarian"):
+        for nama_sheet in (data_sheet, notes_sheet):
+            pencarian.sinkron(nama_sheet, get_data(spreadsheet_id, nama_sheet), shared_store.revisi(nama_sheet))
+
+    kueri = st.text_input("Kata kunci", key="cari_kueri", placeholder='mis. "konektor longgar" hujan')
+    col_start, col_end, col_sumber = st.columns([1, 1, 2])
+    hari_ini = datetime.date.today()
+    start_date = col_start.date_input("Tanggal Awal", value=hari_ini - datetime.timedelta(days=365), key="cari_start_date")
+    end_date = col_end.date_input("Tanggal Akhir", value=hari_ini, key="cari_end_date")
+    sumber = col_sumber.multiselect("Sumber", ["Metering", "Ceklist"], default=["Metering", "Ceklist"], key="cari_sumber")
+    if start_date > end_date:
+        st.error("Tanggal Awal tidak boleh setelah Tanggal Akhir.")
+        return
+    if not kueri.strip():
+        return
+
+    with ukur("cari_catatan"):
+        df_hasil, total = pencarian.cari(kueri, start_date, end_date, sumber)
+    if total == 0:
+        st.info("Tidak ada catatan yang cocok.")
+        return
+    st.caption(f"{total} catatan cocok" + (f", menampilkan {len(df_hasil)} terbaru" if total > len(df_hasil) else ""))
+    df_hasil["Waktu"] = df_hasil["Waktu"].dt.strftime("%Y-%m-%d %H:%M")
+    st.dataframe(df_hasil, use_container_width=True, hide_index=True)
+
+
+# ===========================
+# Panel Versi Rules & Penilaian Ulang (khusus admin)
+# ===========================
+def panel_versi_rules():
+    with st.sidebar.expander("🔁 Versi Rules & Penilaian Ulang (Admin)"):
+        st.caption(f"Versi rules berlaku: `{VERSI_RULES}`")
+        df_meter = get_data(spreadsheet_id, data_sheet)
+        if df_meter.empty:
+            return
+        versi = df_meter[KOLOM_VERSI].fillna("").astype(str) if KOLOM_VERSI in df_meter.columns \
+            else pd.Series("", index=df_meter.index)
+        df_versi = versi.replace("", "(tanpa versi)").value_counts().rename_axis("Versi").reset_index(name="Baris")
+        st.dataframe(df_versi, use_container_width=True, hide_index=True)
+        # Tabel di atas hanya periode aktif; partisi arsip dibaca saat penilaian ulang dijalankan
+        partisi = storage.manifest(data_sheet) if isinstance(storage, ArsipBackend) else pd.DataFrame()
+        if (versi == VERSI_RULES).all():
+            if partisi.empty:
+                return
+            st.caption(f"Periode aktif sudah memakai versi berlaku; {len(partisi)} partisi arsip bulanan "
+                       "diperiksa dan dinilai ulang bila perlu saat tombol ditekan.")
+        if st.button("Nilai ulang histori", key="nilai_ulang_rules"):
+            with st.spinner("Menilai ulang baris dari versi rules lama..."), ukur("penilaian_ulang"):
+                arsip_rules = get_arsip_rules(spreadsheet_id, VERSI_RULES)
+                # Data mentah (format tersimpan) agar baris yang ditulis ulang tidak berubah format tanggalnya
+                df_tulis, df_ringkasan = nilai_ulang(storage.load(data_sheet), arsip_rules)
+                jumlah_arsip, ringkasan_arsip = (0, None) if partisi.empty \
+                    else nilai_ulang_arsip(storage, data_sheet, arsip_rules)
+            if df_tulis.empty and jumlah_arsip == 0:
+                st.success("Semua status sudah konsisten dengan rules berlaku.")
+            elif df_tulis.empty or save_data(df_tulis, data_sheet, mode="upsert", keys=["TANGGAL", "WAKTU"]):
+                st.success(f"{len(df_tulis)} baris periode aktif dan {jumlah_arsip} baris arsip ditulis ulang "
+                           f"dengan versi `{VERSI_RULES}`.")
+            if ringkasan_arsip is not None:
+                df_ringkasan = gabung_ringkasan([df_ringkasan, ringkasan_arsip])
+            if not df_ringkasan.empty:
+                st.dataframe(df_ringkasan, use_container_width=True, hide_index=True)
+
+
+# ===========================
+# Panel Arsip Partisi Metering (khusus admin)
+# ===========================
+def panel_arsip():
+    with st.sidebar.expander("🗄️ Arsip Partisi Metering (Admin)"):
+        manifest = storage.manifest(data_sheet)
+        st.caption(
+            f"Periode aktif {data_sheet}: {storage.bulan_aktif} bulan terakhir · "
+            f"{len(manifest)} partisi arsip bulanan."
         )
+        if not manifest.empty:
+            st.dataframe(manifest[["BULAN", "BARIS"]].iloc[::-1], use_container_width=True, hide_index=True)
+        if st.button("Arsipkan sekarang", key="arsipkan_sekarang"):
+            with st.spinner("Memindahkan bacaan lama ke partisi arsip..."), ukur("arsipkan"):
+                bulan = storage.arsipkan(data_sheet)
+            shared_store.invalidate(data_sheet)
+            st.success(f"{len(bulan)} bulan diarsipkan." if bulan else "Tidak ada bacaan sebelum periode aktif.")
+
+
+# ===========================
+# Panel Riwayat Versi & Rollback (khusus admin)
+# ===========================
+def lapisan_riwayat():
+    """RiwayatBackend di dalam tumpukan backend (mis. di bawah ArsipBackend); None jika riwayat tidak aktif."""
+    lapisan = storage
+    while lapisan is not None and not isinstance(lapisan, RiwayatBackend):
+        lapisan = getattr(lapisan, "backend", None)
+    return lapisan
+
+def panel_riwayat(riwayat):
+    with st.sidebar.expander("🕘 Riwayat Versi & Rollback (Admin)"):
+        nama_sheet = st.selectbox("Sheet", [data_sheet, notes_sheet], key="riwayat_sheet")
+        df_riwayat = riwayat.riwayat(nama_sheet)
+        if df_riwayat.empty:
+            st.caption("Belum ada versi tercatat; riwayat dimulai pada penyimpanan berikutnya.")
+            return
+        st.dataframe(df_riwayat.head(20), use_container_width=True, hide_index=True)
+        versi = st.selectbox("Kembalikan ke versi", df_riwayat["Versi"].iloc[1:].tolist(), key="riwayat_versi")
+        if versi is None or not st.button(f"Rollback ke v{versi}", key="riwayat_rollback"):
+            return
+        try:
+            with st.spinner(f"Membangun versi {versi} dan menulis ulang {nama_sheet}..."), ukur("rollback"):
+                df_versi = riwayat.rollback(nama_sheet, int(versi))
+            shared_store.catat_tulis(nama_sheet, df_versi, ganti=True)
+            st.success(f"{nama_sheet} dikembalikan ke versi {versi} ({len(df_versi)} baris).")
+        except Exception as e:
+            shared_store.invalidate(nama_sheet)
+            st.error(f"Rollback gagal: {e}")
 
 
 # ===========================
@@ -1385,7 +1614,8 @@ if not st.session_state['logged_in']:
 # ===========================
 if st.session_state['logged_in']:
     
-    apply_background_and_style() 
+    with ukur("inject_css"):
+        apply_background_and_style() 
 
     st.markdown("<h1 style='text-align: center;'>📡 Monitoring Metering MUX Transmisi Telanaipura TVRI Stasiun Jambi</h1>", unsafe_allow_html=True)
     
@@ -1394,7 +1624,7 @@ if st.session_state['logged_in']:
     if 'current_page' not in st.session_state:
         st.session_state['current_page'] = "📝 Input Data & Kalkulator"
         
-    page_options = ["📝 Input Data & Kalkulator", "📊 Visualisasi Data", "✅ Ceklist Harian Digital"]
+    page_options = ["📝 Input Data & Kalkulator", "📊 Visualisasi Data", "✅ Ceklist Harian Digital", "🕳️ Kelengkapan Data", "🔗 Korelasi Parameter", "⚡ Kualitas Daya", "🔎 Pencarian Catatan"]
     
     page = st.sidebar.selectbox(
         "Pilih Halaman:",
@@ -1409,12 +1639,62 @@ if st.session_state['logged_in']:
         st.session_state['logged_in'] = False
         st.rerun()
 
+    # Umur snapshot data (stale-while-revalidate: data lama tetap tampil selama refresh)
+    for nama_sheet, label in [(data_sheet, "Metering"), (notes_sheet, "Catatan")]:
+        info = shared_store.status(nama_sheet)
+        if info["umur"] is None:
+            continue
+        keterangan = " · memperbarui…" if info["refresh"] else ""
+        if info["error"]:
+            keterangan += " · ⚠️ refresh gagal, menampilkan data terakhir"
+        st.sidebar.caption(f"🕒 Data {label}: diperbarui {_format_umur(info['umur'])} lalu{keterangan}")
+
     if page == "📝 Input Data & Kalkulator":
         show_input_kalkulator()
     elif page == "📊 Visualisasi Data":
         show_visualisasi_data()
     elif page == "✅ Ceklist Harian Digital":
         show_ceklist_harian()
+    elif page == "🕳️ Kelengkapan Data":
+        show_kelengkapan_data()
+    elif page == "🔗 Korelasi Parameter":
+        show_korelasi_parameter()
+    elif page == "⚡ Kualitas Daya":
+        show_kualitas_daya()
+    elif page == "🔎 Pencarian Catatan":
+        show_pencarian_catatan()
+
+    if st.session_state.get('username') in ADMIN_USERS:
+        panel_versi_rules()
+        if isinstance(storage, ArsipBackend):
+            panel_arsip()
+        riwayat = lapisan_riwayat()
+        if riwayat is not None:
+            panel_riwayat(riwayat)
+
+    # ===========================
+    # Panel Performa Rerun (khusus admin)
+    # ===========================
+    ringkasan_rerun = selesai_rerun(page, user=st.session_state.get('username', ''))
+    if ringkasan_rerun and st.session_state.get('username') in ADMIN_USERS:
+        with st.sidebar.expander("⏱️ Performa Rerun (Admin)"):
+            col_total, col_api, col_bytes = st.columns(3)
+            col_total.metric("Total", f"{ringkasan_rerun['total_ms']:.0f} ms")
+            col_api.metric("API Sheets", ringkasan_rerun['api_calls'])
+            col_bytes.metric("Bytes", f"{ringkasan_rerun['api_bytes'] / 1024:.1f} KB")
+            headroom = getattr(getattr(storage, "client", None), "headroom", None)
+            if headroom:
+                kuota = headroom()
+                st.caption(
+                    f"Kuota Sheets: sisa {kuota['sisa']}/{kuota['kuota_per_menit']} per menit · "
+                    f"retry {kuota['retry']} · request digabung {kuota['digabung']} · "
+                    f"tunggu kuota {kuota['tunggu_kuota_s']} s"
+                )
+            df_fase = pd.DataFrame(
+                [{"Fase": nama, "Durasi (ms)": isi["ms"], "Jumlah": isi["jumlah"]} for nama, isi in ringkasan_rerun['fase'].items()]
+            )
+            if not df_fase.empty:
+                st.dataframe(df_fase.sort_values("Durasi (ms)", ascending=False), use_container_width=True, hide_index=True)
 
 
 
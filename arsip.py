@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+from storage import StorageBackend, filter_range, merge_rows
+
+
+# ===========================
+# Partisi Arsip Bulanan (Tiering Data Metering)
+# ===========================
+# Manifest partisi arsip di backend utama: SHEET | BULAN | MULAI | AKHIR | BARIS
+SHEET_MANIFEST = "_ARSIP"
+# Periode aktif (hot) = bulan berjalan + bulan sebelumnya sampai BULAN_AKTIF bulan
+BULAN_AKTIF = 3
+# Manifest dibaca ulang paling lambat setiap 5 menit; lebih cepat lewat lupakan_manifest() saat versi hot berubah
+UMUR_MANIFEST = 300
+
+
+KOLOM_MANIFEST = ["SHEET", "BULAN", "MULAI", "AKHIR", "BARIS"]
+
+
+def rapikan_manifest(df):
+    """
+    Manifest dengan BULAN 'YYYY-MM' dan MULAI/AKHIR 'YYYY-MM-DD' (satu baris per sheet & bulan).
+
+    Backend Sheets menulis USER_ENTERED, sehingga '2024-01' / '2024-01-01' bisa tersimpan sebagai tanggal dan
+    terbaca kembali dalam format lokal spreadsheet ('1/1/2024', '01/01/2024'). BULAN selalu tanggal 1, jadi dari
+    tafsiran bulan-dulu dan hari-dulu dipilih yang jatuh pada tanggal 1; MULAI/AKHIR dihitung ulang dari BULAN.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=KOLOM_MANIFEST)
+    teks = df["BULAN"].astype(str).str.strip()
+    bulan = pd.Series(None, index=df.index, dtype=object)
+    for hari_dulu in (False, True):
+        tanggal = pd.to_datetime(teks, format="mixed", dayfirst=hari_dulu, errors="coerce")
+        cocok = bulan.isna() & (tanggal.dt.day == 1)
+        bulan[cocok] = tanggal[cocok].dt.strftime("%Y-%m")
+    df = df.assign(BULAN=bulan.fillna(teks))
+    periode = pd.PeriodIndex(df["BULAN"], freq="M")
+    df = df.assign(MULAI=periode.start_time.strftime("%Y-%m-%d"), AKHIR=periode.end_time.strftime("%Y-%m-%d"))
+    # Baris ganda dari upsert yang kuncinya tidak cocok dengan format lokal: yang terakhir ditulis berlaku
+    return df.drop_duplicates(["SHEET", "BULAN"], keep="last").sort_values("BULAN").reset_index(drop=True)
+
+
+class PartisiSheet:
+    """Partisi arsip sebagai worksheet/tabel terpisah di backend yang sama: '<sheet>_ARSIP_YYYY_MM'."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def nama(self, sheet, bulan):
+        return f"{sheet}_ARSIP_{bulan.replace('-', '_')}"
+
+    def baca(self, sheet, bulan):
+        return self.backend.load(self.nama(sheet, bulan))
+
+    def tulis(self, sheet, bulan, df):
+        self.backend.replace(self.nama(sheet, bulan), df)
+
+
+class PartisiParquet:
+    """Partisi arsip sebagai file Parquet lokal per bulan: '<folder>/<sheet>_YYYY-MM.parquet'."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, sheet, bulan):
+        return os.path.join(self.folder, f"{sheet}_{bulan}.parquet")
+
+    def baca(self, sheet, bulan):
+        path = self._path(sheet, bulan)
+        return pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame()
+
+    def tulis(self, sheet, bulan, df):
+        # Kolom teks campuran (angka & teks dari Sheets) disimpan sebagai teks agar skema Parquet konsisten
+        df = df.copy()
+        for kolom in df.columns[df.dtypes == object]:
+            df[kolom] = df[kolom].map(lambda v: None if pd.isna(v) else str(v))
+        path = self._path(sheet, bulan)
+        sementara = path + ".tmp"
+        df.to_parquet(sementara, index=False)
+        os.replace(sementara, path)
+
+
+class ArsipBackend(StorageBackend):
+    """
+    Backend berlapis: sheet yang di-tier hanya berisi periode aktif (hot), bacaan bulan-bulan sebelumnya
+    dipindah ke partisi arsip bulanan yang hanya-baca bagi aplikasi (worksheet arsip atau Parquet lokal).
+
+    load/replace/append/upsert tetap mengenai partisi hot saja, sehingga tampilan default dan penyimpanan
+    tidak lagi membayar seluruh histori. query_range membuka hanya partisi arsip yang beririsan dengan rentang.
+    Baris dengan tanggal di bulan yang sudah diarsipkan (koreksi data lama) diarahkan ke partisinya.
+    """
+
+    def __init__(self, backend, partisi, sheets, kolom_tanggal="TANGGAL", kunci=("TANGGAL", "WAKTU"),
+                 bulan_aktif=BULAN_AKTIF):
+        self.backend = backend
+        self.partisi = partisi
+        self.sheets = set(sheets)
+        self.kolom_tanggal = kolom_tanggal
+        self.kunci = list(kunci)
+        self.bulan_aktif = int(bulan_aktif)
+        self.key = backend.key
+        # Panel kuota admin membaca client dari backend Sheets
+        self.client = getattr(backend, "client", None)
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_dimuat = 0.0
+
+    # --- Partisi hot (delegasi ke backend utama) ---
+    def load(self, sheet_name):
+        return self.backend.load(sheet_name)
+
+    def version(self, sheet_name):
+        return self.backend.version(sheet_name)
+
+    def load_versioned(self, sheet_name):
+        return self.backend.load_versioned(sheet_name)
+
+    def replace(self, sheet_name, df, expected_version=None):
+        self.backend.replace(sheet_name, df, expected_version=expected_version)
+
+    def append(self, sheet_name, df):
+        df = self._koreksi_arsip(sheet_name, df)
+        if not df.empty:
+            self.backend.append(sheet_name, df)
+
+    def upsert(self, sheet_name, df, keys):
+        df = self._koreksi_arsip(sheet_name, df)
+        if not df.empty:
+            self.backend.upsert(sheet_name, df, keys)
+
+    # --- Manifest & partisi arsip ---
+    def manifest(self, sheet_name=None):
+        """Daftar partisi arsip (urut bulan); disimpan di memori paling lama UMUR_MANIFEST detik."""
+        df = self._manifest
+        if df is None or time.monotonic() - self._manifest_dimuat > UMUR_MANIFEST:
+            df = rapikan_manifest(self.backend.load(SHEET_MANIFEST))
+            self._manifest, self._manifest_dimuat = df, time.monotonic()
+        if sheet_name is not None:
+            df = df[df["SHEET"] == sheet_name]
+        return df.reset_index(drop=True)
+
+    def lupakan_manifest(self):
+        """Manifest dibaca ulang pada pemanggilan berikutnya (mis. partisi hot dimuat ulang karena proses lain mengarsipkan)."""
+        self._manifest = None
+
+    def awal_hot(self, sheet_name):
+        """Tanggal pertama setelah bulan arsip terakhir (None jika belum ada arsip)."""
+        manifest = self.manifest(sheet_name)
+        if manifest.empty:
+            return None
+        return pd.Period(manifest["BULAN"].iloc[-1], "M").end_time.normalize() + pd.Timedelta(days=1)
+
+    def _tulis_partisi(self, sheet_name, per_bulan):
+        """Menggabung baris (bulan, DataFrame) ke partisi bulanannya (kunci sama ditimpa); manifest diperbarui sekali."""
+        manifest = []
+        with self._lock:
+            for bulan, df_baru in per_bulan:
+                df = merge_rows(self.partisi.baca(sheet_name, bulan), df_baru, self.kunci)
+                self.partisi.tulis(sheet_name, bulan, df)
+                periode = pd.Period(bulan, "M")
+                manifest.append({
+                    "SHEET": sheet_name, "BULAN": bulan,
+                    "MULAI": periode.start_time.strftime("%Y-%m-%d"),
+                    "AKHIR": periode.end_time.strftime("%Y-%m-%d"),
+                    "BARIS": len(df),
+                })
+            if manifest:
+                self._dengan_retry(lambda: self._perbarui_manifest(pd.DataFrame(manifest)))
+                self.lupakan_manifest()
+
+    def _perbarui_manifest(self, df_baru):
+        """Manifest ditulis ulang utuh (kecil: satu baris per bulan) dari versi yang dinormalkan, dengan cek versi."""
+        df, versi = self.backend.load_versioned(SHEET_MANIFEST)
+        df = merge_rows(rapikan_manifest(df), rapikan_manifest(df_baru), ["SHEET", "BULAN"])
+        self.backend.replace(SHEET_MANIFEST, df[KOLOM_MANIFEST], expected_version=versi)
+
+    def tulis_arsip(self, sheet_name, bulan, df):
+        """Menimpa baris (per kunci) di partisi arsip satu bulan, mis. hasil penilaian ulang status."""
+        if not df.empty:
+            self._tulis_partisi(sheet_name, [(bulan, df)])
+
+    def _koreksi_arsip(self, sheet_name, df):
+        """Baris yang bulannya sudah diarsipkan ditulis ke partisinya; sisanya dikembalikan untuk partisi hot."""
+        if sheet_name not in self.sheets or df.empty or self.kolom_tanggal not in df.columns:
+            return df
+        manifest = self.manifest(sheet_name)
+        if manifest.empty:
+            return df
+        bulan = pd.to_datetime(df[self.kolom_tanggal], errors="coerce").dt.strftime("%Y-%m")
+        diarsip = bulan.isin(manifest["BULAN"])
+        if diarsip.any():
+            self._tulis_partisi(sheet_name, df[diarsip].groupby(bulan[diarsip]))
+        return df[~diarsip]
+
+    def arsipkan(self, sheet_name, sekarang=None):
+        """
+        Memindahkan baris sebelum periode aktif dari partisi hot ke partisi arsip bulanan.
+        Partisi arsip ditulis lebih dulu, lalu partisi hot diganti dengan cek versi; bila gagal di tengah,
+        baris yang sempat ada di keduanya tetap terbaca sekali karena query_range menggabung per kunci.
+        Mengembalikan daftar bulan yang diarsipkan.
+        """
+        batas = (pd.Period(sekarang or pd.Timestamp.now(), "M") - (self.bulan_aktif - 1)).start_time
+
+        def pindahkan():
+            df, versi = self.backend.load_versioned(sheet_name)
+            if df.empty or self.kolom_tanggal not in df.columns:
+                return []
+            tanggal = pd.to_datetime(df[self.kolom_tanggal], errors="coerce")
+            lama = (tanggal < batas).to_numpy()
+            if not lama.any():
+                return []
+            bulan = tanggal[lama].dt.strftime("%Y-%m")
+            self._tulis_partisi(sheet_name, df[lama].groupby(bulan))
+            self.backend.replace(sheet_name, df[~lama].reset_index(drop=True), expected_version=versi)
+            return sorted(bulan.unique())
+
+        return self._dengan_retry(pindahkan)
+
+    def query_arsip(self, sheet_name, column, start, end):
+        """Baris arsip pada rentang tanggal; hanya partisi bulan yang beririsan dengan rentang yang dibuka."""
+        manifest = self.manifest(sheet_name)
+        awal, akhir = pd.Period(pd.Timestamp(start), "M"), pd.Period(pd.Timestamp(end), "M")
+        bulan = [b for b in manifest["BULAN"] if awal <= pd.Period(b, "M") <= akhir]
+        bagian = [filter_range(self.partisi.baca(sheet_name, b), column, start, end) for b in bulan]
+        bagian = [df for df in bagian if not df.empty]
+        return pd.concat(bagian, ignore_index=True) if bagian else pd.DataFrame()
+
+    def query_range(self, sheet_name, column, start, end):
+        hot = self.backend.query_range(sheet_name, column, start, end)
+        if sheet_name not in self.sheets:
+            return hot
+        arsip = self.query_arsip(sheet_name, column, start, end)
+        if arsip.empty or hot.empty:
+            return hot if arsip.empty else arsip
+        return merge_rows(arsip, hot, self.kunci)
@@ -0,0 +1,238 @@
+"""
+Benchmark skala data Monitoring Metering MUX TVRI Jambi.
+
+Membuat data sintetis Sheet1 & CATATAN_HARIAN untuk beberapa tahun (6 slot/hari,
+3 shift ceklist/hari), lalu mengukur jalur utama aplikasi terhadap backend lokal:
+load/parse get_data, klasifikasi rules, simpan/merge, render grafik, dan export Excel.
+
+Contoh:
+    python benchmark.py --years 1 5 10 --fault-rate 0.02 --channel-fault RTV=0.1 --output benchmark_results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from processing import (
+    siapkan_data, siapkan_visualisasi, buat_grafik_parameter, ke_excel,
+    tambah_kolom_turunan, tambah_kolom_turunan_catatan,
+)
+from rules import KANAL_TV, KOLOM_RULES, ceklist_rules, cek_param, klasifikasi_data, rules_param
+from storage import SQLiteBackend, FakeSheetsBackend, merge_rows
+from kelengkapan import SLOT_METERING, SHIFT_CEKLIST
+
+WAKTU_OPTIONS = SLOT_METERING
+HOUR_OPTIONS = SHIFT_CEKLIST
+OPERATORS = ["Andi", "Budi", "Citra", "Dedi", "Eka"]
+
+# Nilai normal (rata-rata, simpangan) per kolom parameter
+NILAI_NORMAL = {
+    "POWER OUTPUT (WATT)": (11000, 300),
+    "VSWR": (1.12, 0.04),
+    "C/N (dB)": (44, 2),
+    "MARGIN (dB)": (24, 2),
+    "TEGANGAN LISTRIK R (Volt)": (220, 2),
+    "TEGANGAN LISTRIK S (Volt)": (220, 2),
+    "TEGANGAN LISTRIK T (Volt)": (220, 2),
+    "SUHU TX": (18.5, 1.0),
+}
+
+
+# ===========================
+# Generator Data Sintetis
+# ===========================
+def _nilai_gangguan(rng, nama_rule, n):
+    """Mengambil nilai acak dari rentang rule Warning/Trouble untuk parameter tertentu."""
+    rentang = [r for r in rules_param[nama_rule] if r["status"] != "Normal"]
+    pilih = rng.integers(0, len(rentang), n)
+    low = np.array([rentang[i]["min"] for i in pilih], dtype=float)
+    high = np.array([rentang[i]["max"] for i in pilih], dtype=float)
+    return rng.uniform(low, high)
+
+
+def generate_metering(years, fault_rate=0.02, channel_faults=None, seed=0, end_date=None):
+    """Membuat DataFrame Sheet1 sintetis: `years` tahun x 6 slot per hari."""
+    rng = np.random.default_rng(seed)
+    channel_faults = channel_faults or {}
+    end_date = pd.Timestamp(end_date or datetime.date.today())
+    tanggal = pd.date_range(end=end_date, periods=int(365 * years), freq="D")
+    n = len(tanggal) * len(WAKTU_OPTIONS)
+
+    data = {
+        "TANGGAL": np.repeat(tanggal.strftime("%Y-%m-%d"), len(WAKTU_OPTIONS)),
+        "WAKTU": np.tile(WAKTU_OPTIONS, len(tanggal)),
+    }
+    for kolom, (rata, simpangan) in NILAI_NORMAL.items():
+        nilai = rng.normal(rata, simpangan, n)
+        gangguan = rng.random(n) < fault_rate
+        nilai[gangguan] = _nilai_gangguan(rng, KOLOM_RULES[kolom], int(gangguan.sum()))
+        data[kolom] = np.round(nilai, 2) if kolom != "POWER OUTPUT (WATT)" else np.round(nilai).astype(int)
+
+    for kanal, kolom_bitrate in KANAL_TV.items():
+        nama_rule = f"{kolom_bitrate} (Mbps)"
+        normal = [r for r in rules_param[nama_rule] if r["status"] == "Normal"][0]
+        bitrate = rng.uniform(normal["min"], normal["max"], n)
+        gangguan = rng.random(n) < channel_faults.get(kanal, fault_rate)
+        bitrate[gangguan] = _nilai_gangguan(rng, nama_rule, int(gangguan.sum()))
+        data[kanal] = np.where(gangguan & (rng.random(n) < 0.5), "NO", "OK")
+        data[kolom_bitrate] = np.round(bitrate, 2)
+
+    data["KUALITAS AUDIO / VIDEO"] = np.where(rng.random(n) < fault_rate, "A/V NO", "A/V OK")
+    data["OPERATOR"] = rng.choice(OPERATORS, n)
+    data["CATATAN/KETERANGAN"] = rng.choice(["Semua normal", "Cek konektor", "Hujan deras", ""], n)
+    return pd.DataFrame(data)
+
+
+def generate_ceklist(years, fault_rate=0.02, seed=0, end_date=None):
+    """Membuat DataFrame CATATAN_HARIAN sintetis: `years` tahun x 3 shift per hari."""
+    rng = np.random.default_rng(seed + 1)
+    end_date = pd.Timestamp(end_date or datetime.date.today())
+    tanggal = pd.date_range(end=end_date, periods=int(365 * years), freq="D")
+    n = len(tanggal) * len(HOUR_OPTIONS)
+
+    data = {
+        "TANGGAL_CEKLIST": np.repeat(tanggal.strftime("%Y-%m-%d"), len(HOUR_OPTIONS)),
+        "JAM_CEKLIST": np.tile(HOUR_OPTIONS, len(tanggal)),
+        "OPERATOR_CEKLIST": rng.choice(OPERATORS, n),
+    }
+    for param, kondisi in ceklist_rules.items():
+        acak = rng.random(n)
+        pilihan = np.where(acak < fault_rate / 3, "Trouble", np.where(acak < fault_rate, "Warning", "Normal"))
+        data[f"{param}_KONDISI"] = pilihan
+        data[f"{param}_REKOMENDASI"] = pd.Series(pilihan).map({k: v["rekom"] for k, v in kondisi.items()}).to_numpy()
+    return pd.DataFrame(data)
+
+
+# ===========================
+# Pengukuran Waktu
+# ===========================
+def _ukur(fungsi, repeat):
+    """Menjalankan fungsi `repeat` kali, mengembalikan daftar durasi (detik)."""
+    durasi = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append(time.perf_counter() - mulai)
+    return durasi
+
+
+def _klasifikasi_per_baris(df):
+    # Jalur lama: cek_param dipanggil satu per satu untuk setiap nilai
+    for kolom, nama in KOLOM_RULES.items():
+        for nilai in df[kolom].to_numpy():
+            cek_param(nama, nilai)
+
+
+def _render_grafik(df_viz):
+    fig = buat_grafik_parameter(df_viz, ["POWER OUTPUT (WATT)", "VSWR"], "Bulan")
+    fig.savefig(BytesIO(), format="png")
+    plt.close(fig)
+
+
+def jalankan_benchmark(years, backend="sqlite", repeat=3, fault_rate=0.02, channel_faults=None, seed=0):
+    """Mengukur semua fase untuk satu ukuran histori, mengembalikan list hasil per fase."""
+    # Data diimpor lengkap dengan kolom turunan, seperti baris yang disimpan lewat aplikasi
+    df_meter = tambah_kolom_turunan(generate_metering(years, fault_rate, channel_faults, seed))
+    df_notes = tambah_kolom_turunan_catatan(generate_ceklist(years, fault_rate, seed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if backend == "fake":
+            store = FakeSheetsBackend()
+        else:
+            store = SQLiteBackend(os.path.join(tmp, "bench.db"))
+        store.replace("Sheet1", df_meter)
+        store.replace("CATATAN_HARIAN", df_notes)
+
+        df_loaded = siapkan_data(store.load("Sheet1"))
+        df_viz = siapkan_visualisasi(df_loaded)
+        baris_baru = df_meter.tail(1).copy()
+        sampel = df_meter.head(min(len(df_meter), 2000))
+
+        fase = {
+            "load_parse_metering": lambda: siapkan_visualisasi(siapkan_data(store.load("Sheet1"))),
+            "load_parse_ceklist": lambda: siapkan_data(store.load("CATATAN_HARIAN")),
+            "klasifikasi_vektor": lambda: klasifikasi_data(df_meter),
+            "klasifikasi_per_baris_2000": lambda: _klasifikasi_per_baris(sampel),
+            "merge_upsert_memori": lambda: merge_rows(df_meter, baris_baru, ["TANGGAL", "WAKTU"]),
+            "simpan_upsert_backend": lambda: store.upsert("Sheet1", baris_baru, ["TANGGAL", "WAKTU"]),
+            "simpan_append_ceklist": lambda: store.append("CATATAN_HARIAN", df_notes.tail(1)),
+            "render_grafik": lambda: _render_grafik(df_viz),
+            "export_excel_metering": lambda: ke_excel(df_loaded),
+        }
+
+        hasil = []
+        for nama, fungsi in fase.items():
+            durasi = _ukur(fungsi, repeat)
+            hasil.append({
+                "years": years,
+                "rows_metering": len(df_meter),
+                "rows_ceklist": len(df_notes),
+                "backend": backend,
+                "phase": nama,
+                "repeat": repeat,
+                "min_s": round(min(durasi), 6),
+                "median_s": round(statistics.median(durasi), 6),
+                "max_s": round(max(durasi), 6),
+            })
+            print(f"[{years} th] {nama:28s} median {statistics.median(durasi):8.4f} s")
+        return hasil
+
+
+def _parse_channel_faults(items):
+    hasil = {}
+    for item in items or []:
+        kanal, _, rate = item.partition("=")
+        if kanal not in KANAL_TV:
+            raise SystemExit(f"Kanal tidak dikenal: {kanal}. Pilihan: {', '.join(KANAL_TV)}")
+        hasil[kanal] = float(rate)
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skala data Monitoring Metering MUX TVRI Jambi")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 5, 10], help="Panjang histori (tahun)")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan per fase")
+    parser.add_argument("--fault-rate", type=float, default=0.02, help="Peluang gangguan default per bacaan")
+    parser.add_argument("--channel-fault", action="append", metavar="KANAL=RATE",
+                        help="Peluang gangguan per kanal, mis. 'TVRI SPORT=0.1' (bisa diulang)")
+    parser.add_argument("--backend", choices=["sqlite", "fake"], default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="File JSON hasil benchmark")
+    args = parser.parse_args(argv)
+
+    channel_faults = _parse_channel_faults(args.channel_fault)
+    hasil = []
+    for years in args.years:
+        hasil.extend(jalankan_benchmark(years, args.backend, args.repeat, args.fault_rate, channel_faults, args.seed))
+
+    laporan = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "backend": args.backend,
+            "fault_rate": args.fault_rate,
+            "channel_faults": channel_faults,
+            "seed": args.seed,
+        },
+        "results": hasil,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2)
+    print(f"Hasil disimpan ke {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import os
+import pickle
+import re
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa file lock, setiap proses bisa menjadi refresher
+    fcntl = None
+
+
+def _nama_file(nama):
+    return re.sub(r"[^\w.-]", "_", str(nama))
+
+
+# ===========================
+# Cache Snapshot Bersama Antar Proses (Disk Lokal)
+# ===========================
+class DiskSnapshotCache:
+    """
+    Snapshot sheet di folder lokal yang dipakai bersama beberapa proses worker Streamlit.
+
+    Per sheet ada tiga file:
+    - `<sheet>.parquet` (atau `.pkl` bila kolom campuran tidak bisa ditulis ke Parquet),
+    - `<sheet>.meta.json` berisi generasi, versi backend, dan waktu terakhir dicek,
+    - `<sheet>.lock` untuk file lock: hanya satu proses yang me-refresh dari backend,
+      proses lain menunggu lalu membaca hasilnya dari disk.
+    File data & meta ditulis ke file sementara lalu di-rename agar pembaca tidak melihat file setengah jadi.
+    """
+
+    def __init__(self, folder, namespace=""):
+        # Subfolder per sumber data (mis. ID spreadsheet) agar beberapa backend tidak tercampur
+        self.folder = os.path.join(folder, _nama_file(namespace)) if namespace else folder
+        os.makedirs(self.folder, exist_ok=True)
+        # Cache meta per sheet berdasarkan mtime file, agar cek per rerun cukup satu os.stat
+        self._meta = {}
+
+    def _path(self, sheet, akhiran):
+        return os.path.join(self.folder, _nama_file(sheet) + akhiran)
+
+    @contextmanager
+    def kunci(self, sheet):
+        """File lock eksklusif per sheet (menunggu sampai proses lain selesai me-refresh)."""
+        with open(self._path(sheet, ".lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def meta(self, sheet):
+        """Isi meta.json sheet (None jika belum ada snapshot di disk)."""
+        path = self._path(sheet, ".meta.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        tersimpan = self._meta.get(sheet)
+        if tersimpan and tersimpan[0] == mtime:
+            return tersimpan[1]
+        try:
+            with open(path, encoding="utf-8") as f:
+                isi = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._meta[sheet] = (mtime, isi)
+        return isi
+
+    def baca(self, sheet, meta):
+        """Membaca DataFrame snapshot sesuai format di meta (Parquet dibaca dengan memory map)."""
+        if meta["format"] == "parquet":
+            return pd.read_parquet(self._path(sheet, ".parquet"), memory_map=True)
+        with open(self._path(sheet, ".pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def tulis(self, sheet, df, versi_backend):
+        """Menulis snapshot baru; mengembalikan meta dengan generasi yang dinaikkan."""
+        lama = self.meta(sheet) or {}
+        try:
+            format_file = "parquet"
+            self._ganti_atomik(self._path(sheet, ".parquet"), lambda path: df.to_parquet(path, index=False))
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            # pyarrow tidak ada / kolom object bercampur angka & teks kosong dari Sheets
+            format_file = "pickle"
+            self._ganti_atomik(self._path(sheet, ".pkl"), lambda path: df.to_pickle(path))
+        meta = {
+            "generasi": int(lama.get("generasi", 0)) + 1,
+            "versi_backend": versi_backend,
+            "dicek": time.time(),
+            "format": format_file,
+            "invalidasi": int(lama.get("invalidasi", 0)),
+        }
+        self._tulis_meta(sheet, meta)
+        return meta
+
+    def tandai_dicek(self, sheet, waktu=None):
+        """Mencatat bahwa snapshot di disk baru saja dicocokkan dengan backend (waktu=0 menandai kedaluwarsa)."""
+        meta = dict(self.meta(sheet) or {})
+        if meta:
+            meta["dicek"] = time.time() if waktu is None else waktu
+            self._tulis_meta(sheet, meta)
+        return meta
+
+    def tandai_basi(self, sheet):
+        """Menandai snapshot kedaluwarsa untuk semua proses: waktu cek 0 dan generasi invalidasi dinaikkan."""
+        meta = dict(self.meta(sheet) or {})
+        if meta:
+            meta["dicek"] = 0.0
+            meta["invalidasi"] = int(meta.get("invalidasi", 0)) + 1
+            self._tulis_meta(sheet, meta)
+        return meta
+
+    def _tulis_meta(self, sheet, meta):
+        def tulis(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        self._ganti_atomik(self._path(sheet, ".meta.json"), tulis)
+
+    @staticmethod
+    def _ganti_atomik(path, tulis):
+        sementara = f"{path}.{os.getpid()}.tmp"
+        try:
+            tulis(sementara)
+            os.replace(sementara, path)
+        finally:
+            if os.path.exists(sementara):
+                os.remove(sementara)
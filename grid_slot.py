@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from rules import KOLOM_RULES
+
+
+# ===========================
+# Grid Slot 4 Jam (resampling histori metering)
+# ===========================
+INTERVAL_SLOT = np.timedelta64(4, "h")
+SLOT_PER_HARI = 6
+# Acuan indeks slot global: slot pertama setiap hari adalah 02:00 (02, 06, 10, 14, 18, 22)
+ASAL_SLOT = np.datetime64("1970-01-01T02:00", "ns")
+
+
+def indeks_slot(waktu):
+    """Nomor slot 4 jam terdekat sejak ASAL_SLOT (bacaan terlambat masuk slot terdekat)."""
+    waktu = np.asarray(waktu, dtype="datetime64[ns]")
+    return np.rint((waktu - ASAL_SLOT) / INTERVAL_SLOT).astype(np.int64)
+
+
+def isi_celah(nilai, maks_celah):
+    """
+    Interpolasi linear hanya untuk celah (NaN berurutan) sepanjang <= `maks_celah` slot
+    yang diapit dua nilai; celah yang lebih panjang dan ujung deret tetap NaN.
+    """
+    nilai = np.asarray(nilai, dtype=float)
+    hilang = np.isnan(nilai)
+    if maks_celah <= 0 or not hilang.any() or hilang.all():
+        return nilai
+    kelompok = np.cumsum(~hilang)
+    panjang_celah = pd.Series(hilang).groupby(kelompok).transform("sum").to_numpy()
+    posisi = np.arange(len(nilai))
+    valid = np.flatnonzero(~hilang)
+    di_dalam = (posisi > valid[0]) & (posisi < valid[-1])
+    diisi = hilang & di_dalam & (panjang_celah <= maks_celah)
+    hasil = nilai.copy()
+    hasil[diisi] = np.interp(posisi[diisi], valid, nilai[valid])
+    return hasil
+
+
+class GridSlot:
+    """
+    Histori metering yang diselaraskan ke grid 4 jam (02:00, 06:00, ..., 22:00).
+
+    - Bacaan yang terlambat dimasukkan ke slot terdekat.
+    - Bacaan ganda pada slot yang sama: nilai terakhir (yang tidak kosong) dipakai.
+    - Slot tanpa bacaan bernilai NaN; `ada[kolom]` adalah penanda slot yang punya nilai.
+    Setiap parameter disimpan sebagai array float64 padat sepanjang grid, siap untuk
+    grafik dan analitik lanjutan (prakiraan drift, korelasi).
+    """
+
+    def __init__(self, df, kolom=None):
+        kolom = [k for k in (kolom or KOLOM_RULES) if k in df.columns]
+        waktu = df["DATETIME"] if "DATETIME" in df.columns else pd.Series(dtype="datetime64[ns]")
+        valid = waktu.notna().to_numpy()
+        waktu = waktu.to_numpy(dtype="datetime64[ns]")[valid]
+        self.kolom = kolom
+        self.nilai = {}
+        self.ada = {}
+        self._matriks = None
+        if len(waktu) == 0:
+            self.waktu = np.array([], dtype="datetime64[ns]")
+            for k in kolom:
+                self.nilai[k] = np.array([], dtype=float)
+                self.ada[k] = np.array([], dtype=bool)
+            return
+
+        # Grid dimulai dari slot 02:00 pada hari bacaan paling awal
+        indeks = indeks_slot(waktu)
+        awal = int(indeks.min()) - int(indeks.min()) % SLOT_PER_HARI
+        indeks -= awal
+        n = int(indeks.max()) + 1
+        self.waktu = ASAL_SLOT + (awal + np.arange(n)) * INTERVAL_SLOT
+
+        urutan = np.argsort(waktu, kind="stable")
+        for k in kolom:
+            angka = pd.to_numeric(df[k].iloc[np.flatnonzero(valid)], errors="coerce").to_numpy(dtype=float)
+            per_slot = pd.Series(angka[urutan]).groupby(indeks[urutan]).last()
+            arr = np.full(n, np.nan)
+            arr[per_slot.index.to_numpy()] = per_slot.to_numpy()
+            self.nilai[k] = arr
+            self.ada[k] = ~np.isnan(arr)
+
+    def __len__(self):
+        return len(self.waktu)
+
+    def matriks(self):
+        """Array 2D (slot x parameter, urutan `kolom`) untuk analitik lintas parameter; dibuat sekali per grid."""
+        if self._matriks is None:
+            if self.kolom:
+                self._matriks = np.column_stack([self.nilai[k] for k in self.kolom])
+            else:
+                self._matriks = np.empty((len(self.waktu), 0))
+        return self._matriks
+
+    def rentang(self, start=None, end=None):
+        """Slice indeks grid untuk start <= waktu < end + 1 hari (tanggal inklusif)."""
+        i = 0 if start is None else np.searchsorted(self.waktu, np.datetime64(pd.Timestamp(start), "ns"), "left")
+        j = len(self.waktu) if end is None else np.searchsorted(
+            self.waktu, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns"), "left")
+        return slice(i, j)
+
+    def _nilai(self, kolom, bagian, maks_celah):
+        """Potongan array parameter; interpolasi memakai tetangga di luar potongan agar celah di tepi ikut terisi."""
+        if maks_celah <= 0:
+            return self.nilai[kolom][bagian]
+        i = max(bagian.start - maks_celah, 0)
+        j = min(bagian.stop + maks_celah, len(self.waktu))
+        terisi = isi_celah(self.nilai[kolom][i:j], maks_celah)
+        return terisi[bagian.start - i:bagian.stop - i]
+
+    def seri(self, kolom, start=None, end=None, maks_celah=0):
+        """(waktu, nilai, hilang) satu parameter; celah <= maks_celah slot diisi interpolasi linear."""
+        bagian = self.rentang(start, end)
+        return self.waktu[bagian], self._nilai(kolom, bagian, maks_celah), ~self.ada[kolom][bagian]
+
+    def frame(self, kolom, start=None, end=None, maks_celah=0):
+        """DataFrame DATETIME + kolom terpilih di grid (untuk fungsi grafik yang sudah ada)."""
+        bagian = self.rentang(start, end)
+        data = {"DATETIME": self.waktu[bagian]}
+        for k in kolom:
+            data[k] = self._nilai(k, bagian, maks_celah)
+        return pd.DataFrame(data)
+
+    def slot_hilang(self, kolom, start=None, end=None):
+        """Waktu slot di rentang yang tidak punya nilai untuk semua kolom terpilih."""
+        bagian = self.rentang(start, end)
+        hilang = np.ones(bagian.stop - bagian.start, dtype=bool)
+        for k in kolom:
+            hilang &= ~self.ada[k][bagian]
+        return self.waktu[bagian][hilang]
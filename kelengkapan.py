@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+# ===========================
+# Jadwal Slot Pencatatan
+# ===========================
+# Slot bacaan metering per hari (sama dengan pilihan Waktu di form input)
+SLOT_METERING = ["02:00", "06:00", "10:00", "14:00", "18:00", "22:00"]
+# Shift ceklist harian; jam mulai shift dipakai sebagai TANGGAL_WAKTU
+SHIFT_CEKLIST = ['Shift 1: 00.00 - 08.00', 'Shift 2: 08:00 - 16.00', 'Shift 3: 16:00 - 00.00']
+JAM_MULAI_SHIFT = ["00:00", "08:00", "16:00"]
+
+
+# ===========================
+# Deteksi Slot Hilang (anti-join grid vs kunci tercatat)
+# ===========================
+def _grid_slot(start, end, jam):
+    """Semua timestamp slot yang diharapkan: setiap tanggal start..end x setiap jam."""
+    tanggal = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+    offset = pd.to_timedelta([f"{j}:00" for j in jam]).to_numpy()
+    return (tanggal.to_numpy()[:, None] + offset[None, :]).ravel()
+
+
+def jumlah_slot(start, end, jam, sebelum=None):
+    """Jumlah slot yang diharapkan pada rentang tanggal (tidak termasuk slot pada/sesudah `sebelum`)."""
+    grid = _grid_slot(start, end, jam)
+    if sebelum is not None:
+        grid = grid[grid < np.datetime64(pd.Timestamp(sebelum), "ns")]
+    return len(grid)
+
+
+def slot_hilang(waktu_tercatat, start, end, jam, label_jam, sebelum=None):
+    """
+    Slot yang tidak punya catatan: grid (tanggal x jam) dikurangi timestamp tercatat.
+    Anti-join dilakukan dengan np.isin pada array datetime64 (tanpa loop per hari).
+    Slot pada/sesudah `sebelum` (mis. jam sekarang) belum dianggap hilang.
+    """
+    grid = _grid_slot(start, end, jam)
+    if sebelum is not None:
+        grid = grid[grid < np.datetime64(pd.Timestamp(sebelum), "ns")]
+    tercatat = pd.to_datetime(pd.Series(waktu_tercatat), errors="coerce").dropna().to_numpy(dtype="datetime64[ns]")
+    hilang = grid[~np.isin(grid, tercatat)]
+    # Menit sejak tengah malam -> indeks jam (jam terurut naik)
+    menit_slot = np.array([int(pd.Timedelta(f"{j}:00").total_seconds() // 60) for j in jam])
+    menit = (hilang - hilang.astype("datetime64[D]")).astype("timedelta64[m]").astype(int)
+    return pd.DataFrame({
+        "TANGGAL": hilang.astype("datetime64[D]").astype("datetime64[ns]"),
+        "SLOT": np.array(label_jam)[np.searchsorted(menit_slot, menit)],
+    })
+
+
+def slot_hilang_metering(df, start, end, sebelum=None):
+    """Slot metering (6 per hari) yang belum dicatat pada rentang tanggal."""
+    waktu = df["DATETIME"] if "DATETIME" in df.columns else []
+    return slot_hilang(waktu, start, end, SLOT_METERING, SLOT_METERING, sebelum)
+
+
+def slot_hilang_ceklist(df, start, end, sebelum=None):
+    """Shift ceklist (3 per hari) yang belum dicatat pada rentang tanggal."""
+    waktu = df["TANGGAL_WAKTU"] if "TANGGAL_WAKTU" in df.columns else []
+    return slot_hilang(waktu, start, end, JAM_MULAI_SHIFT, SHIFT_CEKLIST, sebelum)
+
+
+def hilang_per_hari(df_hilang, slot):
+    """Matriks tanggal x slot (True = hilang) beserta jumlah slot hilang per hari, hanya hari yang tidak lengkap."""
+    if df_hilang.empty:
+        return pd.DataFrame(columns=["TANGGAL"] + list(slot) + ["Jumlah Hilang"])
+    matriks = pd.crosstab(df_hilang["TANGGAL"], df_hilang["SLOT"]).reindex(columns=slot, fill_value=0).astype(bool)
+    matriks["Jumlah Hilang"] = matriks.sum(axis=1)
+    matriks.columns.name = None
+    matriks = matriks.reset_index().sort_values("TANGGAL", ascending=False)
+    matriks["TANGGAL"] = matriks["TANGGAL"].dt.strftime("%Y-%m-%d")
+    return matriks
+
+
+def hilang_per_operator(df, df_hilang, kolom_tanggal, kolom_operator):
+    """
+    Kepatuhan per operator: slot yang dicatat, hari bertugas (hari operator mencatat minimal satu slot),
+    dan slot hilang pada hari-hari bertugas tersebut.
+    """
+    kolom = ["Operator", "Slot Dicatat", "Hari Bertugas", "Slot Hilang di Hari Bertugas"]
+    if df.empty or kolom_operator not in df.columns or kolom_tanggal not in df.columns:
+        return pd.DataFrame(columns=kolom)
+    tugas = pd.DataFrame({
+        "Operator": df[kolom_operator].fillna("").astype(str).str.strip().replace("", "(kosong)"),
+        "TANGGAL": pd.to_datetime(df[kolom_tanggal], errors="coerce").dt.normalize(),
+    }).dropna(subset=["TANGGAL"])
+    dicatat = tugas.groupby("Operator").size()
+    hari = tugas.drop_duplicates()
+    hilang_harian = df_hilang.groupby("TANGGAL").size().rename("hilang")
+    hilang = hari.join(hilang_harian, on="TANGGAL").fillna({"hilang": 0}).groupby("Operator")["hilang"].sum()
+    hasil = pd.DataFrame({
+        "Slot Dicatat": dicatat,
+        "Hari Bertugas": hari.groupby("Operator").size(),
+        "Slot Hilang di Hari Bertugas": hilang.astype(int),
+    }).rename_axis("Operator").reset_index()
+    return hasil.sort_values("Slot Hilang di Hari Bertugas", ascending=False)[kolom]
@@ -0,0 +1,220 @@
+"""
+Klasifikasi batch file bacaan metering (CSV/Parquet) dengan rules_param, di luar aplikasi.
+
+File dibaca per potongan (chunk) agar arsip/dump telemetri sebesar apa pun tidak dimuat sekaligus.
+Setiap kolom parameter (KOLOM_RULES) diklasifikasi dengan lookup rule tervektor, lalu ditulis kolom
+"STATUS <kolom>", "REKOM <kolom>", STATUS TERBURUK, dan VERSI RULES (kolom lama di file ditimpa), mis. untuk
+menilai ulang histori setelah batas rules berubah. Potongan dapat dikerjakan paralel di process pool.
+
+Contoh:
+    python klasifikasi_batch.py arsip_sheet1.csv hasil.csv --chunksize 200000 --workers 4
+    python klasifikasi_batch.py dump.parquet hasil.parquet --tanpa-rekom
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from processing import URUTAN_STATUS
+from rules import KOLOM_RULES, VERSI_RULES, rules_param
+
+REKOM_DEFAULT = "Periksa ulang input nilai atau tambahkan batas baru pada rules_param."
+UKURAN_POTONGAN = 200_000
+
+
+# ===========================
+# Lookup Rule Tervektor
+# ===========================
+def _kategori(label):
+    """Label per kode rule -> (kategori unik, peta kode rule -> kode kategori)."""
+    kode, kategori = pd.factorize(pd.Series(label))
+    return pd.Index(kategori), kode.astype(np.int8)
+
+
+class RuleTerkompilasi:
+    """
+    Rules satu parameter sebagai array batas bawah/atas. Kode = indeks rule pertama yang cocok
+    (urutan sama dengan cek_param), len(rules) = N/A; status & rekomendasi diambil dari kode
+    sebagai Categorical sehingga tidak ada array string per baris.
+    """
+
+    def __init__(self, rules):
+        self.bawah = np.array([r["min"] for r in rules], dtype=float)
+        self.atas = np.array([r["max"] for r in rules], dtype=float)
+        self.kategori_status, self._peta_status = _kategori([r["status"] for r in rules] + ["N/A"])
+        self.kategori_rekom, self._peta_rekom = _kategori(
+            [r.get("rekom", "Tidak ada rekomendasi.") for r in rules] + [REKOM_DEFAULT])
+        self.peringkat = np.array([URUTAN_STATUS.index(s) for s in self.kategori_status], dtype=np.int8)
+
+    def kode(self, nilai):
+        nilai = pd.to_numeric(pd.Series(nilai), errors="coerce").to_numpy(dtype=float)
+        kode = np.full(len(nilai), len(self.bawah), dtype=np.int8)
+        # Dari rule terakhir ke pertama: rule yang lebih awal menimpa (first match)
+        for i in range(len(self.bawah) - 1, -1, -1):
+            kode[(nilai >= self.bawah[i]) & (nilai <= self.atas[i])] = i
+        return kode
+
+    def status(self, kode):
+        return pd.Categorical.from_codes(self._peta_status[kode], self.kategori_status)
+
+    def rekom(self, kode):
+        return pd.Categorical.from_codes(self._peta_rekom[kode], self.kategori_rekom)
+
+    def peringkat_status(self, kode):
+        """Indeks URUTAN_STATUS per baris (untuk STATUS TERBURUK)."""
+        return self.peringkat[self._peta_status[kode]]
+
+
+def kompilasi_rules(kolom_rules=None):
+    """RuleTerkompilasi per kolom data; nama rule yang sama dipakai bersama (mis. tegangan R/S/T)."""
+    kolom_rules = kolom_rules or KOLOM_RULES
+    per_rule = {nama: RuleTerkompilasi(rules_param.get(nama, [])) for nama in set(kolom_rules.values())}
+    return {kolom: per_rule[nama] for kolom, nama in kolom_rules.items()}
+
+
+_RULES = None
+
+
+def klasifikasi_potongan(df, dengan_rekom=True):
+    """Menambahkan STATUS/REKOM per kolom parameter yang ada, STATUS TERBURUK, dan VERSI RULES pada satu potongan."""
+    global _RULES
+    if _RULES is None:
+        _RULES = kompilasi_rules()
+    hasil = {}
+    peringkat = np.zeros(len(df), dtype=np.int8)
+    for kolom, rule in _RULES.items():
+        if kolom not in df.columns:
+            continue
+        kode = rule.kode(df[kolom])
+        hasil[f"STATUS {kolom}"] = rule.status(kode)
+        if dengan_rekom:
+            hasil[f"REKOM {kolom}"] = rule.rekom(kode)
+        peringkat = np.maximum(peringkat, rule.peringkat_status(kode))
+    hasil["STATUS TERBURUK"] = pd.Categorical.from_codes(peringkat, URUTAN_STATUS)
+    hasil["VERSI RULES"] = VERSI_RULES
+    return df.assign(**hasil)
+
+
+def _ke_csv(df, header):
+    """
+    CSV satu potongan sebagai bytes. Penulis CSV pyarrow (bila terpasang) jauh lebih cepat dari to_csv untuk
+    kolom REKOM yang panjang; kolom campuran yang tidak bisa dikonversi Arrow kembali ke to_csv.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return df.to_csv(index=False, header=header).encode("utf-8")
+    try:
+        tabel = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df.to_csv(index=False, header=header).encode("utf-8")
+    buffer = pa.BufferOutputStream()
+    pa_csv.write_csv(tabel, buffer, pa_csv.WriteOptions(include_header=header))
+    return buffer.getvalue().to_pybytes()
+
+
+def _proses(df, dengan_rekom, format_keluar, header):
+    """Pekerjaan satu potongan di worker: klasifikasi + serialisasi CSV (agar penulisan teks ikut paralel)."""
+    df = klasifikasi_potongan(df, dengan_rekom)
+    if format_keluar == "csv":
+        return _ke_csv(df, header)
+    return df
+
+
+# ===========================
+# Baca / Tulis Per Potongan
+# ===========================
+def _format(path):
+    return "parquet" if os.path.splitext(path)[1].lower() in (".parquet", ".pq") else "csv"
+
+
+def baca_potongan(path, chunksize=UKURAN_POTONGAN):
+    """Iterator DataFrame per potongan dari CSV atau Parquet."""
+    if _format(path) == "parquet":
+        import pyarrow.parquet as pq  # opsional; hanya dibutuhkan untuk file Parquet
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, low_memory=False)
+
+
+class PenulisPotongan:
+    """Menulis potongan hasil berurutan ke CSV (bytes siap tulis) atau Parquet (satu row group per potongan)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = _format(path)
+        self._file = open(path, "wb") if self.format == "csv" else None
+        self._writer = None
+
+    def tulis(self, hasil):
+        if self.format == "csv":
+            self._file.write(hasil)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            tabel = pa.Table.from_pandas(hasil, preserve_index=False)
+            self._writer = pq.ParquetWriter(self.path, tabel.schema)
+        else:
+            # Kolom kosong seluruhnya di potongan ini (tipe null) disamakan dengan skema potongan pertama
+            tabel = pa.Table.from_pandas(hasil, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(tabel)
+
+    def tutup(self):
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def klasifikasi_file(masuk, keluar, chunksize=UKURAN_POTONGAN, workers=1, dengan_rekom=True):
+    """Mengklasifikasi seluruh file `masuk` ke `keluar`; mengembalikan jumlah baris yang diproses."""
+    format_keluar = _format(keluar)
+    penulis = PenulisPotongan(keluar)
+    total = 0
+    try:
+        if workers <= 1:
+            for i, df in enumerate(baca_potongan(masuk, chunksize)):
+                penulis.tulis(_proses(df, dengan_rekom, format_keluar, i == 0))
+                total += len(df)
+            return total
+        # Antrian future dibatasi agar pembacaan tidak jauh mendahului penulisan (memori tetap terkendali)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            antrian = deque()
+            for i, df in enumerate(baca_potongan(masuk, chunksize)):
+                antrian.append(pool.submit(_proses, df, dengan_rekom, format_keluar, i == 0))
+                total += len(df)
+                if len(antrian) >= 2 * workers:
+                    penulis.tulis(antrian.popleft().result())
+            while antrian:
+                penulis.tulis(antrian.popleft().result())
+        return total
+    finally:
+        penulis.tutup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Klasifikasi batch bacaan metering dengan rules_param")
+    parser.add_argument("masuk", help="File bacaan (.csv atau .parquet)")
+    parser.add_argument("keluar", help="File hasil (.csv atau .parquet)")
+    parser.add_argument("--chunksize", type=int, default=UKURAN_POTONGAN, help="Jumlah baris per potongan")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses paralel (1 = tanpa process pool)")
+    parser.add_argument("--tanpa-rekom", action="store_true", help="Hanya menulis kolom STATUS")
+    args = parser.parse_args(argv)
+
+    mulai = time.perf_counter()
+    total = klasifikasi_file(args.masuk, args.keluar, args.chunksize, args.workers, not args.tanpa_rekom)
+    durasi = time.perf_counter() - mulai
+    print(f"{total} baris diklasifikasi dalam {durasi:.1f} s ({total / max(durasi, 1e-9) * 60:,.0f} baris/menit) -> {args.keluar}")
+
+
+if __name__ == "__main__":
+    main()
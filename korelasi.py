@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from grid_slot import INTERVAL_SLOT
+
+
+# ===========================
+# Korelasi Antar Parameter (matriks, lag, kelompok searah)
+# ===========================
+AMBANG_KORELASI = 0.7
+# Korelasi hanya dihitung bila minimal sekian slot punya nilai di kedua parameter
+MIN_PASANGAN = 12
+JAM_PER_SLOT = int(INTERVAL_SLOT / np.timedelta64(1, "h"))
+
+# Pola yang sudah dikenal: (parameter A, parameter B, tanda korelasi, indikasi penyebab)
+POLA_PENYEBAB = [
+    ("C/N (dB)", "MARGIN (dB)", 1,
+     "C/N & Margin bergerak bersama: kemungkinan rain fade atau arah dish bergeser"),
+    ("SUHU TX", "POWER OUTPUT (WATT)", -1,
+     "Suhu TX naik saat daya turun: periksa pendingin ruangan/pemancar"),
+    ("VSWR", "POWER OUTPUT (WATT)", -1,
+     "VSWR naik saat daya turun: periksa konektor, feeder, dan antena"),
+    ("TEGANGAN LISTRIK R (Volt)", "POWER OUTPUT (WATT)", 1,
+     "Daya mengikuti tegangan: suplai listrik/UPS tidak stabil"),
+]
+
+
+def korelasi_silang(a, b, min_pasangan=MIN_PASANGAN):
+    """
+    Korelasi Pearson setiap kolom `a` dengan setiap kolom `b` (baris sejajar), hanya memakai
+    slot yang terisi di kedua kolom. Semua jumlah dihitung sebagai perkalian matriks (tanpa loop pasangan).
+    Mengembalikan (r, n): r[i, j] = korelasi a[:, i] dengan b[:, j]; NaN bila data kurang/konstan.
+    """
+    ma, mb = ~np.isnan(a), ~np.isnan(b)
+    a0, b0 = np.where(ma, a, 0.0), np.where(mb, b, 0.0)
+    ma, mb = ma.astype(float), mb.astype(float)
+    n = ma.T @ mb
+    sa, sb = a0.T @ mb, ma.T @ b0
+    saa, sbb = (a0 * a0).T @ mb, ma.T @ (b0 * b0)
+    sab = a0.T @ b0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kov = sab - sa * sb / n
+        va = saa - sa * sa / n
+        vb = sbb - sb * sb / n
+        r = kov / np.sqrt(va * vb)
+    r[(n < min_pasangan) | ~(va > 1e-12) | ~(vb > 1e-12)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def korelasi_lag(x, maks_lag=0, min_pasangan=MIN_PASANGAN):
+    """
+    Korelasi terkuat tiap pasangan untuk lag -maks_lag..maks_lag slot.
+    Mengembalikan (r, lag, n); lag[i, j] > 0 berarti kolom i mendahului kolom j sebanyak lag slot.
+    """
+    terbaik, n = korelasi_silang(x, x, min_pasangan)
+    lag = np.zeros(terbaik.shape, dtype=int)
+    for geser in range(1, min(maks_lag, len(x) - 1) + 1):
+        r, n_geser = korelasi_silang(x[:-geser], x[geser:], min_pasangan)
+        # r[i, j]: i(t) vs j(t+geser) -> i mendahului j; transposenya: j mendahului i
+        for calon, n_calon, nilai_lag in ((r, n_geser, geser), (r.T, n_geser.T, -geser)):
+            lebih = np.nan_to_num(np.abs(calon), nan=-1) > np.nan_to_num(np.abs(terbaik), nan=-1)
+            terbaik = np.where(lebih, calon, terbaik)
+            lag = np.where(lebih, nilai_lag, lag)
+            n = np.where(lebih, n_calon, n)
+    return terbaik, lag, n
+
+
+def kelompok_searah(r, kolom, ambang=AMBANG_KORELASI):
+    """Komponen terhubung graf parameter dengan |r| >= ambang (union-find); hanya kelompok >= 2 anggota."""
+    induk = list(range(len(kolom)))
+
+    def akar(i):
+        while induk[i] != i:
+            induk[i] = induk[induk[i]]
+            i = induk[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.nan_to_num(np.abs(r)) >= ambang)):
+        if i != j:
+            induk[akar(i)] = akar(j)
+    anggota = {}
+    for i in range(len(kolom)):
+        anggota.setdefault(akar(i), []).append(i)
+    kelompok = []
+    for indeks in anggota.values():
+        if len(indeks) < 2:
+            continue
+        sub = np.abs(r[np.ix_(indeks, indeks)])
+        kelompok.append({
+            "Kelompok": ", ".join(kolom[i] for i in indeks),
+            "Anggota": len(indeks),
+            "Rata-rata |r|": round(float(np.nanmean(sub[~np.eye(len(indeks), dtype=bool)])), 2),
+        })
+    return pd.DataFrame(kelompok, columns=["Kelompok", "Anggota", "Rata-rata |r|"]).sort_values(
+        "Rata-rata |r|", ascending=False, ignore_index=True)
+
+
+def _indikasi(a, b, r):
+    for kolom_a, kolom_b, tanda, keterangan in POLA_PENYEBAB:
+        if {a, b} == {kolom_a, kolom_b} and np.sign(r) == tanda:
+            return keterangan
+    return ""
+
+
+def analisis_korelasi(grid, start=None, end=None, maks_lag=0, ambang=AMBANG_KORELASI):
+    """
+    Matriks korelasi (dengan lag terbaik) semua parameter grid pada rentang tanggal,
+    pasangan yang melewati ambang beserta indikasi penyebab, dan kelompok parameter yang bergerak bersama.
+    """
+    bagian = grid.rentang(start, end)
+    x = grid.matriks()[bagian]
+    kolom = list(grid.kolom)
+    r, lag, n = korelasi_lag(x, maks_lag)
+    pasangan = []
+    for i, j in zip(*np.triu_indices(len(kolom), k=1)):
+        if np.isnan(r[i, j]) or abs(r[i, j]) < ambang:
+            continue
+        pasangan.append({
+            "Parameter A": kolom[i],
+            "Parameter B": kolom[j],
+            "Korelasi": round(float(r[i, j]), 2),
+            "Lag (jam)": int(lag[i, j]) * JAM_PER_SLOT,
+            "Slot Berpasangan": int(n[i, j]),
+            "Indikasi": _indikasi(kolom[i], kolom[j], r[i, j]),
+        })
+    df_pasangan = pd.DataFrame(pasangan, columns=[
+        "Parameter A", "Parameter B", "Korelasi", "Lag (jam)", "Slot Berpasangan", "Indikasi"])
+    df_pasangan = df_pasangan.reindex(df_pasangan["Korelasi"].abs().sort_values(ascending=False).index)
+    return {
+        "matriks": pd.DataFrame(r, index=kolom, columns=kolom),
+        "lag": pd.DataFrame(lag * JAM_PER_SLOT, index=kolom, columns=kolom),
+        "pasangan": df_pasangan.reset_index(drop=True),
+        "kelompok": kelompok_searah(r, kolom, ambang),
+    }
+
+
+def korelasi_bergulir(grid, kolom_a, kolom_b, start=None, end=None, jendela_hari=7):
+    """Deret korelasi bergulir dua parameter (jendela `jendela_hari`, minimal separuh slot terisi)."""
+    bagian = grid.rentang(start, end)
+    jendela = jendela_hari * 24 // JAM_PER_SLOT
+    a = pd.Series(grid.nilai[kolom_a][bagian])
+    b = pd.Series(grid.nilai[kolom_b][bagian])
+    r = a.rolling(jendela, min_periods=max(jendela // 2, 2)).corr(b)
+    return pd.DataFrame({"DATETIME": grid.waktu[bagian], "Korelasi": r.to_numpy()})
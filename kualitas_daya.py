@@ -0,0 +1,157 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from processing import KOLOM_TEGANGAN, imbalance_tegangan
+
+
+# ===========================
+# Kualitas Daya 3 Fasa (imbalance, deviasi fasa, sag/swell)
+# ===========================
+FASA = ["R", "S", "T"]
+TEGANGAN_NOMINAL = 220.0
+# Sag/swell terhadap tegangan nominal (per unit), mengikuti batas umum IEEE 1159
+BATAS_SAG = 0.9
+BATAS_SWELL = 1.1
+# Imbalance (%) <= 2 Normal, <= 5 Warning, di atasnya Trouble (batas derating catu daya/motor)
+BATAS_IMBALANCE = {"Normal": 2.0, "Warning": 5.0}
+# Bacaan sag/swell berurutan dengan selisih <= 1 slot dianggap satu kejadian
+JEDA_KEJADIAN = pd.Timedelta(hours=4)
+
+
+def status_imbalance(imbalance):
+    """Status imbalance (%) menurut BATAS_IMBALANCE; NaN -> N/A."""
+    imbalance = np.asarray(imbalance, dtype=float)
+    return np.select(
+        [np.isnan(imbalance), imbalance <= BATAS_IMBALANCE["Normal"], imbalance <= BATAS_IMBALANCE["Warning"]],
+        ["N/A", "Normal", "Warning"], default="Trouble",
+    )
+
+
+class AnalisisDaya:
+    """
+    Analitik kualitas daya seluruh histori metering, dihitung sekali per versi data (semua operasi vektor):
+    imbalance per bacaan, deviasi tiap fasa dari nominal, dan daftar kejadian sag/swell.
+    Query rentang tanggal cukup dua binary search pada DATETIME yang terurut.
+    """
+
+    def __init__(self, df):
+        if "DATETIME" in df.columns:
+            df = df.dropna(subset=["DATETIME"])
+        else:
+            df = df.iloc[0:0].assign(DATETIME=pd.Series(dtype="datetime64[ns]"))
+        if not df["DATETIME"].is_monotonic_increasing:
+            df = df.sort_values("DATETIME", kind="stable")
+        self.waktu = df["DATETIME"].to_numpy(dtype="datetime64[ns]")
+        self.volt = df.reindex(columns=KOLOM_TEGANGAN).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        if "IMBALANCE TEGANGAN (%)" in df.columns:
+            # Kolom turunan tersimpan; baris lama tanpa nilai dihitung ulang
+            imbalance = pd.to_numeric(df["IMBALANCE TEGANGAN (%)"], errors="coerce").to_numpy(dtype=float)
+            kosong = np.isnan(imbalance)
+            if kosong.any():
+                imbalance[kosong] = imbalance_tegangan(df[kosong])
+        else:
+            imbalance = imbalance_tegangan(df)
+        self.imbalance = imbalance
+        self.status = status_imbalance(imbalance)
+        self.deviasi = (self.volt - TEGANGAN_NOMINAL) / TEGANGAN_NOMINAL * 100
+        self.sag = self.volt < BATAS_SAG * TEGANGAN_NOMINAL
+        self.swell = self.volt > BATAS_SWELL * TEGANGAN_NOMINAL
+        self.kejadian = self._kelompokkan_kejadian()
+
+    def _kelompokkan_kejadian(self):
+        """Bacaan sag/swell berurutan (jenis sama, jeda <= 1 slot) digabung menjadi satu kejadian."""
+        kolom = ["Mulai", "Selesai", "Jenis", "Fasa", "Tegangan Min (V)", "Tegangan Maks (V)", "Bacaan"]
+        ada_sag, ada_swell = self.sag.any(axis=1), self.swell.any(axis=1)
+        jenis = np.select([ada_sag & ada_swell, ada_sag, ada_swell], ["Sag+Swell", "Sag", "Swell"], default="")
+        baris = np.flatnonzero(jenis != "")
+        if len(baris) == 0:
+            return pd.DataFrame(columns=kolom)
+        waktu = self.waktu[baris]
+        jenis = jenis[baris]
+        lanjut = np.zeros(len(baris), dtype=bool)
+        lanjut[1:] = (baris[1:] == baris[:-1] + 1) & (jenis[1:] == jenis[:-1]) & (np.diff(waktu) <= JEDA_KEJADIAN)
+        nomor = np.cumsum(~lanjut)
+        terdampak = pd.DataFrame(self.sag[baris] | self.swell[baris], columns=FASA)
+        volt = self.volt[baris]
+        rekap = pd.DataFrame({
+            "kejadian": nomor,
+            "Mulai": waktu,
+            "Selesai": waktu,
+            "Jenis": jenis,
+            "Tegangan Min (V)": np.nanmin(volt, axis=1),
+            "Tegangan Maks (V)": np.nanmax(volt, axis=1),
+        }).join(terdampak)
+        hasil = rekap.groupby("kejadian").agg(**{
+            "Mulai": ("Mulai", "min"),
+            "Selesai": ("Selesai", "max"),
+            "Jenis": ("Jenis", "first"),
+            "Tegangan Min (V)": ("Tegangan Min (V)", "min"),
+            "Tegangan Maks (V)": ("Tegangan Maks (V)", "max"),
+            "Bacaan": ("Jenis", "size"),
+            **{f: (f, "any") for f in FASA},
+        })
+        hasil["Fasa"] = [", ".join(f for f, kena in zip(FASA, terkena) if kena) for terkena in hasil[FASA].to_numpy()]
+        return hasil[kolom].reset_index(drop=True)
+
+    def _batas(self, start, end):
+        """Indeks [i, j) bacaan dengan start <= DATETIME < end + 1 hari."""
+        awal = np.datetime64(pd.Timestamp(start), "ns")
+        akhir = np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns")
+        return np.searchsorted(self.waktu, awal, "left"), np.searchsorted(self.waktu, akhir, "left")
+
+    def ringkasan(self, start, end):
+        """Ringkasan kualitas daya pada rentang tanggal: imbalance, deviasi per fasa, jumlah sag/swell."""
+        i, j = self._batas(start, end)
+        imbalance = self.imbalance[i:j]
+        status = self.status[i:j]
+        ada = not np.isnan(imbalance).all()
+        baris = [
+            {"Keterangan": "Jumlah bacaan", "Nilai": int(j - i)},
+            {"Keterangan": "Rata-rata imbalance (%)", "Nilai": round(float(np.nanmean(imbalance)), 2) if ada else "-"},
+            {"Keterangan": "Imbalance maksimum (%)", "Nilai": round(float(np.nanmax(imbalance)), 2) if ada else "-"},
+            {"Keterangan": f"Bacaan imbalance Warning (> {BATAS_IMBALANCE['Normal']:g}%)", "Nilai": int((status == "Warning").sum())},
+            {"Keterangan": f"Bacaan imbalance Trouble (> {BATAS_IMBALANCE['Warning']:g}%)", "Nilai": int((status == "Trouble").sum())},
+        ]
+        deviasi = self.deviasi[i:j]
+        for k, fasa in enumerate(FASA):
+            kolom = deviasi[:, k]
+            baris.append({
+                "Keterangan": f"Deviasi rata-rata fasa {fasa} dari {TEGANGAN_NOMINAL:g} V (%)",
+                "Nilai": round(float(np.nanmean(kolom)), 2) if not np.isnan(kolom).all() else "-",
+            })
+        kejadian = self.kejadian_rentang(start, end)
+        baris.append({"Keterangan": "Kejadian sag", "Nilai": int(kejadian["Jenis"].str.contains("Sag").sum())})
+        baris.append({"Keterangan": "Kejadian swell", "Nilai": int(kejadian["Jenis"].str.contains("Swell").sum())})
+        return pd.DataFrame(baris)
+
+    def kejadian_rentang(self, start, end):
+        """Kejadian sag/swell yang dimulai pada rentang tanggal."""
+        awal = pd.Timestamp(start)
+        akhir = pd.Timestamp(end) + pd.Timedelta(days=1)
+        mulai = self.kejadian["Mulai"]
+        return self.kejadian[(mulai >= awal) & (mulai < akhir)].reset_index(drop=True)
+
+    def grafik(self, start, end):
+        """Figure dua panel: imbalance (%) dengan garis batas, dan deviasi tiap fasa dari nominal."""
+        i, j = self._batas(start, end)
+        waktu = self.waktu[i:j]
+        fig, (ax_imb, ax_dev) = plt.subplots(2, 1, figsize=(12, 7), sharex=True)
+        ax_imb.plot(waktu, self.imbalance[i:j], marker=".", label="Imbalance")
+        ax_imb.axhline(BATAS_IMBALANCE["Normal"], color="orange", linestyle="--", label="Batas Warning")
+        ax_imb.axhline(BATAS_IMBALANCE["Warning"], color="red", linestyle="--", label="Batas Trouble")
+        ax_imb.set_ylabel("Imbalance (%)")
+        ax_imb.set_title("Imbalance Tegangan 3 Fasa")
+        ax_imb.legend()
+        ax_imb.grid(True)
+
+        for k, fasa in enumerate(FASA):
+            ax_dev.plot(waktu, self.deviasi[i:j, k], marker=".", label=f"Fasa {fasa}")
+        ax_dev.axhline((BATAS_SAG - 1) * 100, color="red", linestyle=":", label="Batas sag")
+        ax_dev.axhline((BATAS_SWELL - 1) * 100, color="purple", linestyle=":", label="Batas swell")
+        ax_dev.set_ylabel(f"Deviasi dari {TEGANGAN_NOMINAL:g} V (%)")
+        ax_dev.set_xlabel("Tanggal dan Waktu")
+        ax_dev.legend()
+        ax_dev.grid(True)
+        plt.tight_layout()
+        return fig
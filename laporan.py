@@ -0,0 +1,140 @@
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+
+from rules import KOLOM_RULES, ceklist_rules
+from sla import SLAIndex
+
+
+# ===========================
+# Laporan Bulanan SLA & Maintenance
+# ===========================
+BARIS_PER_HALAMAN_PDF = 30
+
+
+def daftar_bulan(df):
+    """Bulan (YYYY-MM) yang punya data metering, terbaru di depan."""
+    if df.empty or "DATETIME" not in df.columns:
+        return []
+    return sorted(df["DATETIME"].dropna().dt.strftime("%Y-%m").unique(), reverse=True)
+
+
+def _rentang_bulan(bulan):
+    awal = pd.Timestamp(f"{bulan}-01")
+    return awal, awal + pd.offsets.MonthEnd(0)
+
+
+def _trouble_per_parameter(df):
+    """Jumlah bacaan Warning/Trouble per parameter dari kolom STATUS tersimpan (satu kali melt)."""
+    kolom_status = [f"STATUS {kolom}" for kolom in KOLOM_RULES if f"STATUS {kolom}" in df.columns]
+    if df.empty or not kolom_status:
+        return pd.DataFrame(columns=["Parameter", "Warning", "Trouble"])
+    panjang = df[kolom_status].melt(var_name="Parameter", value_name="Status")
+    tabel = pd.crosstab(panjang["Parameter"], panjang["Status"]).reindex(columns=["Warning", "Trouble"], fill_value=0)
+    tabel.index = tabel.index.str.removeprefix("STATUS ")
+    return tabel.sort_values(["Trouble", "Warning"], ascending=False).reset_index()
+
+
+def _slot_terburuk(df, jumlah=10):
+    """Slot (tanggal + jam) dengan parameter bermasalah terbanyak."""
+    kolom_status = [f"STATUS {kolom}" for kolom in KOLOM_RULES if f"STATUS {kolom}" in df.columns]
+    if df.empty or not kolom_status:
+        return pd.DataFrame(columns=["Waktu", "STATUS TERBURUK", "Trouble", "Warning", "Operator"])
+    status = df[kolom_status].to_numpy()
+    hasil = pd.DataFrame({
+        "Waktu": df["DATETIME"].dt.strftime("%Y-%m-%d %H:%M"),
+        "STATUS TERBURUK": df.get("STATUS TERBURUK"),
+        "Trouble": (status == "Trouble").sum(axis=1),
+        "Warning": (status == "Warning").sum(axis=1),
+        "Operator": df.get("OPERATOR"),
+    })
+    hasil = hasil[(hasil["Trouble"] + hasil["Warning"]) > 0]
+    return hasil.sort_values(["Trouble", "Warning"], ascending=False).head(jumlah).reset_index(drop=True)
+
+
+def _tren_perangkat(df_catatan):
+    """Jumlah kondisi Warning/Trouble per perangkat ceklist per minggu dalam bulan."""
+    kolom = [f"{param}_KONDISI" for param in ceklist_rules if f"{param}_KONDISI" in df_catatan.columns]
+    if df_catatan.empty or not kolom:
+        return pd.DataFrame(columns=["Perangkat"])
+    minggu = "Minggu " + ((df_catatan["TANGGAL_CEKLIST"].dt.day - 1) // 7 + 1).astype(str)
+    panjang = df_catatan[kolom].assign(Minggu=minggu.to_numpy()).melt(id_vars="Minggu", var_name="Perangkat", value_name="Kondisi")
+    panjang = panjang[panjang["Kondisi"].isin(["Warning", "Trouble"])]
+    if panjang.empty:
+        return pd.DataFrame(columns=["Perangkat"])
+    panjang["Perangkat"] = panjang["Perangkat"].str.removesuffix("_KONDISI")
+    tabel = pd.crosstab([panjang["Perangkat"], panjang["Kondisi"]], panjang["Minggu"])
+    tabel["Total"] = tabel.sum(axis=1)
+    tabel.columns.name = None
+    return tabel.sort_values("Total", ascending=False).reset_index()
+
+
+def buat_laporan_bulanan(df_meter, df_catatan, bulan):
+    """
+    Menghitung isi laporan satu bulan (YYYY-MM) dari histori tersimpan:
+    ringkasan, SLA per kanal, jumlah Warning/Trouble per parameter, slot terburuk,
+    dan tren kondisi perangkat ceklist. Mengembalikan dict nama bagian -> DataFrame.
+    """
+    awal, akhir = _rentang_bulan(bulan)
+    if "DATETIME" in df_meter.columns:
+        meter = df_meter[(df_meter["DATETIME"] >= awal) & (df_meter["DATETIME"] < akhir + pd.Timedelta(days=1))]
+    else:
+        meter = df_meter.iloc[0:0]
+    if "TANGGAL_CEKLIST" in df_catatan.columns:
+        catatan = df_catatan[(df_catatan["TANGGAL_CEKLIST"] >= awal) & (df_catatan["TANGGAL_CEKLIST"] <= akhir)]
+    else:
+        catatan = df_catatan.iloc[0:0]
+
+    terburuk = meter.get("STATUS TERBURUK", pd.Series(dtype=object)).value_counts()
+    ringkasan = pd.DataFrame([
+        {"Keterangan": "Periode", "Nilai": f"{awal:%d-%m-%Y} s.d. {akhir:%d-%m-%Y}"},
+        {"Keterangan": "Jumlah bacaan metering", "Nilai": len(meter)},
+        {"Keterangan": "Slot dengan status terburuk Trouble", "Nilai": int(terburuk.get("Trouble", 0))},
+        {"Keterangan": "Slot dengan status terburuk Warning", "Nilai": int(terburuk.get("Warning", 0))},
+        {"Keterangan": "Rata-rata imbalance tegangan (%)",
+         "Nilai": round(float(np.nanmean(meter["IMBALANCE TEGANGAN (%)"])), 2)
+         if "IMBALANCE TEGANGAN (%)" in meter.columns and meter["IMBALANCE TEGANGAN (%)"].notna().any() else "-"},
+        {"Keterangan": "Jumlah ceklist harian", "Nilai": len(catatan)},
+    ])
+    return {
+        "Ringkasan": ringkasan,
+        "SLA Kanal": SLAIndex(meter).tabel(awal, akhir),
+        "Trouble per Parameter": _trouble_per_parameter(meter),
+        "Slot Terburuk": _slot_terburuk(meter),
+        "Tren Perangkat": _tren_perangkat(catatan),
+    }
+
+
+# ===========================
+# Ekspor Laporan (Excel / PDF)
+# ===========================
+def laporan_ke_excel(laporan):
+    """Satu sheet Excel per bagian laporan."""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for nama, df in laporan.items():
+            df.to_excel(writer, sheet_name=nama[:31], index=False)
+    return buffer.getvalue()
+
+
+def laporan_ke_pdf(laporan, judul):
+    """PDF berisi tabel tiap bagian laporan (dipecah per halaman bila panjang)."""
+    buffer = BytesIO()
+    with PdfPages(buffer) as pdf:
+        for nama, df in laporan.items():
+            teks = df.astype(str) if not df.empty else pd.DataFrame({"Keterangan": ["Tidak ada data"]})
+            for mulai in range(0, max(len(teks), 1), BARIS_PER_HALAMAN_PDF):
+                potongan = teks.iloc[mulai:mulai + BARIS_PER_HALAMAN_PDF]
+                fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape
+                ax.axis("off")
+                ax.set_title(f"{judul}\n{nama}", fontsize=12, loc="left")
+                tabel = ax.table(cellText=potongan.values, colLabels=list(potongan.columns), loc="upper center", cellLoc="left")
+                tabel.auto_set_font_size(False)
+                tabel.set_fontsize(7)
+                tabel.auto_set_column_width(range(len(potongan.columns)))
+                pdf.savefig(fig)
+                plt.close(fig)
+    return buffer.getvalue()
@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+
+# ===========================
+# Rekaman Waktu per Rerun
+# ===========================
+# Streamlit menjalankan script setiap sesi di thread sendiri,
+# jadi rekaman per rerun cukup disimpan di thread-local.
+_lokal = threading.local()
+
+
+class RerunMetrics:
+    """Kumpulan durasi per fase dan jumlah panggilan/bytes API Sheets untuk satu rerun."""
+
+    def __init__(self):
+        self.mulai = time.perf_counter()
+        self.fase = {}
+        self.api_calls = 0
+        self.api_bytes = 0
+
+    def tambah_fase(self, nama, durasi):
+        total, jumlah = self.fase.get(nama, (0.0, 0))
+        self.fase[nama] = (total + durasi, jumlah + 1)
+
+    def ringkasan(self):
+        return {
+            "total_ms": round((time.perf_counter() - self.mulai) * 1000, 1),
+            "fase": {nama: {"ms": round(total * 1000, 1), "jumlah": jumlah} for nama, (total, jumlah) in self.fase.items()},
+            "api_calls": self.api_calls,
+            "api_bytes": self.api_bytes,
+        }
+
+
+def mulai_rerun():
+    """Memulai rekaman baru untuk rerun yang sedang berjalan di thread ini."""
+    _lokal.metrics = RerunMetrics()
+    return _lokal.metrics
+
+
+def metrics_aktif():
+    """Rekaman rerun aktif di thread ini (None jika tidak ada)."""
+    return getattr(_lokal, "metrics", None)
+
+
+@contextmanager
+def ukur(fase):
+    """Context manager pengukur durasi satu fase; aman dipakai walau tidak ada rerun aktif."""
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        rekaman = metrics_aktif()
+        if rekaman is not None:
+            rekaman.tambah_fase(fase, time.perf_counter() - mulai)
+
+
+def catat_api(n_bytes=0):
+    """Mencatat satu panggilan API Sheets beserta ukuran payload-nya."""
+    rekaman = metrics_aktif()
+    if rekaman is not None:
+        rekaman.api_calls += 1
+        rekaman.api_bytes += int(n_bytes)
+
+
+def pasang_hook_api(client):
+    """Memasang hook response pada session HTTP client gspread agar setiap request tercatat."""
+    http_client = getattr(client, "http_client", client)
+    session = getattr(http_client, "session", None)
+    if session is None:
+        return
+
+    def _hook(response, *args, **kwargs):
+        catat_api(len(response.content or b""))
+
+    session.hooks.setdefault("response", []).append(_hook)
+
+
+# ===========================
+# Log Terstruktur (JSON Lines, Rotating)
+# ===========================
+def _logger():
+    logger = logging.getLogger("monitoring.performa")
+    if not logger.handlers:
+        path = os.environ.get("PERF_LOG_PATH", os.path.join("logs", "performa.log"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def selesai_rerun(halaman, **info):
+    """Menutup rekaman rerun, menulis satu baris JSON ke log, dan mengembalikan ringkasannya."""
+    rekaman = metrics_aktif()
+    if rekaman is None:
+        return None
+    ringkasan = {"waktu": time.strftime("%Y-%m-%dT%H:%M:%S"), "halaman": halaman, **info, **rekaman.ringkasan()}
+    try:
+        _logger().info(json.dumps(ringkasan, ensure_ascii=False))
+    except OSError:
+        # Log tidak boleh menggagalkan aplikasi (mis. folder read-only)
+        pass
+    return ringkasan
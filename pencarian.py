@@ -0,0 +1,235 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rules import ceklist_rules
+
+
+# ===========================
+# Pencarian Teks Catatan (Inverted Index)
+# ===========================
+POLA_TOKEN = re.compile(r"\w+")
+POLA_KUERI = re.compile(r'"([^"]*)"|(\S+)')
+BATAS_HASIL = 200
+
+
+def tokenisasi(teks):
+    return POLA_TOKEN.findall(str(teks).lower())
+
+
+def urai_kueri(kueri):
+    """
+    Kueri -> daftar syarat (semua harus terpenuhi). Setiap syarat adalah daftar token:
+    kata biasa = satu token, "frasa dalam kutip" = token berurutan, akhiran * = awalan kata (mis. konektor*).
+    """
+    syarat = []
+    for frasa, kata in POLA_KUERI.findall(kueri):
+        prefiks = (kata or frasa).rstrip().endswith("*")
+        token = tokenisasi(frasa or kata)
+        if token:
+            if prefiks:
+                token[-1] += "*"
+            syarat.append(token)
+    return syarat
+
+
+class IndeksTeks:
+    """
+    Inverted index satu sheet. Teks unik (nilai sel) ditokenisasi sekali dan diindeks token -> id teks;
+    setiap baris disimpan sebagai deretan id teks per bidang, sehingga template berulang (mis. rekomendasi
+    ceklist yang sama setiap hari) tidak memperbesar index. Pencarian: token/frasa -> id teks cocok ->
+    np.isin pada matriks baris x bidang.
+    """
+
+    def __init__(self, sumber, kolom_waktu, kolom_operator, bidang, kolom_kunci=None):
+        self.sumber = sumber
+        self.kolom_waktu = kolom_waktu
+        self.kolom_operator = kolom_operator
+        self.bidang = bidang
+        self.kolom_kunci = kolom_kunci
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.teks = [""]
+        self.token_teks = [[]]
+        self._id_teks = {"": 0}
+        self.posting = {}
+        self._potongan = []  # (matriks id teks, waktu, operator) per penambahan
+        self._kunci = {}
+        self._nonaktif = set()
+        self._gabungan = None
+        self.revisi = None
+
+    def _id(self, teks):
+        """Id teks unik; teks baru ditokenisasi dan dimasukkan ke posting token -> id teks."""
+        id_teks = self._id_teks.get(teks)
+        if id_teks is None:
+            id_teks = len(self.teks)
+            self._id_teks[teks] = id_teks
+            self.teks.append(teks)
+            token = tokenisasi(teks)
+            self.token_teks.append(token)
+            for t in set(token):
+                self.posting.setdefault(t, set()).add(id_teks)
+        return id_teks
+
+    def _masukkan(self, df):
+        if df.empty:
+            return
+        kolom = []
+        for fungsi in self.bidang.values():
+            nilai = fungsi(df).fillna("").astype(str).str.strip()
+            kode, unik = pd.factorize(nilai)
+            kolom.append(np.array([self._id(t) for t in unik], dtype=np.int32)[kode])
+        waktu = pd.to_datetime(df[self.kolom_waktu], errors="coerce").to_numpy(dtype="datetime64[ns]") \
+            if self.kolom_waktu in df.columns else np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+        operator = df[self.kolom_operator].fillna("").astype(str).to_numpy() \
+            if self.kolom_operator in df.columns else np.full(len(df), "", dtype=object)
+        awal = sum(len(p[1]) for p in self._potongan)
+        if self.kolom_kunci and self.kolom_kunci in df.columns:
+            # Baris dengan kunci yang sama (upsert) menggantikan baris lama di hasil pencarian
+            for i, kunci in enumerate(df[self.kolom_kunci].astype(str).to_numpy(), start=awal):
+                if kunci in ("", "NaT", "nan"):
+                    continue
+                lama = self._kunci.get(kunci)
+                if lama is not None:
+                    self._nonaktif.add(lama)
+                self._kunci[kunci] = i
+        self._potongan.append((np.column_stack(kolom), waktu, operator))
+        self._gabungan = None
+
+    def bangun(self, df, revisi=None):
+        with self._lock:
+            self._reset()
+            self._masukkan(df)
+            self.revisi = revisi
+
+    def perbarui(self, df_baru, revisi=None):
+        with self._lock:
+            self._masukkan(df_baru)
+            self.revisi = revisi
+
+    def sinkron(self, df, revisi, delta=None):
+        """Delta ditambahkan bila revisi tepat satu di depan; revisi terlewat / muat ulang penuh -> bangun ulang."""
+        if delta is not None and self.revisi is not None and revisi == self.revisi + 1:
+            self.perbarui(delta, revisi)
+        elif revisi != self.revisi:
+            self.bangun(df, revisi)
+
+    def _gabung(self):
+        """Matriks, waktu, operator, dan penanda aktif semua baris (digabung sekali setelah ada perubahan)."""
+        if self._gabungan is None:
+            if self._potongan:
+                matriks = np.concatenate([p[0] for p in self._potongan])
+                waktu = np.concatenate([p[1] for p in self._potongan])
+                operator = np.concatenate([p[2] for p in self._potongan])
+            else:
+                matriks = np.zeros((0, len(self.bidang)), dtype=np.int32)
+                waktu = np.array([], dtype="datetime64[ns]")
+                operator = np.array([], dtype=object)
+            aktif = np.ones(len(waktu), dtype=bool)
+            aktif[list(self._nonaktif)] = False
+            self._potongan = [(matriks, waktu, operator)] if len(waktu) else []
+            self._gabungan = (matriks, waktu, operator, aktif)
+        return self._gabungan
+
+    def _teks_cocok(self, token):
+        """Id teks yang memuat token/frasa (token terakhir boleh berakhiran * untuk pencocokan awalan)."""
+        def posting(t):
+            if t.endswith("*"):
+                awalan = t[:-1]
+                return set().union(*(ids for kata, ids in self.posting.items() if kata.startswith(awalan)))
+            return self.posting.get(t, set())
+
+        calon = set.intersection(*(posting(t) for t in token))
+        if len(token) > 1:
+            calon = {i for i in calon if self._ada_frasa(self.token_teks[i], token)}
+        return np.fromiter(calon, dtype=np.int32, count=len(calon))
+
+    @staticmethod
+    def _ada_frasa(isi, frasa):
+        n = len(frasa)
+        for i in range(len(isi) - n + 1):
+            if all(a == b or (b.endswith("*") and a.startswith(b[:-1])) for a, b in zip(isi[i:i + n], frasa)):
+                return True
+        return False
+
+    def cari(self, syarat, start=None, end=None):
+        """Baris yang memenuhi semua syarat pada rentang tanggal: DataFrame Sumber/Waktu/Operator/Cuplikan."""
+        with self._lock:
+            matriks, waktu, operator, aktif = self._gabung()
+            cocok = aktif.copy()
+            if start is not None:
+                cocok &= waktu >= np.datetime64(pd.Timestamp(start), "ns")
+            if end is not None:
+                cocok &= waktu < np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns")
+            semua_id = []
+            for token in syarat:
+                ids = self._teks_cocok(token)
+                semua_id.append(ids)
+                baris = np.flatnonzero(cocok)
+                cocok[baris] = np.isin(matriks[baris], ids).any(axis=1)
+            baris = np.flatnonzero(cocok)
+            baris = baris[np.argsort(waktu[baris], kind="stable")[::-1]]
+            id_cocok = set(np.concatenate(semua_id).tolist()) if semua_id else set()
+            cuplikan = []
+            for i in baris[:BATAS_HASIL]:
+                isi = [self.teks[t] for t in matriks[i].tolist() if t in id_cocok]
+                cuplikan.append(" | ".join(dict.fromkeys(isi)))
+            return pd.DataFrame({
+                "Sumber": self.sumber,
+                "Waktu": waktu[baris[:BATAS_HASIL]],
+                "Operator": operator[baris[:BATAS_HASIL]],
+                "Cuplikan": cuplikan,
+            }), len(baris)
+
+
+def _kondisi_bermasalah(param):
+    """Bidang teks '<perangkat>: Warning/Trouble' agar kondisi perangkat ikut bisa dicari."""
+    def fungsi(df):
+        kondisi = df.get(f"{param}_KONDISI", pd.Series("", index=df.index)).astype(str)
+        return (param + ": " + kondisi).where(kondisi.isin(["Warning", "Trouble"]), "")
+    return fungsi
+
+
+def _kolom(nama):
+    return lambda df: df.get(nama, pd.Series("", index=df.index))
+
+
+class PencarianCatatan:
+    """Dua inverted index (catatan metering & histori ceklist) yang dicari bersama."""
+
+    def __init__(self, data_sheet, notes_sheet):
+        bidang_ceklist = {"OPERATOR": _kolom("OPERATOR_CEKLIST")}
+        for param in ceklist_rules:
+            bidang_ceklist[f"{param} KONDISI"] = _kondisi_bermasalah(param)
+            bidang_ceklist[f"{param} REKOMENDASI"] = _kolom(f"{param}_REKOMENDASI")
+        self.indeks = {
+            data_sheet: IndeksTeks("Metering", "DATETIME", "OPERATOR", {
+                "CATATAN": _kolom("CATATAN/KETERANGAN"),
+                "OPERATOR": _kolom("OPERATOR"),
+            }, kolom_kunci="DATETIME"),
+            notes_sheet: IndeksTeks("Ceklist", "TANGGAL_WAKTU", "OPERATOR_CEKLIST", bidang_ceklist),
+        }
+
+    def sinkron(self, sheet, df, revisi, delta=None):
+        if sheet in self.indeks:
+            self.indeks[sheet].sinkron(df, revisi, delta)
+
+    def cari(self, kueri, start=None, end=None, sumber=None):
+        """Hasil gabungan semua sheet (terbaru di atas, maksimal BATAS_HASIL) dan jumlah total baris cocok."""
+        syarat = urai_kueri(kueri)
+        if not syarat:
+            return pd.DataFrame(columns=["Sumber", "Waktu", "Operator", "Cuplikan"]), 0
+        hasil, total = [], 0
+        for indeks in self.indeks.values():
+            if sumber and indeks.sumber not in sumber:
+                continue
+            df, jumlah = indeks.cari(syarat, start, end)
+            hasil.append(df)
+            total += jumlah
+        df = pd.concat(hasil, ignore_index=True) if hasil else pd.DataFrame(columns=["Sumber", "Waktu", "Operator", "Cuplikan"])
+        return df.sort_values("Waktu", ascending=False, kind="stable").head(BATAS_HASIL).reset_index(drop=True), total
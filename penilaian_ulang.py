@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from processing import URUTAN_STATUS
+from rules import KOLOM_RULES, VERSI_RULES, batas_rules, klasifikasi_nilai
+
+
+# ===========================
+# Penilaian Ulang Histori Saat Rules Berubah
+# ===========================
+# Arsip batas status setiap versi rules yang pernah dipakai: VERSI | RULE | URUTAN | MIN | MAX | STATUS
+SHEET_RULES = "_RULES"
+KOLOM_VERSI = "VERSI RULES"
+
+
+def tabel_rules(versi=VERSI_RULES, batas=None):
+    """Batas status satu versi rules sebagai baris arsip."""
+    batas = batas_rules() if batas is None else batas
+    return pd.DataFrame(
+        [{"VERSI": versi, "RULE": nama, "URUTAN": i, "MIN": bawah, "MAX": atas, "STATUS": status}
+         for nama, daftar in batas.items() for i, (bawah, atas, status) in enumerate(daftar)],
+        columns=["VERSI", "RULE", "URUTAN", "MIN", "MAX", "STATUS"],
+    )
+
+
+def arsip_dari_tabel(df):
+    """Baris arsip -> {versi: {rule: [(min, max, status), ...]}}."""
+    arsip = {}
+    if df.empty:
+        return arsip
+    df = df.assign(URUTAN=pd.to_numeric(df["URUTAN"], errors="coerce")).sort_values(["VERSI", "RULE", "URUTAN"])
+    for (versi, nama), kelompok in df.groupby(["VERSI", "RULE"], sort=False):
+        arsip.setdefault(str(versi), {})[nama] = [
+            (float(bawah), float(atas), status)
+            for bawah, atas, status in kelompok[["MIN", "MAX", "STATUS"]].itertuples(index=False)
+        ]
+    return arsip
+
+
+def daftarkan_versi(storage):
+    """Menambahkan batas versi rules yang berlaku ke arsip (sekali per versi); mengembalikan arsip lengkap."""
+    arsip = arsip_dari_tabel(storage.load(SHEET_RULES))
+    if VERSI_RULES not in arsip:
+        storage.append(SHEET_RULES, tabel_rules())
+        arsip[VERSI_RULES] = batas_rules()
+    return arsip
+
+
+def _status(batas, nilai):
+    """Status per nilai menurut daftar (min, max, status); rule pertama yang cocok dipakai, selain itu N/A."""
+    kondisi = [(nilai >= bawah) & (nilai <= atas) for bawah, atas, _ in batas]
+    return np.select(kondisi, [status for _, _, status in batas], default="N/A")
+
+
+def nilai_terdampak(nilai, lama, baru):
+    """
+    Penanda nilai yang statusnya bisa berbeda antara batas `lama` dan `baru`.
+
+    Status kedua versi konstan di antara titik batas yang berurutan, sehingga sumbu nilai cukup dibagi menjadi
+    titik batas dan interval terbuka di antaranya; satu nilai wakil per wilayah menentukan apakah wilayah itu
+    berubah, lalu setiap nilai dipetakan ke wilayahnya dengan searchsorted.
+    """
+    nilai = pd.to_numeric(pd.Series(nilai), errors="coerce").to_numpy(dtype=float)
+    titik = np.unique([b for bawah, atas, _ in lama + baru for b in (bawah, atas)])
+    if len(titik) == 0:
+        return np.zeros(len(nilai), dtype=bool)
+    tengah = np.concatenate(([titik[0] - 1], (titik[:-1] + titik[1:]) / 2, [titik[-1] + 1]))
+    # Wilayah 2i = interval terbuka sebelum titik[i], wilayah 2i+1 = titik[i] itu sendiri
+    wakil = np.empty(2 * len(titik) + 1)
+    wakil[0::2] = tengah
+    wakil[1::2] = titik
+    berubah = _status(lama, wakil) != _status(baru, wakil)
+    i = np.searchsorted(titik, nilai, "left")
+    tepat = (i < len(titik)) & (titik[np.minimum(i, len(titik) - 1)] == nilai)
+    wilayah = 2 * i + tepat
+    return ~np.isnan(nilai) & berubah[np.minimum(wilayah, len(berubah) - 1)]
+
+
+def nilai_ulang(df, arsip):
+    """
+    Menilai ulang baris metering yang VERSI RULES-nya bukan versi berlaku.
+
+    Untuk versi yang ada di arsip, hanya kolom yang batasnya berubah dan hanya baris yang nilainya jatuh di
+    interval yang berubah yang diklasifikasi ulang. Baris tanpa versi / versi tidak dikenal dinilai penuh.
+    Mengembalikan (baris yang perlu ditulis ulang, ringkasan per kolom). Semua baris versi lama ikut ditulis
+    dengan versi berlaku (termasuk yang statusnya tetap), agar setelah satu kali penilaian ulang tidak ada lagi
+    baris basi dan penilaian ulang tidak diminta terus-menerus.
+    """
+    kolom_ringkasan = ["Kolom", "Baris Dicek", "Status Berubah"]
+    if df.empty:
+        return df, pd.DataFrame(columns=kolom_ringkasan)
+    versi = df[KOLOM_VERSI].fillna("").astype(str).to_numpy() if KOLOM_VERSI in df.columns \
+        else np.full(len(df), "", dtype=object)
+    basi = versi != VERSI_RULES
+    baru = batas_rules()
+    hasil = df.copy()
+    diubah = np.zeros(len(df), dtype=bool)
+    tak_dikenal = basi & ~np.isin(versi, list(arsip))
+    ringkasan = {}
+
+    for v in pd.unique(versi[basi]):
+        baris_versi = versi == v
+        lama = arsip.get(v)
+        for kolom, nama in KOLOM_RULES.items():
+            if kolom not in df.columns:
+                continue
+            if lama is not None and lama.get(nama, []) == baru.get(nama, []):
+                continue
+            kolom_status = f"STATUS {kolom}"
+            dicek = baris_versi.copy()
+            if lama is not None and kolom_status in df.columns:
+                dicek &= nilai_terdampak(df[kolom], lama.get(nama, []), baru.get(nama, []))
+            if not dicek.any():
+                continue
+            status, _, _ = klasifikasi_nilai(nama, df[kolom].to_numpy()[dicek])
+            if kolom_status in hasil.columns:
+                hasil[kolom_status] = hasil[kolom_status].astype(object)
+                beda = hasil.loc[dicek, kolom_status].astype(str).to_numpy() != status
+            else:
+                hasil[kolom_status] = "N/A"
+                beda = np.ones(int(dicek.sum()), dtype=bool)
+            hasil.loc[dicek, kolom_status] = status
+            baris_beda = np.flatnonzero(dicek)[beda]
+            diubah[baris_beda] = True
+            cek, ganti = ringkasan.get(kolom, (0, 0))
+            ringkasan[kolom] = (cek + int(dicek.sum()), ganti + len(baris_beda))
+
+    # STATUS TERBURUK hanya dihitung ulang untuk baris yang salah satu statusnya berubah / dinilai penuh
+    diubah |= tak_dikenal
+    if diubah.any():
+        kolom_status = [f"STATUS {kolom}" for kolom in KOLOM_RULES if f"STATUS {kolom}" in hasil.columns]
+        kode = np.stack([
+            pd.Categorical(hasil.loc[diubah, k], categories=URUTAN_STATUS).codes for k in kolom_status
+        ]).max(axis=0)
+        hasil["STATUS TERBURUK"] = hasil.get("STATUS TERBURUK", pd.Series("N/A", index=hasil.index)).astype(object)
+        hasil.loc[diubah, "STATUS TERBURUK"] = np.array(URUTAN_STATUS)[np.maximum(kode, 0)]
+    hasil[KOLOM_VERSI] = VERSI_RULES
+    return hasil[basi], pd.DataFrame(
+        [{"Kolom": k, "Baris Dicek": cek, "Status Berubah": ganti} for k, (cek, ganti) in ringkasan.items()],
+        columns=kolom_ringkasan,
+    )
+
+
+def nilai_ulang_arsip(storage, sheet, arsip):
+    """
+    Penilaian ulang setiap partisi arsip bulanan `sheet` pada ArsipBackend (load() hanya berisi periode aktif).
+    Partisi dibaca dan ditulis satu per satu; mengembalikan (jumlah baris ditulis ulang, ringkasan per kolom).
+    """
+    jumlah, bagian = 0, []
+    for bulan in storage.manifest(sheet)["BULAN"]:
+        df_tulis, df_ringkasan = nilai_ulang(storage.partisi.baca(sheet, bulan), arsip)
+        storage.tulis_arsip(sheet, bulan, df_tulis)
+        jumlah += len(df_tulis)
+        bagian.append(df_ringkasan)
+    return jumlah, gabung_ringkasan(bagian)
+
+
+def gabung_ringkasan(bagian):
+    """Menjumlahkan beberapa ringkasan nilai_ulang per kolom."""
+    bagian = [df for df in bagian if not df.empty]
+    if not bagian:
+        return pd.DataFrame(columns=["Kolom", "Baris Dicek", "Status Berubah"])
+    return pd.concat(bagian).groupby("Kolom", sort=False, as_index=False).sum()
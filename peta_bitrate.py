@@ -0,0 +1,110 @@
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.colors import ListedColormap
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+
+from grid_slot import ASAL_SLOT, INTERVAL_SLOT, SLOT_PER_HARI, indeks_slot
+from kelengkapan import SLOT_METERING
+from rules import KANAL_TV
+from sun_outage import dalam_jendela
+
+
+# ===========================
+# Peta Status Bitrate (Hari x Slot) per Kanal
+# ===========================
+# Kode sel: 0 = tidak ada bacaan, lalu urutan status rules
+STATUS_PETA = ["Tidak ada data", "N/A", "Normal", "Warning", "Trouble"]
+WARNA_PETA = ["#ffffff", "#bdbdbd", "#2e7d32", "#f9a825", "#c62828"]
+
+
+class PetaBitrate:
+    """
+    Pivot seluruh histori metering menjadi matriks hari x 6 slot untuk setiap kanal, berisi kode status
+    (dari kolom "STATUS Bitrate <kanal>") dan nilai bitrate. Dibangun sekali per versi data dengan indeks
+    slot global (tanpa groupby/pivot_table per kanal); berpindah kanal cukup memotong matriks yang sudah ada.
+    """
+
+    def __init__(self, df):
+        if "DATETIME" in df.columns:
+            df = df.dropna(subset=["DATETIME"])
+        else:
+            df = df.iloc[0:0].assign(DATETIME=pd.Series(dtype="datetime64[ns]"))
+        if not df["DATETIME"].is_monotonic_increasing:
+            df = df.sort_values("DATETIME", kind="stable")
+        self.kode = {}
+        self.nilai = {}
+        if df.empty:
+            self.tanggal = np.array([], dtype="datetime64[D]")
+            return
+
+        indeks = indeks_slot(df["DATETIME"].to_numpy(dtype="datetime64[ns]"))
+        hari = indeks // SLOT_PER_HARI
+        hari_awal = int(hari.min())
+        baris = hari - hari_awal
+        kolom = indeks % SLOT_PER_HARI
+        n_hari = int(baris.max()) + 1
+        # Slot 0 (02:00) berada pada tanggal yang sama dengan indeks hari global
+        self.tanggal = (np.datetime64("1970-01-01", "D") + hari_awal + np.arange(n_hari)).astype("datetime64[D]")
+
+        for kanal, kolom_bitrate in KANAL_TV.items():
+            status = df.get(f"STATUS {kolom_bitrate}", pd.Series(index=df.index, dtype=object))
+            kode = pd.Categorical(status, categories=STATUS_PETA[1:]).codes.astype(np.int8) + 1
+            matriks_kode = np.zeros((n_hari, SLOT_PER_HARI), dtype=np.int8)
+            matriks_nilai = np.full((n_hari, SLOT_PER_HARI), np.nan)
+            # Urut DATETIME: bacaan ganda pada slot yang sama -> yang terakhir menimpa
+            matriks_kode[baris, kolom] = kode
+            matriks_nilai[baris, kolom] = pd.to_numeric(df.get(kolom_bitrate), errors="coerce")
+            self.kode[kanal] = matriks_kode
+            self.nilai[kanal] = matriks_nilai
+
+    def _rentang(self, start, end):
+        i = np.searchsorted(self.tanggal, np.datetime64(pd.Timestamp(start).date(), "D"), "left")
+        j = np.searchsorted(self.tanggal, np.datetime64(pd.Timestamp(end).date(), "D"), "right")
+        return slice(i, j)
+
+    def ringkasan(self, kanal, start, end):
+        """Jumlah sel per status per slot (kolom = slot) pada rentang: memperlihatkan jam yang sering bermasalah."""
+        kode = self.kode[kanal][self._rentang(start, end)]
+        hitung = np.stack([(kode == k).sum(axis=0) for k in range(len(STATUS_PETA))])
+        return pd.DataFrame(hitung, index=STATUS_PETA, columns=SLOT_METERING).rename_axis("Status").reset_index()
+
+    def slot_outage(self, start, end, jadwal):
+        """Penanda (hari x slot) sel yang bertepatan dengan jendela sun outage pada rentang."""
+        tanggal = self.tanggal[self._rentang(start, end)]
+        jam_slot = (ASAL_SLOT - np.datetime64("1970-01-01", "ns")) + np.arange(SLOT_PER_HARI) * INTERVAL_SLOT
+        waktu = tanggal.astype("datetime64[ns]")[:, None] + jam_slot
+        return dalam_jendela(waktu.ravel(), jadwal).reshape(waktu.shape)
+
+    def gambar(self, kanal, start, end, sun_outage=None):
+        """PNG heatmap hari (baris) x slot (kolom) berwarna status rules; sel jendela sun outage dilingkari."""
+        bagian = self._rentang(start, end)
+        kode = self.kode[kanal][bagian]
+        tanggal = self.tanggal[bagian]
+        tinggi = min(max(3.0, len(tanggal) * 0.12), 30.0)
+        fig, ax = plt.subplots(figsize=(8, tinggi))
+        ax.imshow(kode, aspect="auto", interpolation="nearest",
+                  cmap=ListedColormap(WARNA_PETA), vmin=0, vmax=len(STATUS_PETA) - 1)
+        ax.set_xticks(range(SLOT_PER_HARI))
+        ax.set_xticklabels(SLOT_METERING)
+        langkah = max(1, len(tanggal) // 40)
+        ax.set_yticks(range(0, len(tanggal), langkah))
+        ax.set_yticklabels(pd.to_datetime(tanggal[::langkah]).strftime("%Y-%m-%d"), fontsize=7)
+        ax.set_xlabel("Slot")
+        ax.set_title(f"Status Bitrate {kanal}")
+        penanda = [Patch(facecolor=w, edgecolor="#999999", label=s) for s, w in zip(STATUS_PETA, WARNA_PETA)]
+        if sun_outage is not None and len(tanggal):
+            baris, kolom = np.nonzero(self.slot_outage(start, end, sun_outage))
+            ax.scatter(kolom, baris, s=40, facecolors="none", edgecolors="black", linewidths=1.2)
+            penanda.append(Line2D([], [], marker="o", linestyle="", markerfacecolor="none",
+                                  markeredgecolor="black", label="Jendela sun outage"))
+        ax.legend(handles=penanda,
+                  loc="upper left", bbox_to_anchor=(1.01, 1), fontsize=8)
+        plt.tight_layout()
+        buffer = BytesIO()
+        fig.savefig(buffer, format="png", dpi=100)
+        plt.close(fig)
+        return buffer.getvalue()
@@ -0,0 +1,223 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from grid_slot import SLOT_PER_HARI, indeks_slot
+from rules import KOLOM_RULES, rules_param
+
+
+# ===========================
+# Prakiraan Drift Parameter (tren linear + musiman harian)
+# ===========================
+PARAMETER_PRAKIRAAN = ["SUHU TX", "VSWR", "C/N (dB)"]
+# Parameter dengan siklus harian yang jelas (suhu ruang pemancar); lainnya cukup tren linear
+PARAMETER_MUSIMAN = ["SUHU TX"]
+JENDELA_HARI = 14
+HORIZON_HARI = 30
+# Fit baru dilaporkan setelah minimal 2 hari bacaan di jendela
+MIN_TITIK = 2 * SLOT_PER_HARI
+
+
+def batas_status(nama_rule):
+    """
+    Ambang keluar dari rentang Normal menurut rules_param: daftar (arah, ambang, status),
+    arah +1 = nilai naik melewati `ambang`, -1 = nilai turun melewati `ambang`.
+    """
+    rules = rules_param.get(nama_rule, [])
+    normal = [r for r in rules if r["status"] == "Normal"]
+    if not normal:
+        return []
+    bawah = min(r["min"] for r in normal)
+    atas = max(r["max"] for r in normal)
+    batas = [(1, r["min"], r["status"]) for r in rules if r["status"] != "Normal" and r["min"] > atas]
+    batas += [(-1, r["max"], r["status"]) for r in rules if r["status"] != "Normal" and r["max"] < bawah]
+    return batas
+
+
+class TrenSlot:
+    """
+    Regresi y = b*t + s[slot harian] (atau y = b*t + a tanpa musiman) pada jendela geser slot 4 jam.
+
+    Yang disimpan hanya statistik cukup X'X dan X'y: bacaan baru/diubah ditambahkan, bacaan yang
+    keluar dari jendela dikurangkan, sehingga pembaruan per baris O(1) dan fit cukup satu solve 7x7.
+    """
+
+    # Setelah sekian pembaruan, statistik dihitung ulang dari data jendela agar galat pembulatan tidak menumpuk
+    HITUNG_ULANG = 5000
+
+    def __init__(self, jendela_slot, musiman=True):
+        self.jendela = jendela_slot
+        self.musiman = musiman
+        p = 1 + (SLOT_PER_HARI if musiman else 1)
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros(p)
+        self.data = {}
+        self.acuan = None
+        self._ubahan = 0
+
+    def _fitur(self, i):
+        x = np.zeros(len(self.xty))
+        x[0] = (i - self.acuan) / SLOT_PER_HARI  # satuan hari
+        x[1 + (i % SLOT_PER_HARI if self.musiman else 0)] = 1.0
+        return x
+
+    def _ubah(self, i, y, tanda):
+        x = self._fitur(i)
+        self.xtx += tanda * np.outer(x, x)
+        self.xty += tanda * y * x
+        self._ubahan += 1
+
+    def terbaru(self):
+        return max(self.data) if self.data else None
+
+    def set(self, i, y):
+        """Memasukkan/mengganti nilai slot `i` (NaN = hapus) lalu membuang slot di luar jendela."""
+        i = int(i)
+        terbaru = self.terbaru()
+        if terbaru is not None and i <= terbaru - self.jendela:
+            return
+        if self.acuan is None:
+            self.acuan = i
+        lama = self.data.pop(i, None)
+        if lama is not None:
+            self._ubah(i, lama, -1)
+        if not math.isnan(y):
+            self.data[i] = float(y)
+            self._ubah(i, y, 1)
+        terbaru = self.terbaru()
+        if terbaru is not None:
+            for k in [k for k in self.data if k <= terbaru - self.jendela]:
+                self._ubah(k, self.data.pop(k), -1)
+        if self._ubahan > self.HITUNG_ULANG:
+            self._hitung_ulang()
+
+    def _hitung_ulang(self):
+        self.xtx[:] = 0
+        self.xty[:] = 0
+        self.acuan = min(self.data) if self.data else None
+        for i, y in self.data.items():
+            self._ubah(i, y, 1)
+        self._ubahan = 0
+
+    def fit(self):
+        """(kemiringan per hari, offset per slot harian) atau None bila titik belum cukup."""
+        if len(self.data) < MIN_TITIK:
+            return None
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        if not self.musiman:
+            return beta[0], np.full(SLOT_PER_HARI, beta[1])
+        offset = beta[1:].copy()
+        # Slot harian tanpa bacaan di jendela memakai rata-rata offset slot lain
+        hadir = np.diag(self.xtx)[1:] > 0
+        offset[~hadir] = offset[hadir].mean()
+        return beta[0], offset
+
+    def hari_menuju(self, arah, ambang, horizon_hari=HORIZON_HARI):
+        """
+        Hari sejak bacaan terakhir sampai nilai fit pertama kali melewati `ambang` ke arah `arah`
+        (0 bila sudah melewati), None bila tidak terjadi dalam horizon atau fit belum tersedia.
+        """
+        hasil = self.fit()
+        if hasil is None:
+            return None
+        b, offset = hasil
+        sekarang = self.terbaru()
+        # Dikalikan arah agar kedua arah menjadi "naik melewati ambang"
+        b, offset, ambang = arah * b, arah * offset, arah * ambang
+        t_sekarang = (sekarang - self.acuan) / SLOT_PER_HARI
+        if (b * t_sekarang + offset[sekarang % SLOT_PER_HARI]) >= ambang:
+            return 0.0
+        kandidat = []
+        for k in range(SLOT_PER_HARI):
+            i = sekarang + 1 + (k - sekarang - 1) % SLOT_PER_HARI  # slot berikutnya dengan posisi harian k
+            if b * (i - self.acuan) / SLOT_PER_HARI + offset[k] >= ambang:
+                kandidat.append(i)
+            elif b > 0:
+                perlu = self.acuan + math.ceil((ambang - offset[k]) / b * SLOT_PER_HARI - 1e-9)
+                kandidat.append(max(i, perlu + (k - perlu) % SLOT_PER_HARI))
+        if not kandidat:
+            return None
+        hari = (min(kandidat) - sekarang) / SLOT_PER_HARI
+        return hari if hari <= horizon_hari else None
+
+
+class PrakiraanDrift:
+    """
+    Model tren per parameter (default SUHU TX, VSWR, C/N) yang diperbarui bertahap setiap ada baris baru.
+    Aman dipakai bersama antar sesi (satu lock untuk pembaruan & pembacaan).
+    """
+
+    def __init__(self, parameter=None, jendela_hari=JENDELA_HARI, musiman=None, horizon_hari=HORIZON_HARI):
+        self.parameter = list(parameter or PARAMETER_PRAKIRAAN)
+        self.jendela_hari = jendela_hari
+        self.musiman = set(PARAMETER_MUSIMAN if musiman is None else musiman)
+        self.horizon_hari = horizon_hari
+        self.revisi = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.model = {k: TrenSlot(self.jendela_hari * SLOT_PER_HARI, k in self.musiman) for k in self.parameter}
+
+    def bangun(self, df, revisi=None):
+        """Membangun ulang semua model dari histori (hanya jendela terakhir yang dibaca)."""
+        with self._lock:
+            self._reset()
+            if "DATETIME" in df.columns and df["DATETIME"].notna().any():
+                batas = df["DATETIME"].max() - pd.Timedelta(days=self.jendela_hari)
+                self._masukkan(df[df["DATETIME"] > batas])
+            self.revisi = revisi
+
+    def perbarui(self, df_baru, revisi=None):
+        """Memasukkan baris baru/diubah (mis. delta dari SharedStore) ke model tanpa membaca ulang histori."""
+        with self._lock:
+            self._masukkan(df_baru)
+            self.revisi = revisi
+
+    def sinkron(self, df, revisi, delta=None):
+        """
+        Menyamakan model dengan revisi snapshot: delta diterapkan bila revisi tepat satu di depan,
+        selain itu (revisi terlewat / muat ulang penuh) model dibangun ulang dari `df`.
+        """
+        if delta is not None and self.revisi is not None and revisi == self.revisi + 1:
+            self.perbarui(delta, revisi)
+        elif revisi != self.revisi:
+            self.bangun(df, revisi)
+
+    def _masukkan(self, df):
+        if df.empty or "DATETIME" not in df.columns:
+            return
+        df = df.dropna(subset=["DATETIME"]).sort_values("DATETIME", kind="stable")
+        indeks = indeks_slot(df["DATETIME"].to_numpy(dtype="datetime64[ns]"))
+        for kolom in self.parameter:
+            if kolom not in df.columns:
+                continue
+            nilai = pd.to_numeric(df[kolom], errors="coerce").to_numpy(dtype=float)
+            model = self.model[kolom]
+            for i, y in zip(indeks, nilai):
+                model.set(i, y)
+
+    def tabel(self):
+        """Ringkasan per parameter: bacaan terakhir, tren per hari, dan perkiraan hari menuju Warning/Trouble."""
+        baris = []
+        with self._lock:
+            for kolom in self.parameter:
+                model = self.model[kolom]
+                hasil = model.fit()
+                terbaru = model.terbaru()
+                perkiraan = {"Warning": None, "Trouble": None}
+                for arah, ambang, status in batas_status(KOLOM_RULES[kolom]):
+                    hari = model.hari_menuju(arah, ambang, self.horizon_hari)
+                    if hari is not None and (perkiraan[status] is None or hari < perkiraan[status]):
+                        perkiraan[status] = hari
+                baris.append({
+                    "Parameter": kolom,
+                    "Bacaan Terakhir": model.data[terbaru] if terbaru is not None else None,
+                    "Tren / Hari": round(float(hasil[0]), 3) if hasil else None,
+                    "Warning (hari)": None if perkiraan["Warning"] is None else round(perkiraan["Warning"], 1),
+                    "Trouble (hari)": None if perkiraan["Trouble"] is None else round(perkiraan["Trouble"], 1),
+                    "Titik Fit": len(model.data),
+                })
+        return pd.DataFrame(baris)
@@ -0,0 +1,196 @@
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from rules import KOLOM_RULES, VERSI_RULES, klasifikasi_data
+
+
+# ===========================
+# Kolom Turunan (dihitung sekali saat data disimpan/diimpor)
+# ===========================
+FORMAT_WAKTU = "%Y-%m-%d %H:%M"
+# Urutan keparahan status untuk STATUS TERBURUK (N/A = nilai kosong/di luar rules)
+URUTAN_STATUS = ["N/A", "Normal", "Warning", "Trouble"]
+KOLOM_TEGANGAN = ["TEGANGAN LISTRIK R (Volt)", "TEGANGAN LISTRIK S (Volt)", "TEGANGAN LISTRIK T (Volt)"]
+
+KOLOM_TURUNAN_CATATAN = ["TANGGAL_WAKTU"]
+
+
+def kolom_turunan_metering(kolom_data):
+    """Nama kolom turunan metering untuk data dengan kolom `kolom_data` (STATUS hanya untuk parameter yang ada)."""
+    status = [f"STATUS {kolom}" for kolom in KOLOM_RULES if kolom in kolom_data]
+    return ["DATETIME"] + status + ["STATUS TERBURUK", "IMBALANCE TEGANGAN (%)"]
+
+
+def imbalance_tegangan(df):
+    """Ketidakseimbangan tegangan 3 fasa (%): deviasi terbesar dari rata-rata R/S/T dibagi rata-rata."""
+    volt = df.reindex(columns=KOLOM_TEGANGAN).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    rata = volt.mean(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        imbalance = np.abs(volt - rata[:, None]).max(axis=1) / rata * 100
+    return np.round(np.where(rata > 0, imbalance, np.nan), 2)
+
+
+def tambah_kolom_turunan(df):
+    """
+    Menambahkan kolom turunan data metering sebelum disimpan:
+    DATETIME (TANGGAL + WAKTU), STATUS per parameter, STATUS TERBURUK, IMBALANCE TEGANGAN (%),
+    dan VERSI RULES (versi rules yang menghasilkan STATUS).
+    Nilai DATETIME ditulis sebagai teks agar tersimpan apa adanya di Sheets.
+    """
+    tanggal = pd.to_datetime(df["TANGGAL"], errors="coerce").dt.strftime("%Y-%m-%d")
+    waktu = pd.to_datetime(tanggal + " " + df["WAKTU"].astype(str), format=FORMAT_WAKTU, errors="coerce")
+
+    df = klasifikasi_data(df)
+    kolom_status = [f"STATUS {kolom}" for kolom in KOLOM_RULES if f"STATUS {kolom}" in df.columns]
+    peringkat = np.zeros(len(df), dtype=int)
+    for kolom in kolom_status:
+        peringkat = np.maximum(peringkat, pd.Categorical(df[kolom], categories=URUTAN_STATUS).codes)
+
+    return df.assign(**{
+        "DATETIME": waktu.dt.strftime(FORMAT_WAKTU).fillna(""),
+        "STATUS TERBURUK": np.array(URUTAN_STATUS)[peringkat],
+        "IMBALANCE TEGANGAN (%)": imbalance_tegangan(df),
+        "VERSI RULES": VERSI_RULES,
+    })
+
+
+def _jam_mulai_shift(jam):
+    """'Shift 2: 08:00 - 16.00' -> '08:00' (jam mulai shift)."""
+    mulai = jam.astype(str).str.extract(r"(\d{1,2})[.:](\d{2})")
+    return mulai[0].str.zfill(2) + ":" + mulai[1]
+
+
+def tambah_kolom_turunan_catatan(df):
+    """Menambahkan TANGGAL_WAKTU (tanggal + jam mulai shift) untuk catatan harian sebelum disimpan."""
+    tanggal = pd.to_datetime(df["TANGGAL_CEKLIST"], errors="coerce").dt.strftime("%Y-%m-%d")
+    waktu = pd.to_datetime(tanggal + " " + _jam_mulai_shift(df["JAM_CEKLIST"]), format=FORMAT_WAKTU, errors="coerce")
+    return df.assign(TANGGAL_WAKTU=waktu.dt.strftime(FORMAT_WAKTU).fillna(""))
+
+
+def _kolom_datetime(df):
+    """DATETIME saja (tanpa klasifikasi ulang); WAKTU boleh berformat '08:00' maupun '8:00:00' dari Sheets."""
+    tanggal = pd.to_datetime(df["TANGGAL"], errors="coerce").dt.strftime("%Y-%m-%d")
+    waktu = pd.to_datetime(tanggal + " " + df["WAKTU"].astype(str), format="mixed", errors="coerce")
+    return df.assign(DATETIME=waktu.dt.strftime(FORMAT_WAKTU).fillna(""))
+
+
+def _lengkapi_turunan(df, kolom_turunan, fungsi):
+    """Mengisi kolom turunan hanya untuk baris lama yang belum punya nilainya (data sebelum kolom ini ada)."""
+    kosong = pd.Series(False, index=df.index)
+    for kolom in kolom_turunan:
+        if kolom not in df.columns:
+            kosong[:] = True
+            break
+        kosong |= df[kolom].isna() | (df[kolom].astype(str) == "")
+    if not kosong.any():
+        return df
+    baru = fungsi(df.loc[kosong])
+    for kolom in kolom_turunan:
+        if kolom not in df.columns:
+            df[kolom] = baru[kolom]
+        else:
+            df[kolom] = df[kolom].astype(object)
+            df.loc[kosong, kolom] = baru[kolom]
+    return df
+
+
+def _parse_waktu_turunan(df, kolom, fungsi):
+    """
+    Parse kolom waktu turunan yang disimpan sebagai teks FORMAT_WAKTU. Sheets (USER_ENTERED) menyimpan teks itu
+    sebagai sel tanggal dan mengembalikannya dalam format lokal; baris yang gagal diparse dihitung ulang dari
+    kolom asalnya lewat `_lengkapi_turunan` agar tidak hilang dari tampilan.
+    """
+    waktu = pd.to_datetime(df[kolom], format=FORMAT_WAKTU, errors="coerce")
+    gagal = waktu.isna()
+    if gagal.any():
+        df[kolom] = df[kolom].astype(object).where(~gagal, "")
+        df = _lengkapi_turunan(df, [kolom], fungsi)
+        waktu = pd.to_datetime(df[kolom], format=FORMAT_WAKTU, errors="coerce")
+    df[kolom] = waktu
+    return df
+
+
+# ===========================
+# Parse Data Hasil Load (jalur get_data)
+# ===========================
+def siapkan_data(df):
+    """Membuang baris kosong, melengkapi kolom turunan baris lama, dan memastikan kolom tanggal berupa datetime."""
+    df = df.dropna(how='all')
+
+    # Baris lama (sebelum kolom turunan disimpan) dilengkapi sekali saat snapshot dimuat
+    if not df.empty and {'TANGGAL', 'WAKTU'} <= set(df.columns):
+        df = _lengkapi_turunan(df, kolom_turunan_metering(df.columns), tambah_kolom_turunan)
+        df = _parse_waktu_turunan(df, 'DATETIME', _kolom_datetime)
+        df['IMBALANCE TEGANGAN (%)'] = pd.to_numeric(df['IMBALANCE TEGANGAN (%)'], errors='coerce')
+    if not df.empty and {'TANGGAL_CEKLIST', 'JAM_CEKLIST'} <= set(df.columns):
+        df = _lengkapi_turunan(df, KOLOM_TURUNAN_CATATAN, tambah_kolom_turunan_catatan)
+        df = _parse_waktu_turunan(df, 'TANGGAL_WAKTU', tambah_kolom_turunan_catatan)
+
+    # Logika memastikan kolom tanggal berupa datetime
+    if 'TANGGAL_CATATAN' in df.columns:
+        df['TANGGAL_CATATAN'] = pd.to_datetime(df['TANGGAL_CATATAN'], errors='coerce')
+    elif 'TANGGAL' in df.columns:
+        df['TANGGAL'] = pd.to_datetime(df['TANGGAL'], errors='coerce')
+    elif 'TANGGAL_CEKLIST' in df.columns:
+        df['TANGGAL_CEKLIST'] = pd.to_datetime(df['TANGGAL_CEKLIST'], errors='coerce')
+
+    return df
+
+
+def siapkan_visualisasi(df):
+    """Data metering berurutan DATETIME (kolom tersimpan, tidak dihitung ulang) tanpa baris tanpa waktu."""
+    df = df.dropna(subset=["DATETIME"])
+    if not df["DATETIME"].is_monotonic_increasing:
+        df = df.sort_values("DATETIME")
+    return df
+
+
+# ===========================
+# Grafik Tren Parameter
+# ===========================
+def buat_grafik_parameter(df_group, parameter, opsi_agregasi, slot_hilang=None):
+    """
+    Membuat figure matplotlib tren parameter untuk periode Harian atau rentang tanggal.
+    `slot_hilang` (opsional): waktu slot tanpa bacaan, ditandai x di dasar grafik; garis terputus pada NaN.
+    """
+    fig, ax = plt.subplots(figsize=(12, 5))
+
+    if opsi_agregasi == "Harian":
+        for col in parameter:
+            ax.plot(df_group["DATETIME"], df_group[col], 'o-', label=col)
+
+        if len(df_group["DATETIME"]) > 0:
+            ax.set_xticks(df_group["DATETIME"])
+            ax.set_xticklabels(df_group["DATETIME"].dt.strftime("%H:%M"), rotation=45)
+        ax.set_xlabel("Jam")
+
+    else:  # Rentang Tanggal
+        for col in parameter:
+            ax.plot(df_group["DATETIME"], df_group[col], marker="o", label=col)
+        ax.set_xlabel("Tanggal dan Waktu")
+
+    if slot_hilang is not None and len(slot_hilang) > 0:
+        dasar = ax.get_ylim()[0]
+        ax.scatter(slot_hilang, np.full(len(slot_hilang), dasar), marker="x", color="gray",
+                   label="Slot hilang", clip_on=False, zorder=3)
+
+    ax.set_ylabel("Nilai")
+    ax.set_title(f"Grafik Parameter Transmisi ({opsi_agregasi})")
+    ax.legend()
+    ax.grid(True)
+    plt.tight_layout()
+    return fig
+
+
+# ===========================
+# Export Excel
+# ===========================
+def ke_excel(df):
+    """Menulis DataFrame ke buffer Excel (.xlsx) yang siap diunduh."""
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,302 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from storage import StorageBackend, _kunci_baris, merge_rows
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa file lock antar proses
+    fcntl = None
+
+
+# ===========================
+# Riwayat Versi Sheet (Delta + Checkpoint Periodik)
+# ===========================
+# Isi lengkap sheet disimpan setiap INTERVAL_CHECKPOINT versi; versi di antaranya dibangun dari delta
+INTERVAL_CHECKPOINT = 50
+KOLOM_RIWAYAT = ["Versi", "Waktu", "Operasi", "Tambah", "Ubah", "Hapus", "Checkpoint"]
+
+
+def _nama_file(nama):
+    return re.sub(r"[^\w.-]", "_", str(nama))
+
+
+def _teks_angka(angka):
+    """Bentuk teks baku bilangan float: nilai bulat tanpa '.0' (12.0 -> '12'), selain itu repr (12.5 -> '12.5')."""
+    teks = angka.map(repr)
+    bulat = np.isfinite(angka) & (angka == np.round(angka)) & (angka.abs() < 2 ** 63)
+    teks[bulat] = angka[bulat].astype(np.int64).astype(str)
+    return teks
+
+
+def hash_baris(df):
+    """
+    Hash isi per baris (uint64) yang tidak bergantung pada urutan kolom. Sel kosong sama dengan kolom yang
+    tidak ada, dan angka disamakan formatnya (12, "12", 12.0) agar baris hasil muat ulang dari backend tetap cocok
+    (satu sel kosong sudah cukup membuat kolom bilangan bulat terbaca sebagai float).
+    """
+    total = np.zeros(len(df), dtype=np.uint64)
+    for kolom in df.columns:
+        seri = df[kolom]
+        angka = pd.to_numeric(seri, errors="coerce").astype(float)
+        teks = seri.astype(object).where(seri.notna(), "").astype(str)
+        teks = teks.where(angka.isna(), _teks_angka(angka))
+        h = pd.util.hash_array((str(kolom) + "\x1f" + teks).to_numpy(dtype=object))
+        total += np.where((teks != "").to_numpy(), h, np.uint64(0))
+    return total
+
+
+def identitas_baris(df):
+    """Hash baris + nomor kemunculannya, agar baris kembar tetap dihitung satu per satu."""
+    h = hash_baris(df)
+    ke = pd.Series(h).groupby(h).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({"h": h, "ke": ke}), index=False).to_numpy()
+
+
+def terapkan_delta(df, delta):
+    """Isi sheet setelah delta: baris dihapus (per identitas), di-upsert (per kunci), lalu ditambahkan."""
+    hapus = delta.get("hapus")
+    if hapus is not None and len(hapus):
+        df = df[~np.isin(identitas_baris(df), hapus)]
+    if delta.get("upsert") is not None:
+        df = merge_rows(df, delta["upsert"], delta.get("kunci"))
+    if delta.get("tambah") is not None:
+        df = merge_rows(df, delta["tambah"], None)
+    return df.reset_index(drop=True)
+
+
+class JurnalRiwayat:
+    """
+    Riwayat versi per sheet di folder lokal `<folder>/<namespace>/<sheet>/`:
+    - `jurnal.jsonl`: satu baris meta per versi (waktu, operasi, versi backend, jumlah baris tambah/ubah/hapus),
+    - `delta_<versi>.pkl.gz`: baris yang ditambah/di-upsert dan identitas baris yang dihapus,
+    - `checkpoint_<versi>.pkl.gz`: isi lengkap sheet pada versi 0 dan setiap `interval` versi.
+    File delta & checkpoint ditulis ke file sementara lalu di-rename; baris jurnal ditambahkan paling akhir
+    sehingga versi baru hanya terlihat setelah file-filenya lengkap.
+    """
+
+    def __init__(self, folder, namespace="", interval=INTERVAL_CHECKPOINT):
+        self.folder = os.path.join(folder, _nama_file(namespace)) if namespace else folder
+        self.interval = max(int(interval), 1)
+        os.makedirs(self.folder, exist_ok=True)
+        # Cache isi jurnal per sheet berdasarkan (mtime, ukuran) file
+        self._entri = {}
+
+    def _path(self, sheet, nama):
+        folder = os.path.join(self.folder, _nama_file(sheet))
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, nama)
+
+    @contextmanager
+    def kunci(self, sheet):
+        """File lock eksklusif per sheet agar proses lain di mesin yang sama tidak menyisipkan versi bersamaan."""
+        with open(self._path(sheet, ".lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def entri(self, sheet):
+        """Daftar meta versi (urut versi); kosong jika sheet belum punya riwayat."""
+        path = self._path(sheet, "jurnal.jsonl")
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            return []
+        tanda = (info.st_mtime_ns, info.st_size)
+        cache = self._entri.get(sheet)
+        if cache is None or cache[0] != tanda:
+            with open(path, encoding="utf-8") as f:
+                cache = (tanda, [json.loads(baris) for baris in f if baris.strip()])
+            self._entri[sheet] = cache
+        return cache[1]
+
+    def terakhir(self, sheet):
+        entri = self.entri(sheet)
+        return entri[-1] if entri else None
+
+    def _simpan(self, sheet, nama, obj):
+        path = self._path(sheet, nama)
+        sementara = f"{path}.{os.getpid()}.tmp"
+        try:
+            pd.to_pickle(obj, sementara, compression="gzip")
+            os.replace(sementara, path)
+        finally:
+            if os.path.exists(sementara):
+                os.remove(sementara)
+
+    def _baca(self, sheet, nama):
+        return pd.read_pickle(self._path(sheet, nama), compression="gzip")
+
+    def catat(self, sheet, meta, delta, df_baru):
+        """Menyimpan satu versi baru (meta berisi 'versi'); checkpoint ditulis bila versi kelipatan interval."""
+        versi = int(meta["versi"])
+        if delta is not None:
+            self._simpan(sheet, f"delta_{versi:06d}.pkl.gz", delta)
+        meta = dict(meta, checkpoint=versi % self.interval == 0, waktu=meta.get("waktu") or time.strftime("%Y-%m-%d %H:%M:%S"))
+        if meta["checkpoint"]:
+            self._simpan(sheet, f"checkpoint_{versi:06d}.pkl.gz", df_baru.reset_index(drop=True))
+        with open(self._path(sheet, "jurnal.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(meta) + "\n")
+        return meta
+
+    def bangun(self, sheet, versi):
+        """Isi sheet pada `versi`: checkpoint terdekat di bawahnya + delta-delta sesudahnya."""
+        entri = [e for e in self.entri(sheet) if e["versi"] <= versi]
+        if not entri or entri[-1]["versi"] != versi:
+            raise KeyError(f"{sheet}: versi {versi} tidak ada di riwayat")
+        awal = max(e["versi"] for e in entri if e["checkpoint"])
+        df = self._baca(sheet, f"checkpoint_{awal:06d}.pkl.gz")
+        for e in entri:
+            if e["versi"] > awal:
+                df = terapkan_delta(df, self._baca(sheet, f"delta_{e['versi']:06d}.pkl.gz"))
+        return df
+
+
+class RiwayatBackend(StorageBackend):
+    """
+    Backend berlapis yang mencatat setiap penulisan ke sheet terpilih sebagai versi di JurnalRiwayat.
+
+    append/upsert cukup menyimpan baris yang ditulis; replace (termasuk rollback dan tiering arsip) menyimpan
+    selisih isi lama -> baru, sehingga satu penyimpanan yang salah tidak menghapus histori. Isi versi terakhir
+    disimpan di memori untuk menghitung selisih tanpa membaca backend. Perubahan dari luar riwayat ini
+    (proses di mesin lain, edit langsung di Sheets) terdeteksi dari nomor versi backend dan dicatat sebagai
+    versi 'sinkron' sebelum penulisan berikutnya.
+    """
+
+    def __init__(self, backend, jurnal, sheets):
+        self.backend = backend
+        self.jurnal = jurnal
+        # {nama sheet: kolom kunci (None = sheet hanya-append, dibandingkan per isi baris)}
+        self.sheets = dict(sheets)
+        self.key = backend.key
+        # Panel kuota admin membaca client dari backend Sheets
+        self.client = getattr(backend, "client", None)
+        self._lock = threading.RLock()
+        self._keadaan = {}
+
+    # --- Pembacaan (delegasi) ---
+    def load(self, sheet_name):
+        return self.backend.load(sheet_name)
+
+    def version(self, sheet_name):
+        return self.backend.version(sheet_name)
+
+    def load_versioned(self, sheet_name):
+        return self.backend.load_versioned(sheet_name)
+
+    def query_range(self, sheet_name, column, start, end):
+        return self.backend.query_range(sheet_name, column, start, end)
+
+    # --- Penulisan tercatat ---
+    def replace(self, sheet_name, df, expected_version=None, operasi="replace"):
+        def delta(lama):
+            return self._selisih(sheet_name, lama, df)
+
+        self._tulis(sheet_name, operasi, lambda: self.backend.replace(sheet_name, df, expected_version=expected_version), delta)
+
+    def append(self, sheet_name, df):
+        def delta(lama):
+            return {"tambah": df.reset_index(drop=True)}, {"tambah": len(df), "ubah": 0, "hapus": 0}
+
+        self._tulis(sheet_name, "append", lambda: self.backend.append(sheet_name, df), delta)
+
+    def upsert(self, sheet_name, df, keys):
+        def delta(lama):
+            ada = _kunci_baris(df, keys).isin(_kunci_baris(lama, keys)).sum() if not lama.empty else 0
+            jumlah = {"tambah": len(df) - int(ada), "ubah": int(ada), "hapus": 0}
+            return {"upsert": df.reset_index(drop=True), "kunci": list(keys)}, jumlah
+
+        self._tulis(sheet_name, "upsert", lambda: self.backend.upsert(sheet_name, df, keys), delta)
+
+    def _selisih(self, sheet_name, lama, baru):
+        """Delta replace: identitas baris lama yang hilang + baris baru yang belum ada."""
+        id_lama, id_baru = identitas_baris(lama), identitas_baris(baru)
+        dihapus = ~np.isin(id_lama, id_baru)
+        tambah = baru[~np.isin(id_baru, id_lama)].reset_index(drop=True)
+        ubah = 0
+        keys = self.sheets.get(sheet_name)
+        if keys and dihapus.any() and not tambah.empty:
+            # Baris dengan kunci yang sama di kedua sisi dihitung sebagai perubahan, bukan hapus + tambah
+            ubah = int(_kunci_baris(tambah, keys).isin(_kunci_baris(lama[dihapus], keys)).sum())
+        jumlah = {"tambah": len(tambah) - ubah, "ubah": ubah, "hapus": int(dihapus.sum()) - ubah}
+        return {"hapus": id_lama[dihapus], "tambah": tambah if not tambah.empty else None}, jumlah
+
+    def _tulis(self, sheet_name, operasi, tulis, buat_delta):
+        if sheet_name not in self.sheets:
+            return tulis()
+        with self._lock, self.jurnal.kunci(sheet_name):
+            versi_backend = self.backend.version(sheet_name)
+            try:
+                lama = self._sinkron(sheet_name, versi_backend)
+            except OSError:
+                lama = None
+            tulis()
+            if lama is None:
+                return
+            try:
+                delta, jumlah = buat_delta(lama)
+                self._catat(sheet_name, operasi, delta, jumlah, terapkan_delta(lama, delta),
+                            None if versi_backend is None else versi_backend + 1)
+            except OSError:
+                # Riwayat gagal ditulis (mis. disk penuh): data tetap tersimpan, selisihnya tercatat sebagai
+                # versi 'sinkron' pada penulisan berikutnya
+                self._keadaan.pop(sheet_name, None)
+
+    def _catat(self, sheet_name, operasi, delta, jumlah, df_baru, versi_backend):
+        terakhir = self.jurnal.terakhir(sheet_name)
+        meta = {"versi": 0 if terakhir is None else terakhir["versi"] + 1, "operasi": operasi,
+                "versi_backend": versi_backend, **jumlah}
+        meta = self.jurnal.catat(sheet_name, meta, delta, df_baru)
+        self._keadaan[sheet_name] = (meta["versi"], df_baru)
+        return df_baru
+
+    def _sinkron(self, sheet_name, versi_backend):
+        """Isi versi terakhir riwayat; riwayat baru dimulai dari isi backend (versi 0 = checkpoint awal)."""
+        terakhir = self.jurnal.terakhir(sheet_name)
+        if terakhir is None:
+            df = self.backend.load(sheet_name)
+            return self._catat(sheet_name, "awal", None, {"tambah": len(df), "ubah": 0, "hapus": 0}, df, versi_backend)
+        lama = self.keadaan(sheet_name, terakhir["versi"])
+        if versi_backend is None or terakhir.get("versi_backend") in (None, versi_backend):
+            return lama
+        df = self.backend.load(sheet_name)
+        delta, jumlah = self._selisih(sheet_name, lama, df)
+        return self._catat(sheet_name, "sinkron", delta, jumlah, terapkan_delta(lama, delta), versi_backend)
+
+    # --- Riwayat & rollback ---
+    def keadaan(self, sheet_name, versi):
+        """Isi sheet pada `versi` (versi terakhir dari memori, lainnya dibangun dari checkpoint + delta)."""
+        cache = self._keadaan.get(sheet_name)
+        if cache is not None and cache[0] == versi:
+            return cache[1]
+        df = self.jurnal.bangun(sheet_name, versi)
+        if versi == (self.jurnal.terakhir(sheet_name) or {}).get("versi"):
+            self._keadaan[sheet_name] = (versi, df)
+        return df
+
+    def riwayat(self, sheet_name):
+        """Daftar versi sheet sebagai tabel (terbaru di atas)."""
+        entri = self.jurnal.entri(sheet_name)
+        return pd.DataFrame(
+            [[e["versi"], e["waktu"], e["operasi"], e["tambah"], e["ubah"], e["hapus"], e["checkpoint"]]
+             for e in reversed(entri)],
+            columns=KOLOM_RIWAYAT,
+        )
+
+    def rollback(self, sheet_name, versi):
+        """Mengembalikan isi sheet ke `versi`; rollback sendiri dicatat sebagai versi baru. Mengembalikan isi yang ditulis."""
+        with self._lock:
+            df = self.keadaan(sheet_name, versi)
+            self.replace(sheet_name, df, operasi=f"rollback ke v{versi}")
+        return df
@@ -0,0 +1,580 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# ===========================
+# Mapping Ceklist Harian Digital (Deskripsi + Rekomendasi)
+# ===========================
+ceklist_rules = {
+    "Transmitter (Exciter & PA)": {
+        "Normal": {
+            "deskripsi": "Daya output stabil, suhu normal, tidak ada alarm",
+            "rekom": "Tidak ada tindakan, kondisi transmitter normal"
+        },
+        "Warning": {
+            "deskripsi": "Daya output menurun, suhu meningkat",
+            "rekom": "Periksa pendingin udara, bersihkan filter, pantau daya output"
+        },
+        "Trouble": {
+            "deskripsi": "Daya output turun drastis, suhu overheat",
+            "rekom": "Periksa exciter/PA, lakukan kalibrasi RF, panggil teknisi servis"
+        }
+    },
+    "Antena": {
+        "Normal": {
+            "deskripsi": "VSWR normal, sinyal stabil, kondisi fisik antena baik",
+            "rekom": "Tidak ada tindakan, kondisi antena baik"
+        },
+        "Warning": {
+            "deskripsi": "VSWR meningkat, mulai terjadi pantulan daya — indikasi konektor longgar atau feeder mulai menurun kualitasnya",
+            "rekom": "Periksa dan kencangkan konektor, bersihkan jalur feeder, pastikan tidak ada korosi atau kelembapan pada konektor"
+        },
+        "Trouble": {
+            "deskripsi": "VSWR tinggi, sinyal tidak stabil atau hilang — kemungkinan antena retak, bocor air, atau feeder rusak",
+            "rekom": "Ganti feeder/antena, lakukan perbaikan fisik segera"
+        }
+    },
+    "Encoder": {
+        "Normal": {
+            "deskripsi": "Bitrate stabil, output normal",
+            "rekom": "Tidak ada tindakan, encoder berfungsi baik"
+        },
+        "Warning": {
+            "deskripsi": "Bitrate turun 10–20%, terjadi delay atau patah-patah pada video output",
+            "rekom": "Restart encoder, cek software dan jaringan"
+        },
+        "Trouble": {
+            "deskripsi": "Output encoder tidak ada (blank)",
+            "rekom": "Cek hardware encoder, ganti unit jika rusak"
+        }
+    },
+        "IRD (Integrated Receiver Decoder)": {
+        "Normal": {
+            "deskripsi": "Sinyal input dan output video/audio normal",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Kualitas sinyal menurun, kadang terjadi glitch pada video/audio",
+            "rekom": "Periksa level sinyal input, cek konektor dan kabel, pastikan suhu perangkat stabil atau tidak terlalu panas"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak ada sinyal, video/audio tidak keluar",
+            "rekom": "Cek sumber input RF atau IP, reboot IRD, dan pastikan konfigurasi parameter input sesuai"
+        }
+    },
+    "Multiplexer": {
+        "Normal": {
+            "deskripsi": "Semua input-output terbaca normal dan bitrate stabil",
+            "rekom": "Tidak ada tindakan, kondisi MUX baik"
+        },
+        "Warning": {
+            "deskripsi": "Input sesekali hilang atau bitrate turun",
+            "rekom": "Restart MUX, cek port input/output"
+        },
+        "Trouble": {
+            "deskripsi": "Input tidak terbaca sama sekali, ada indikator lampu merah menyala",
+            "rekom": "Servis MUX, cek perangkat keras & software, cek kabel inputan, IRD dan encoder"
+        }
+    },
+    "Parabola + LNB": {
+        "Normal": {
+            "deskripsi": "Arah parabola tepat, sinyal kuat, LNB dalam kondisi baik",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Arah parabola bergeser, sinyal melemah",
+            "rekom": "Atur ulang arah parabola, cek dan kencangkan konektor LNB"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak ada sinyal sama sekali",
+            "rekom": "Ganti LNB, periksa kabel feeder, atur ulang pointing parabola"
+        }
+    },
+    "AVR": {
+        "Normal": {
+            "deskripsi": "Tegangan output stabil",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Tegangan naik turun ringan",
+            "rekom": "Periksa setting AVR, pendinginan, sambungan kabel"
+        },
+        "Trouble": {
+            "deskripsi": "Tegangan fluktuasi besar, tidak stabil",
+            "rekom": "Servis AVR, ganti komponen internal jika perlu"
+        }
+    },
+    "Grounding": {
+        "Normal": {
+            "deskripsi": "Resistansi < 5 Ohm, kabel & rod rapi, sistem grounding baik, mampu mengalirkan arus petir dan gangguan listrik dengan aman",
+            "rekom": "Tidak ada tindakan, ukur resistensi berkala terutama saat musim hujan"
+        },
+        "Warning": {
+            "deskripsi": "Resistansi 5–7 Ohm, efektifitas penyaluran arus petir mulai menurun — potensi sambaran petir tidak sepenuhnya tersalur ke tanah, ada korosi di sambungan",
+            "rekom": "Tambah atau perbaiki rod grounding, periksa sambungan kabel ground dan pastikan tidak berkarat"
+        },
+        "Trouble": {
+            "deskripsi": "Resistansi > 7 Ohm,  proteksi petir tidak berfungsi — arus petir berpotensi merusak peralatan transmisi",
+            "rekom": "Perbaiki jalur ground, pasang rod tambahan, ganti kabel/rod rusak, dan lakukan pengujian resistansi tanah setelah perbaikan"
+        }
+    },
+    "Cooling System": {
+        "Normal": {
+            "deskripsi": "Semua kipas normal, hembusan angin kuat",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Putaran kipas melemah atau bising",
+            "rekom": "Bersihkan kipas, cek bearing, cek kabel listrik"
+        },
+        "Trouble": {
+            "deskripsi": "Kipas mati total",
+            "rekom": "Ganti kipas baru, cek suplai listrik"
+        }
+    },
+    "AC Ruangan Transmisi": {
+        "Normal": {
+            "deskripsi": "Suhu ruangan 18–24°C stabil",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Suhu 25–26°C",
+            "rekom": "Bersihkan filter AC, periksa freon"
+        },
+        "Trouble": {
+            "deskripsi": "AC mati/tidak dingin, suhu >27°C ",
+            "rekom": "Isi freon, servis AC, periksa kompresor dan kapasitor, ganti unit"
+        }
+    },
+    "UPS": {
+        "Normal": {
+            "deskripsi": "Backup normal, baterai bagus, tidak ada alarm",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Backup singkat, alarm indikator berbunyi",
+            "rekom": "Periksa aki, bersihkan ventilasi UPS, pastikan suhu ruangan tidak panas"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak ada backup sama sekali saat listrik padam",
+            "rekom": "Ganti aki, servis UPS"
+        }
+    },
+    "Genset": {
+        "Normal": {
+            "deskripsi": "Mesin hidup normal, beban stabil, bahan bakar cukup",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Mesin sulit dinyalakan, bahan bakar hampir habis",
+            "rekom": "Cek aki starter, isi bahan bakar, bersihkah / ganti filter"
+        },
+        "Trouble": {
+            "deskripsi": "Mesin tidak hidup/drop",
+            "rekom": "Servis genset, ganti oli, filter, atau aki"
+        }
+    },
+    "Router": {
+        "Normal": {
+            "deskripsi": "Koneksi internet lancar dan stabil",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Koneksi internet melambat",
+            "rekom": "Restart router, cek kabel LAN/fiber"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak ada koneksi internet",
+            "rekom": "Ganti router atau hubungi ISP"
+        }
+    },
+    "Switch Hub": {
+        "Normal": {
+            "deskripsi": "Semua port aktif, koneksi lancar",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Satu atau beberapa port mati/tidak berfungsi",
+            "rekom": "Gunakan port cadangan atau ganti port rusak"
+        },
+        "Trouble": {
+            "deskripsi": "Semua port mati, perangkat tidak menyala",
+            "rekom": "Ganti switch hub, cek power supply"
+        }
+    },
+    "Multiviewer": {
+        "Normal": {
+            "deskripsi": "Semua channel tampil normal di monitor",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Beberapa channel hilang atau delay",
+            "rekom": "Restart sistem, cek input/output matrix"
+        },
+        "Trouble": {
+            "deskripsi": "Semua channel blank",
+            "rekom": "Servis atau ganti multiviewer"
+        }
+    },
+    "Set Top Box": {
+        "Normal": {
+            "deskripsi": "Channel terkunci normal, gambar dan suara lancar",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Channel sulit terkunci, sinyal melemah",
+            "rekom": "Scan ulang channel, reset STB"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak bisa lock channel sama sekali",
+            "rekom": "Ganti STB atau periksa antena"
+        }
+    },
+    "RCS (Remote Control System)": {
+        "Normal": {
+            "deskripsi": "Sistem remote berjalan normal, semua perangkat terpantau",
+            "rekom": "Tidak ada tindakan"
+        },
+        "Warning": {
+            "deskripsi": "Respon lambat, data kadang delay",
+            "rekom": "Cek jaringan dan software RCS"
+        },
+        "Trouble": {
+            "deskripsi": "Tidak bisa remote/monitoring mati total",
+            "rekom": "Cek hardware/software RCS, restart server"
+        }
+    }
+}
+# ... (Akhir ceklist_rules)
+
+# ======================
+# RULES PARAMETER
+# ======================
+rules_param = {
+    "Power Output (Watt)": [
+        {"min": 10000, "max": 11900, "status": "Normal",
+         "rekom": "Output sesuai standar, tidak perlu tindakan",
+         "keterangan": "Daya pemancar dalam batas aman dan sesuai standar operasional."},
+        {"min": 8000, "max": 9999, "status": "Warning",
+         "rekom": "Catat penurunan, cek beban pemancar",
+         "keterangan": "Terjadi sedikit penurunan daya, namun masih dalam batas toleransi aman."},
+        {"min": 0, "max": 7999, "status": "Trouble",
+         "rekom": "Jika drop: periksa exciter, amplifier, kabel RF",
+         "keterangan": "Daya terlalu rendah, berpotensi menyebabkan gangguan transmisi siaran."},
+        {"min": 11901, "max": 20000, "status": "Trouble",
+         "rekom": "Jika over: periksa setting & kalibrasi daya output",
+         "keterangan": "Daya melebihi batas standar, berisiko merusak perangkat pemancar."}
+    ],
+    "VSWR": [
+        {"min": 0, "max": 1.24, "status": "Normal",
+         "rekom": "VSWR aman, tidak perlu tindakan",
+         "keterangan": "Nilai VSWR stabil dan menunjukkan efisiensi pancaran optimal."},
+        {"min": 1.25, "max": 1.30, "status": "Warning",
+         "rekom": "Kencangkan konektor RF, cek feeder dan kondisi fisik antena",
+         "keterangan": "Refleksi sinyal mulai meningkat, perlu pengecekan konektor dan antena."},
+        {"min": 1.31, "max": 10.0, "status": "Trouble",
+         "rekom": "Segera turunkan daya, periksa antena & feeder",
+         "keterangan": "VSWR tinggi menandakan ketidaksesuaian impedansi, berpotensi merusak pemancar."}
+    ],
+    "C/N (dB)": [
+        {"min": 40, "max": 50, "status": "Normal",
+         "rekom": "Sinyal satelit sangat stabil, tidak perlu tindakan",
+         "keterangan": "Kualitas sinyal satelit sangat baik dan stabil."},
+        {"min": 30, "max": 39.9, "status": "Warning",
+         "rekom": "Pantau sinyal, Pantau kondisi cuaca. Jika hujan, ini normal. Jika cuaca cerah, periksa konektor, kabel, dan arah dish.",
+         "keterangan": "Kualitas sinyal menurun, kemungkinan akibat cuaca atau gangguan perangkat antena."},
+        {"min": 0,  "max": 29.9, "status": "Trouble",
+         "rekom": "Atur ulang parabola, cek LNB/dish, lakukan perbaikan segera, ganti kalau perlu",
+         "keterangan": "Kualitas sinyal sangat buruk, berisiko menyebabkan hilangnya siaran."}
+    ],
+    "Margin (dB)": [
+        {"min": 20, "max": 30, "status": "Normal",
+         "rekom": "Link sangat aman, tidak perlu tindakan",
+         "keterangan": "Koneksi link dalam kondisi optimal dan stabil."},
+        {"min": 10, "max": 19.9, "status": "Warning",
+         "rekom": "periksa konektor RF dan pastikan tidak ada halangan di jalur dish",
+         "keterangan": "Margin mulai menurun, perlu pemeriksaan jalur transmisi."},
+        {"min": 0,  "max": 9.9, "status": "Trouble",
+         "rekom": "atur ulang dish, periksa LNB, dan cek kabel coaxial, pastikan tidak ada korosi atau konektor longgar.",
+         "keterangan": "Margin sangat rendah, transmisi berpotensi tidak stabil."}
+    ],
+    "Tegangan Listrik (Volt)": [
+        {"min": 215, "max": 225, "status": "Normal",
+         "rekom": "Tegangan stabil, tidak perlu tindakan",
+         "keterangan": "Suplai listrik dalam kondisi stabil dan sesuai standar operasional."},
+        {"min": 210, "max": 214, "status": "Warning",
+         "rekom": "Pantau voltase, hidupkan stabilizer bila perlu",
+         "keterangan": "Tegangan sedikit menurun, masih dalam batas aman namun perlu pemantauan."},
+        {"min": 226, "max": 230, "status": "Warning",
+         "rekom": "Pantau voltase, hidupkan stabilizer bila perlu",
+         "keterangan": "Tegangan sedikit tinggi, perlu pengawasan agar tidak naik berlebih."},
+        {"min": 0, "max": 209, "status": "Trouble",
+         "rekom": "Periksa suplai PLN/UPS, cek kabel distribusi, pakai genset jika darurat",
+         "keterangan": "Tegangan terlalu rendah, dapat mengganggu kinerja peralatan elektronik."},
+        {"min": 231, "max": 300, "status": "Trouble",
+         "rekom": "Tegangan over. Periksa suplai PLN/UPS, cek kabel distribusi, pakai genset jika darurat",
+         "keterangan": "Tegangan berlebih, berpotensi menyebabkan kerusakan pada perangkat."}
+    ],
+    "Suhu TX (°C)": [
+        {"min": 0, "max": 15.9, "status": "Warning",
+         "rekom": "Suhu terlalu dingin, pantau risiko embun atau lembap di peralatan, naikkan suhu ac/pendingin ruangan",
+         "keterangan": "Suhu di bawah standar operasional, berisiko menyebabkan kondensasi pada komponen."},
+        {"min": 16, "max": 20.9, "status": "Normal",
+         "rekom": "Suhu normal, tidak perlu tindakan",
+         "keterangan": "Suhu stabil dan aman untuk perangkat transmisi."},
+        {"min": 21, "max": 25.9, "status": "Warning",
+         "rekom": "Cek pendingin ruangan jika ada ac yang mati turunkan suhu, bersihkan filter AC",
+         "keterangan": "Suhu sedikit tinggi, perlu pemantauan agar tidak meningkat lebih lanjut."},
+        {"min": 26, "max": 100, "status": "Trouble",
+         "rekom": "Segera servis AC / tambah pendingin ruangan",
+         "keterangan": "Suhu terlalu tinggi, berpotensi menyebabkan overheating pada perangkat pemancar."}
+    ]
+}
+
+# ==================================================
+# RULES BITRATE KANAL TV
+# ==================================================
+rules_bitrate = {
+    "Bitrate NET TV (Mbps)": [
+        {"min": 0, "max": 0.99, "status": "Trouble",
+         "rekom": "Laporkan ke pihak NET TV pusat untuk konfirmasi. Tidak dilakukan tindakan lokal sebelum instruksi diterima. Catat waktu dan durasi bitrate 0 Mbps.",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 1.0, "max": 1.49, "status": "Warning",
+         "rekom": "Pantau kestabilan bitrate pada transcoder NET TV. Jika fluktuasi >10–15 menit, catat waktu kejadian dan laporkan ke pihak NET TV.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 1.5, "max": 2.0, "status": "Normal",
+         "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 2 Mbps. Tetap pantau kestabilan.",
+         "keterangan": "Siaran NET TV berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate RTV (Mbps)": [
+        {"min": 0, "max": 1.99, "status": "Trouble",
+         "rekom": "Laporkan ke pihak RTV untuk pengecekan siaran. Tunda tindakan lokal sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 2.0, "max": 3.49, "status": "Warning",
+         "rekom": "Pantau bitrate dari encoder RTV. Jika penurunan berulang, catat polanya dan informasikan ke RTV.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 3.5, "max": 4.0, "status": "Normal",
+         "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 4 Mbps. Tetap pantau kestabilan.",
+         "keterangan": "Siaran RTV berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate JAMBI TV (Mbps)": [
+        {"min": 0, "max": 0.99, "status": "Trouble",
+         "rekom": "Laporkan ke pihak Jambi TV terkait penurunan bitrate. Tunggu konfirmasi sebelum tindakan teknis. Catat waktu & parameter jaringan.",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 1.0, "max": 1.49, "status": "Warning",
+         "rekom": "Pantau output encoder Jambi TV dan koneksi IP ke MUX. Jika fluktuatif, laporkan ke pihak Jambi TV.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 1.5, "max": 2.0, "status": "Normal",
+         "rekom": "Tidak ada tindakan, bitrate stabil sesuai kontrak 2 Mbps. Tetap pantau kestabilan",
+         "keterangan": "Siaran JAMBI TV berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate JEK TV (Mbps)": [
+        {"min": 0, "max": 0.99, "status": "Trouble",
+         "rekom": "Laporkan ke pihak JEK TV untuk pengecekan siaran. Tunda tindakan sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 1.0, "max": 1.49, "status": "Warning",
+         "rekom": "Cek converter JEK TV. Jika hanya kanal ini turun, laporkan ke pihak RTV.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 1.5, "max": 2.0, "status": "Normal",
+         "rekom": "Bitrate stabil, tidak perlu maintenance. Lanjutkan pemantauan harian.",
+         "keterangan": "Siaran JEK TV berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate SINPO TV (Mbps)": [
+        {"min": 0, "max": 0.99, "status": "Trouble",
+         "rekom": "Laporkan ke pihak SINPO TV . Tunda tindakan sampai ada arahan resmi. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 1.0, "max": 1.49, "status": "Warning",
+         "rekom": "Pantau fluktuasi bitrate SINPO TV. Jika tidak kembali normal dalam 10–15 menit, hubungi pihak SINPO.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 1.5, "max": 2.0, "status": "Normal",
+         "rekom": "Bitrate stabil, tidak perlu maintenance. Lanjutkan pemantauan harian",
+         "keterangan": "Siaran SINPO TV berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate TVRI NASIONAL (Mbps)": [
+        {"min": 0, "max": 1.99, "status": "Trouble",
+         "rekom": "Jika bitrate 0 Mbps atau siaran hilang, cek IRD Harmonic dan lakukan Encrypt siaran. Jika tetap hilang, koordinasikan dengan TVRI pusat. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 2.0, "max": 3.49, "status": "Warning",
+         "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat .",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 3.5, "max": 4.0, "status": "Normal",
+         "rekom": "Bitrate stabil, tidak perlu tindakan.",
+         "keterangan": "Siaran TVRI NASIONAL berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate TVRI WORLD (Mbps)": [
+        {"min": 0, "max": 1.99, "status": "Trouble",
+         "rekom": "Jika bitrate 0 Mbps atau siaran hilang, cek IRD Harmonic dan lakukan Encrypt siaran. Jika tetap hilang, koordinasikan dengan TVRI pusat. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 2.0, "max": 3.49, "status": "Warning",
+         "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 3.5, "max": 4.0, "status": "Normal",
+         "rekom": "Tidak ada masalah, jalur aman. Pantau jika ada event internasional besar.",
+         "keterangan": "Siaran TVRI World berjalan lancar dan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate TVRI SPORT (Mbps)": [
+        {"min": 0, "max": 1.99, "status": "Trouble",
+         "rekom": "Jika bitrate 0 Mbps: (1) Cabut-pasang kartu encrypt IRD Ericsson. (2) Jika belum normal, pasang kabel LAN dari IRD ke pc lalu masuk ke sistem IRD menggunakan IP, lalu centang kolom Decrypt & Decode. Jika tetap gagal, hubungi TVRI pusat. Atau pantau jadwal Sun Outage",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 2.0, "max": 3.49, "status": "Warning",
+         "rekom": "Pantau perubahan bitrate pada IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 3.5, "max": 4.0, "status": "Normal",
+         "rekom": "Kondisi baik, stream lancar. Tetap pantau bitrate saat live event.",
+         "keterangan": "Siaran TVRI SPORT berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+    "Bitrate TVRI JAMBI (Mbps)": [
+        {"min": 0, "max": 1.99, "status": "Trouble",
+         "rekom": "Jika bitrate 0 Mbps, cek sistem encoder (lihat status inputan masing-masing port yaitu SDI, HDMI, & CVBS. Kalau status inputan merah berarti tidak ada inputan, selanjutnya ganti ke port yang status nya hijau. Jika menggunakan IRD, restart IRD",
+         "keterangan": "Bitrate hilang atau sangat rendah"},
+        {"min": 2.0, "max": 3.49, "status": "Warning",
+         "rekom": "Pantau perubahan bitrate pada encoder/IRD, jika bitrate terus menurun dan tidak sesuai standar SLA maka lakukan pergantian perangkat.",
+         "keterangan": "Bitrate menurun dari standar, kemungkinan terjadi gangguan sementara."},
+        {"min": 3.5, "max": 4.0, "status": "Normal",
+         "rekom": "Normal, encoder/IRD dan MUX berfungsi baik. Tidak perlu tindakan.",
+         "keterangan": "Siaran TVRI JAMBI berjalan normal dengan bitrate sesuai standar kontrak."}
+    ],
+}
+
+# ==================================================
+# GABUNGKAN KEDUA DICTIONARY RULES MENJADI SATU
+# ==================================================
+rules_param.update(rules_bitrate)
+
+# ==================================================
+# FUNGSI PEMERIKSA PARAMETER (VERSI BARU)
+# ==================================================
+def cek_param(nama, nilai):
+    """
+    Mengecek status, keterangan, dan rekomendasi dari suatu parameter teknis
+    berdasarkan nilai aktual dan rentang batas pada rules_param.
+    Fungsi ini mengembalikan dictionary, bukan tuple.
+    """
+    if nama not in rules_param:
+        return {
+            "Parameter": nama,
+            "Nilai": nilai,
+            "Status": "N/A",
+            "Keterangan": "Parameter tidak terdaftar dalam aturan pengukuran.",
+            "Rekomendasi": "Periksa kembali nama parameter atau tambahkan ke rules_param."
+        }
+
+    for rule in rules_param[nama]:
+        if rule["min"] <= nilai <= rule["max"]:
+            hasil = {
+                "Parameter": nama,
+                "Nilai": nilai,
+                "Status": rule["status"],
+                "Keterangan": rule.get("keterangan", "Tidak ada keterangan."), # Pakai .get() agar aman
+                "Rekomendasi": rule.get("rekom", "Tidak ada rekomendasi.")
+            }
+            return hasil
+
+    # Jika nilai tidak masuk rentang manapun
+    return {
+        "Parameter": nama,
+        "Nilai": nilai,
+        "Status": "N/A",
+        "Keterangan": "Nilai di luar jangkauan aturan yang ditetapkan.",
+        "Rekomendasi": "Periksa ulang input nilai atau tambahkan batas baru pada rules_param."
+    }
+
+
+# ==================================================
+# PEMETAAN KOLOM SHEET1 -> NAMA RULE
+# ==================================================
+KOLOM_RULES = {
+    "POWER OUTPUT (WATT)": "Power Output (Watt)",
+    "VSWR": "VSWR",
+    "C/N (dB)": "C/N (dB)",
+    "MARGIN (dB)": "Margin (dB)",
+    "TEGANGAN LISTRIK R (Volt)": "Tegangan Listrik (Volt)",
+    "TEGANGAN LISTRIK S (Volt)": "Tegangan Listrik (Volt)",
+    "TEGANGAN LISTRIK T (Volt)": "Tegangan Listrik (Volt)",
+    "SUHU TX": "Suhu TX (°C)",
+    "Bitrate NET TV": "Bitrate NET TV (Mbps)",
+    "Bitrate RTV": "Bitrate RTV (Mbps)",
+    "Bitrate JAMBI TV": "Bitrate JAMBI TV (Mbps)",
+    "Bitrate JEK TV": "Bitrate JEK TV (Mbps)",
+    "Bitrate SINPO TV": "Bitrate SINPO TV (Mbps)",
+    "Bitrate TVRI NASIONAL": "Bitrate TVRI NASIONAL (Mbps)",
+    "Bitrate TVRI WORLD": "Bitrate TVRI WORLD (Mbps)",
+    "Bitrate TVRI SPORT": "Bitrate TVRI SPORT (Mbps)",
+    "Bitrate TVRI JAMBI": "Bitrate TVRI JAMBI (Mbps)",
+}
+
+# Kanal TV: kolom status OK/NO -> kolom bitrate
+KANAL_TV = {
+    "NET TV": "Bitrate NET TV",
+    "RTV": "Bitrate RTV",
+    "JAMBI TV": "Bitrate JAMBI TV",
+    "JEK TV": "Bitrate JEK TV",
+    "SINPO TV": "Bitrate SINPO TV",
+    "TVRI NASIONAL": "Bitrate TVRI NASIONAL",
+    "TVRI WORLD": "Bitrate TVRI WORLD",
+    "TVRI SPORT": "Bitrate TVRI SPORT",
+    "TVRI JAMBI": "Bitrate TVRI JAMBI",
+}
+
+
+# ==================================================
+# KLASIFIKASI VEKTOR (UNTUK BANYAK BARIS SEKALIGUS)
+# ==================================================
+def klasifikasi_nilai(nama, nilai):
+    """
+    Versi vektor dari cek_param: mengklasifikasi array nilai sekaligus.
+    Mengembalikan tuple (status, rekomendasi, keterangan) berupa array numpy.
+    Rule dicek berurutan seperti cek_param (rule pertama yang cocok dipakai).
+    """
+    nilai = pd.to_numeric(pd.Series(nilai), errors="coerce").to_numpy(dtype=float)
+    rules = rules_param.get(nama, [])
+    kondisi = [(nilai >= r["min"]) & (nilai <= r["max"]) for r in rules]
+    status = np.select(kondisi, [r["status"] for r in rules], default="N/A")
+    rekom = np.select(kondisi, [r.get("rekom", "Tidak ada rekomendasi.") for r in rules],
+                      default="Periksa ulang input nilai atau tambahkan batas baru pada rules_param.")
+    keterangan = np.select(kondisi, [r.get("keterangan", "Tidak ada keterangan.") for r in rules],
+                           default="Nilai di luar jangkauan aturan yang ditetapkan.")
+    return status, rekom, keterangan
+
+
+def klasifikasi_data(df, dengan_rekom=False):
+    """
+    Menambahkan kolom "STATUS <kolom>" (dan opsional "REKOM <kolom>") untuk setiap
+    kolom parameter Sheet1 yang ada di DataFrame.
+    """
+    hasil = {}
+    for kolom, nama in KOLOM_RULES.items():
+        if kolom not in df.columns:
+            continue
+        status, rekom, _ = klasifikasi_nilai(nama, df[kolom])
+        hasil[f"STATUS {kolom}"] = status
+        if dengan_rekom:
+            hasil[f"REKOM {kolom}"] = rekom
+    return df.assign(**hasil)
+
+
+# ==================================================
+# VERSI RULES (SIDIK BATAS STATUS)
+# ==================================================
+def batas_rules(rules=None):
+    """Bagian rules yang menentukan STATUS: {nama rule: [(min, max, status), ...]} sesuai urutan pengecekan."""
+    rules = rules_param if rules is None else rules
+    return {nama: [(float(r["min"]), float(r["max"]), r["status"]) for r in daftar] for nama, daftar in rules.items()}
+
+
+def versi_rules(batas=None):
+    """
+    Versi rules = "r" + 12 karakter sha1 dari batas status. Berubah otomatis setiap batas/status diubah
+    (teks rekomendasi/keterangan tidak ikut, karena tidak memengaruhi STATUS yang disimpan).
+    Awalan "r" menjaga versi tetap teks: sha1 yang kebetulan hanya angka (atau angka dengan satu "e")
+    akan diubah Sheets/gspread menjadi bilangan dan tidak pernah cocok lagi dengan versi berlaku.
+    """
+    batas = batas_rules() if batas is None else batas
+    isi = json.dumps(sorted(batas.items()), ensure_ascii=False)
+    return "r" + hashlib.sha1(isi.encode("utf-8")).hexdigest()[:12]
+
+
+# Versi rules yang berlaku; disimpan di kolom "VERSI RULES" setiap baris yang dinilai
+VERSI_RULES = versi_rules()
@@ -0,0 +1,289 @@
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from metrics import ukur
+from storage import merge_rows
+
+
+# ===========================
+# Snapshot Data Bersama (satu per sheet, dipakai semua sesi)
+# ===========================
+class Snapshot:
+    """Isi satu sheet pada satu revisi. DataFrame-nya dipakai bersama: perlakukan sebagai hanya-baca."""
+
+    __slots__ = ("sheet", "revisi", "versi_backend", "df", "dimuat", "dicek", "generasi", "invalidasi")
+
+    def __init__(self, sheet, revisi, versi_backend, df, dimuat=None, generasi=None):
+        self.sheet = sheet
+        self.revisi = revisi
+        self.versi_backend = versi_backend
+        self.df = df
+        self.dimuat = dimuat or time.time()
+        # Generasi snapshot di cache disk bersama (None jika tidak memakai cache disk)
+        self.generasi = generasi
+        # Generasi invalidasi di cache disk yang terakhir diterapkan ke snapshot ini
+        self.invalidasi = 0
+        # Waktu terakhir versi backend dicocokkan (snapshot masih sama dengan sumbernya)
+        self.dicek = self.dimuat
+
+    @property
+    def umur(self):
+        """Detik sejak snapshot terakhir dipastikan sama dengan backend."""
+        return time.time() - self.dicek
+
+
+class SharedStore:
+    """
+    Penyimpan snapshot data per proses, menggantikan salinan st.cache_data per panggilan.
+
+    - Semua sesi membaca objek DataFrame yang sama (tanpa pickle/salin).
+    - Perubahan bersifat copy-on-write: penyimpanan membuat DataFrame baru dengan
+      revisi baru, snapshot lama yang sedang dipakai sesi lain tidak ikut berubah.
+    - Setelah simpan, baris yang ditulis diterapkan sebagai delta ke snapshot bila
+      versi backend menunjukkan tidak ada penulis lain di antaranya; jika ada,
+      snapshot langsung dimuat ulang penuh.
+    - Pelanggan (`subscribe`) diberi tahu setiap kali revisi sheet berubah.
+    - Opsional `disk` (DiskSnapshotCache): snapshot juga dibagi ke proses worker lain;
+      hanya satu proses yang me-refresh dari backend per TTL, sisanya membaca dari disk.
+    - Stale-while-revalidate: snapshot yang lewat TTL tetap langsung dikembalikan sementara
+      refresh berjalan di thread latar; pembaca hanya menunggu jika belum ada snapshot sama sekali.
+      `mulai_refresher` menjalankan thread yang me-refresh sheet secara berkala sebelum TTL habis.
+    """
+
+    def __init__(self, backend, parse=None, ttl=600, riwayat=50, disk=None):
+        self.backend = backend
+        self.disk = disk
+        self.parse = parse or (lambda df: df)
+        self.ttl = ttl
+        self.riwayat = riwayat
+        self._snapshot = {}
+        # Log delta per sheet: deque (revisi, df_delta, keys); None berarti muat ulang penuh
+        self._delta = {}
+        self._pelanggan = []
+        self._lock = threading.Lock()
+        self._lock_muat = {}
+        # Refresh latar yang sedang berjalan & error refresh terakhir per sheet
+        self._refresh_berjalan = set()
+        self._error = {}
+        self._refresher = None
+        self._berhenti = threading.Event()
+
+    # --- Pembacaan ---
+    def snapshot(self, sheet):
+        """Snapshot terakhir sheet; dimuat dulu hanya jika belum ada, di-refresh di latar jika lewat TTL."""
+        snap = self._sinkron_disk(sheet)
+        if snap is None:
+            return self.refresh(sheet)
+        if snap.umur >= self.ttl:
+            self._refresh_latar(sheet)
+        return snap
+
+    def refresh(self, sheet, umur_maks=None):
+        """
+        Memastikan snapshot tidak lebih tua dari `umur_maks` detik (default TTL):
+        cocokkan versi backend dulu, unduh ulang seluruh sheet hanya jika berubah.
+        """
+        umur_maks = self.ttl if umur_maks is None else umur_maks
+        with self._kunci_muat(sheet), self._kunci_disk(sheet):
+            # Mungkin sudah dimuat sesi/proses lain selama menunggu lock
+            snap = self._sinkron_disk(sheet)
+            if snap is not None and snap.umur < umur_maks:
+                return snap
+            if snap is not None and snap.versi_backend is not None:
+                # Cukup cocokkan versi (1 request kecil) sebelum mengunduh ulang seluruh sheet
+                if self.backend.version(sheet) == snap.versi_backend:
+                    snap.dicek = time.time()
+                    if self.disk is not None:
+                        self.disk.tandai_dicek(sheet)
+                    return snap
+            return self._muat(sheet)
+
+    def get(self, sheet):
+        """DataFrame bersama untuk sheet (hanya-baca; salin dulu sebelum diubah)."""
+        return self.snapshot(sheet).df
+
+    def revisi(self, sheet):
+        snap = self._snapshot.get(sheet)
+        return snap.revisi if snap is not None else 0
+
+    def changes_since(self, sheet, revisi):
+        """
+        Baris yang berubah sejak `revisi` (DataFrame, bisa kosong).
+        Mengembalikan None jika delta tidak tersedia (ada muat ulang penuh atau log sudah terpotong).
+        """
+        snap = self._snapshot.get(sheet)
+        if snap is None or revisi > snap.revisi:
+            return None
+        if revisi == snap.revisi:
+            return snap.df.iloc[0:0]
+        with self._lock:
+            log = [item for item in self._delta.get(sheet, ()) if item[0] > revisi]
+        if len(log) != snap.revisi - revisi or any(df_delta is None for _, df_delta, _ in log):
+            return None
+        df_gabung = log[0][1]
+        for _, df_delta, keys in log[1:]:
+            df_gabung = merge_rows(df_gabung, df_delta, keys)
+        return df_gabung
+
+    # --- Perubahan ---
+    def catat_tulis(self, sheet, df_tulis, keys=None, ganti=False):
+        """
+        Dipanggil setelah penulisan ke backend berhasil.
+
+        ganti=False: `df_tulis` adalah baris yang di-append/upsert (dengan `keys`);
+        ganti=True : `df_tulis` adalah isi baru seluruh sheet.
+        """
+        with self._kunci_muat(sheet), self._kunci_disk(sheet):
+            snap = self._sinkron_disk(sheet)
+            versi = self.backend.version(sheet)
+            if snap is None or versi is None or snap.versi_backend is None or versi != snap.versi_backend + 1:
+                # Ada penulis lain (atau versi tidak didukung): muat ulang penuh sekarang
+                self._muat(sheet)
+                return
+            df_delta = self.parse(df_tulis.copy())
+            df_baru = df_delta if ganti else merge_rows(snap.df, df_delta, keys)
+            self._pasang(sheet, df_baru.reset_index(drop=True), versi, None if ganti else (df_delta, keys))
+
+    def invalidate(self, sheet=None):
+        """Membuang snapshot (satu sheet atau semua) agar pembacaan berikutnya memuat ulang."""
+        with self._lock:
+            nama_sheet = [sheet] if sheet else list(self._snapshot)
+            for nama in nama_sheet:
+                snap = self._snapshot.get(nama)
+                if snap is not None:
+                    snap.dicek = 0.0
+        if self.disk is not None:
+            # Baca-ubah-tulis meta.json di bawah file lock sheet agar tulis() proses lain tidak menimpa
+            # kenaikan generasi invalidasi (urutan kunci sama dengan refresh: file lock di luar _lock)
+            for nama in nama_sheet:
+                with self._kunci_disk(nama):
+                    self.disk.tandai_basi(nama)
+
+    def subscribe(self, fungsi):
+        """
+        Mendaftarkan `fungsi(snapshot, delta)` yang dipanggil setiap revisi sheet berubah;
+        `delta` berisi baris yang berubah, atau None untuk muat ulang penuh.
+        Mengembalikan fungsi untuk berhenti berlangganan.
+        """
+        with self._lock:
+            self._pelanggan.append(fungsi)
+
+        def berhenti():
+            with self._lock:
+                if fungsi in self._pelanggan:
+                    self._pelanggan.remove(fungsi)
+        return berhenti
+
+    # --- Refresh Latar ---
+    def mulai_refresher(self, sheets, interval=240, jitter=0.1):
+        """
+        Menjalankan thread daemon yang me-refresh `sheets` setiap `interval` detik
+        (diacak +/- `jitter` x interval agar beberapa proses tidak refresh bersamaan).
+        Dengan cache disk, proses yang mendapati snapshot baru di-refresh proses lain cukup membacanya.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return self._refresher
+
+        def jalan():
+            while not self._berhenti.wait(interval * random.uniform(1 - jitter, 1 + jitter)):
+                for sheet in sheets:
+                    self._refresh_aman(sheet, umur_maks=interval / 2)
+
+        self._refresher = threading.Thread(target=jalan, name="refresher-data", daemon=True)
+        self._refresher.start()
+        return self._refresher
+
+    def hentikan_refresher(self):
+        self._berhenti.set()
+
+    def status(self, sheet):
+        """Umur snapshot (detik), apakah refresh sedang berjalan, dan error refresh terakhir."""
+        snap = self._snapshot.get(sheet)
+        return {
+            "umur": snap.umur if snap is not None else None,
+            "dimuat": snap.dimuat if snap is not None else None,
+            "refresh": sheet in self._refresh_berjalan,
+            "error": self._error.get(sheet),
+        }
+
+    def _refresh_latar(self, sheet):
+        with self._lock:
+            if sheet in self._refresh_berjalan:
+                return
+            self._refresh_berjalan.add(sheet)
+
+        def jalan():
+            try:
+                self._refresh_aman(sheet)
+            finally:
+                with self._lock:
+                    self._refresh_berjalan.discard(sheet)
+
+        threading.Thread(target=jalan, name=f"refresh-{sheet}", daemon=True).start()
+
+    def _refresh_aman(self, sheet, umur_maks=None):
+        # Gagal refresh (kuota/jaringan) tidak menghapus snapshot terakhir yang masih baik
+        try:
+            self.refresh(sheet, umur_maks)
+            self._error.pop(sheet, None)
+        except Exception as e:
+            self._error[sheet] = f"{type(e).__name__}: {e}"
+
+    # --- Internal ---
+    def _kunci_muat(self, sheet):
+        with self._lock:
+            return self._lock_muat.setdefault(sheet, threading.RLock())
+
+    def _kunci_disk(self, sheet):
+        return self.disk.kunci(sheet) if self.disk is not None else nullcontext()
+
+    def _sinkron_disk(self, sheet):
+        """Snapshot lokal, diganti dengan snapshot disk bila proses lain sudah menulis generasi baru."""
+        snap = self._snapshot.get(sheet)
+        if self.disk is None:
+            return snap
+        meta = self.disk.meta(sheet)
+        if meta is None:
+            return snap
+        if snap is None or snap.generasi != meta["generasi"]:
+            with ukur("baca_cache_disk"):
+                df = self.disk.baca(sheet, meta)
+            snap = self._pasang(sheet, df, meta["versi_backend"], None, simpan_disk=False, generasi=meta["generasi"])
+        invalidasi = int(meta.get("invalidasi", 0))
+        if invalidasi != snap.invalidasi:
+            # Proses lain memanggil invalidate(): waktu cek di disk berlaku walaupun lebih lama
+            snap.dicek, snap.invalidasi = meta["dicek"], invalidasi
+        else:
+            snap.dicek = max(snap.dicek, meta["dicek"])
+        return snap
+
+    def _muat(self, sheet):
+        with ukur("fetch_sheets"):
+            df_raw, versi = self.backend.load_versioned(sheet)
+        # Buang baris kosong & pastikan kolom tanggal berupa datetime
+        with ukur("parse_tanggal"):
+            df = self.parse(df_raw)
+        return self._pasang(sheet, df, versi, None)
+
+    def _pasang(self, sheet, df, versi_backend, delta, simpan_disk=True, generasi=None):
+        if self.disk is not None and simpan_disk:
+            # Bagikan ke proses lain; dipanggil selagi memegang file lock sheet
+            with ukur("tulis_cache_disk"):
+                generasi = self.disk.tulis(sheet, df, versi_backend)["generasi"]
+        with self._lock:
+            lama = self._snapshot.get(sheet)
+            snap = Snapshot(sheet, (lama.revisi if lama else 0) + 1, versi_backend, df, generasi=generasi)
+            log = self._delta.setdefault(sheet, deque(maxlen=self.riwayat))
+            log.append((snap.revisi, *(delta or (None, None))))
+            self._snapshot[sheet] = snap
+            pelanggan = list(self._pelanggan)
+        for fungsi in pelanggan:
+            try:
+                fungsi(snap, delta[0] if delta else None)
+            except Exception:
+                # Pelanggan yang gagal tidak boleh menggagalkan penyimpanan/pembacaan
+                pass
+        return snap
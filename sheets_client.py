@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from collections import deque
+
+
+# Status HTTP yang layak dicoba ulang (kuota habis / gangguan server Google)
+STATUS_RETRY = {429, 500, 502, 503, 504}
+
+
+# ===========================
+# Pembatas Kuota (Sliding Window per Menit)
+# ===========================
+class QuotaLimiter:
+    """Membatasi jumlah request per jendela waktu; request berikutnya menunggu sampai ada slot."""
+
+    def __init__(self, per_minute=60, window=60.0):
+        self.per_minute = per_minute
+        self.window = window
+        self._waktu = deque()
+        self._lock = threading.Lock()
+
+    def _buang_kedaluwarsa(self, sekarang):
+        while self._waktu and sekarang - self._waktu[0] >= self.window:
+            self._waktu.popleft()
+
+    def acquire(self):
+        """Menunggu sampai kuota tersedia lalu memakai satu slot. Mengembalikan lama menunggu (detik)."""
+        total_tunggu = 0.0
+        while True:
+            with self._lock:
+                sekarang = time.monotonic()
+                self._buang_kedaluwarsa(sekarang)
+                if len(self._waktu) < self.per_minute:
+                    self._waktu.append(sekarang)
+                    return total_tunggu
+                tunggu = self.window - (sekarang - self._waktu[0])
+            time.sleep(max(tunggu, 0.01))
+            total_tunggu += max(tunggu, 0.01)
+
+    def terpakai(self):
+        with self._lock:
+            self._buang_kedaluwarsa(time.monotonic())
+            return len(self._waktu)
+
+
+# ===========================
+# Penggabungan Request Baca yang Sedang Berjalan
+# ===========================
+class _Pending:
+    def __init__(self):
+        self.selesai = threading.Event()
+        self.hasil = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """Request baca identik yang datang bersamaan dijalankan sekali; pemanggil lain menunggu hasilnya."""
+
+    def __init__(self):
+        self._berjalan = {}
+        self._lock = threading.Lock()
+        self.digabung = 0
+
+    def run(self, key, fungsi):
+        with self._lock:
+            pending = self._berjalan.get(key)
+            pemimpin = pending is None
+            if pemimpin:
+                pending = self._berjalan[key] = _Pending()
+            else:
+                self.digabung += 1
+
+        if not pemimpin:
+            pending.selesai.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.hasil
+
+        try:
+            pending.hasil = fungsi()
+            return pending.hasil
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._berjalan.pop(key, None)
+            pending.selesai.set()
+
+
+# ===========================
+# Client Sheets Bersama (Kuota + Backoff)
+# ===========================
+class SheetsQuotaClient:
+    """
+    Pembungkus client gspread yang dipakai bersama semua sesi dalam satu proses.
+    Setiap request HTTP melewati pembatas kuota, dan respons 429/5xx dicoba ulang
+    dengan exponential backoff + jitter. Atribut lain diteruskan ke client asli.
+    """
+
+    def __init__(self, client, per_minute=60, max_retries=5, backoff_base=1.0, backoff_max=32.0):
+        self.client = client
+        self.limiter = QuotaLimiter(per_minute)
+        self.coalescer = RequestCoalescer()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.waktu_tunggu_kuota = 0.0
+        self._pasang_pembatas()
+
+    def __getattr__(self, nama):
+        return getattr(self.client, nama)
+
+    def _pasang_pembatas(self):
+        http_client = getattr(self.client, "http_client", self.client)
+        session = getattr(http_client, "session", None)
+        if session is None:
+            return
+        request_asli = session.request
+
+        def request_terbatas(method, url, **kwargs):
+            for percobaan in range(self.max_retries + 1):
+                self.waktu_tunggu_kuota += self.limiter.acquire()
+                response = request_asli(method, url, **kwargs)
+                if response.status_code not in STATUS_RETRY or percobaan == self.max_retries:
+                    return response
+                self.retries += 1
+                time.sleep(self._jeda(percobaan, response.headers.get("Retry-After")))
+            return response
+
+        session.request = request_terbatas
+
+    def _jeda(self, percobaan, retry_after=None):
+        """Full jitter: acak 0..min(max, base * 2^n), minimal sebesar Retry-After bila diberikan."""
+        jeda = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** percobaan)))
+        try:
+            return max(jeda, float(retry_after)) if retry_after else jeda
+        except ValueError:
+            return jeda
+
+    def coalesce(self, key, fungsi):
+        """Menjalankan request baca `fungsi` sekali untuk semua pemanggil dengan `key` yang sama."""
+        return self.coalescer.run(key, fungsi)
+
+    def headroom(self):
+        """Ringkasan kuota: terpakai & sisa dalam 60 detik terakhir, jumlah retry dan request yang digabung."""
+        terpakai = self.limiter.terpakai()
+        return {
+            "kuota_per_menit": self.limiter.per_minute,
+            "terpakai": terpakai,
+            "sisa": max(self.limiter.per_minute - terpakai, 0),
+            "retry": self.retries,
+            "digabung": self.coalescer.digabung,
+            "tunggu_kuota_s": round(self.waktu_tunggu_kuota, 2),
+        }
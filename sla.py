@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from rules import KANAL_TV, rules_bitrate
+
+
+# ===========================
+# Indeks SLA / Availability Kanal (Prefix Sum)
+# ===========================
+STATUS_BITRATE = ["Normal", "Warning", "Trouble"]
+
+
+def kontrak_bitrate(kanal):
+    """Bitrate kontrak kanal (Mbps) = batas atas rentang Normal pada rules_bitrate."""
+    rules = rules_bitrate.get(f"{KANAL_TV[kanal]} (Mbps)", [])
+    normal = [r["max"] for r in rules if r["status"] == "Normal"]
+    return max(normal) if normal else None
+
+
+class SLAIndex:
+    """
+    Jumlah kumulatif bacaan per kanal, diurutkan menurut DATETIME.
+
+    Untuk setiap kanal disimpan prefix sum status bitrate (Normal/Warning/Trouble, dari kolom
+    "STATUS Bitrate <kanal>") dan status kanal (OK/NO). Jumlah bacaan pada rentang tanggal apa pun
+    didapat dari dua binary search pada DATETIME + selisih prefix sum, tanpa memindai ulang data.
+    """
+
+    def __init__(self, df):
+        if "DATETIME" in df.columns:
+            df = df.dropna(subset=["DATETIME"])
+        else:
+            df = df.iloc[0:0].assign(DATETIME=pd.Series(dtype="datetime64[ns]"))
+        if not df["DATETIME"].is_monotonic_increasing:
+            df = df.sort_values("DATETIME", kind="stable")
+        self.waktu = df["DATETIME"].to_numpy(dtype="datetime64[ns]")
+        self.kumulatif = {}
+        for kanal, kolom_bitrate in KANAL_TV.items():
+            hitung = {}
+            status = df.get(f"STATUS {kolom_bitrate}", pd.Series(index=df.index, dtype=object)).astype(str).to_numpy()
+            for nama in STATUS_BITRATE:
+                hitung[nama] = status == nama
+            kondisi = df.get(kanal, pd.Series(index=df.index, dtype=object)).astype(str).str.upper().to_numpy()
+            hitung["OK"] = kondisi == "OK"
+            hitung["NO"] = kondisi == "NO"
+            # Prefix sum dengan 0 di depan: jumlah pada [i, j) = kum[j] - kum[i]
+            self.kumulatif[kanal] = {
+                nama: np.concatenate(([0], np.cumsum(nilai, dtype=np.int64))) for nama, nilai in hitung.items()
+            }
+
+    def _batas(self, start, end):
+        """Indeks [i, j) bacaan dengan start <= DATETIME < end + 1 hari."""
+        awal = np.datetime64(pd.Timestamp(start), "ns")
+        akhir = np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), "ns")
+        return np.searchsorted(self.waktu, awal, "left"), np.searchsorted(self.waktu, akhir, "left")
+
+    def hitung(self, kanal, start, end):
+        """Jumlah bacaan per status untuk satu kanal pada rentang tanggal (inklusif)."""
+        i, j = self._batas(start, end)
+        kum = self.kumulatif[kanal]
+        return {nama: int(nilai[j] - nilai[i]) for nama, nilai in kum.items()} | {"Bacaan": int(j - i)}
+
+    def tabel(self, start, end):
+        """Tabel SLA semua kanal untuk rentang tanggal."""
+        baris = []
+        for kanal in KANAL_TV:
+            jumlah = self.hitung(kanal, start, end)
+            total = jumlah["Bacaan"]
+            baris.append({
+                "Kanal": kanal,
+                "Kontrak (Mbps)": kontrak_bitrate(kanal),
+                "Bacaan": total,
+                "Normal": jumlah["Normal"],
+                "Warning": jumlah["Warning"],
+                "Trouble": jumlah["Trouble"],
+                "Status NO": jumlah["NO"],
+                # Availability: kanal OK saat dibaca; Sesuai Kontrak: bitrate di rentang Normal
+                "Availability (%)": round(jumlah["OK"] / total * 100, 2) if total else None,
+                "Sesuai Kontrak (%)": round(jumlah["Normal"] / total * 100, 2) if total else None,
+            })
+        return pd.DataFrame(baris)
@@ -0,0 +1,693 @@
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import gspread
+import pandas as pd
+from gspread.utils import a1_to_rowcol, numericise_all
+from gspread_dataframe import set_with_dataframe
+
+from metrics import catat_api
+
+
+# ===========================
+# Helper Gabung Baris (dipakai semua backend)
+# ===========================
+def _kunci_baris(df, keys):
+    """Membuat Series kunci gabungan (string) dari kolom `keys`.
+
+    Kolom berawalan TANGGAL dinormalisasi ke format YYYY-MM-DD agar nilai
+    yang dibaca dari Sheets ("2024-01-05" / tanggal serial) tetap cocok.
+    """
+    bagian = []
+    for kolom in keys:
+        if kolom not in df.columns:
+            bagian.append(pd.Series("", index=df.index))
+        elif kolom.startswith("TANGGAL"):
+            tanggal = pd.to_datetime(df[kolom], errors="coerce")
+            bagian.append(tanggal.dt.strftime("%Y-%m-%d").fillna(df[kolom].astype(str)))
+        else:
+            bagian.append(df[kolom].astype(str))
+    kunci = bagian[0]
+    for seri in bagian[1:]:
+        kunci = kunci + "_" + seri
+    return kunci
+
+
+def merge_rows(df_existing, df_new, keys):
+    """Mengganti baris lama yang kuncinya sama dengan baris baru, lalu menambahkan sisanya."""
+    if df_existing is None or df_existing.empty:
+        return df_new.reset_index(drop=True)
+    if not keys:
+        return pd.concat([df_existing, df_new], ignore_index=True)
+    dipakai = ~_kunci_baris(df_existing, keys).isin(_kunci_baris(df_new, keys))
+    return pd.concat([df_existing[dipakai], df_new], ignore_index=True)
+
+
+def filter_range(df, column, start, end):
+    """Memfilter baris dengan start <= column <= end (tanggal, inklusif)."""
+    if df.empty or column not in df.columns:
+        return df.iloc[0:0]
+    tanggal = pd.to_datetime(df[column], errors="coerce")
+    akhir = pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[(tanggal >= pd.Timestamp(start)) & (tanggal < akhir)].reset_index(drop=True)
+
+
+# ===========================
+# Antarmuka Backend Penyimpanan
+# ===========================
+class VersionConflict(Exception):
+    """Sheet sudah diubah penulis lain sejak versinya dibaca."""
+
+
+class StorageBackend:
+    """Antarmuka penyimpanan data sheet: load, append, upsert, dan range query.
+
+    Subclass minimal mengimplementasikan `load` dan `replace`; operasi lain
+    punya implementasi default (baca semua, gabung, tulis ulang) yang bisa
+    dioverride dengan versi yang lebih efisien.
+
+    Setiap penulisan menaikkan nomor versi (revisi) sheet. Penulisan yang
+    membawa `expected_version` ditolak dengan VersionConflict bila sheet sudah
+    diubah pihak lain; append/upsert lalu membaca ulang, menggabung per baris,
+    dan mencoba lagi.
+    """
+
+    # Identitas backend, dipakai sebagai kunci cache get_data
+    key = ""
+    # Jumlah percobaan ulang saat terjadi konflik versi
+    max_retries = 5
+
+    def load(self, sheet_name):
+        """Memuat seluruh isi sheet sebagai DataFrame (kosong jika sheet belum ada)."""
+        raise NotImplementedError
+
+    def version(self, sheet_name):
+        """Nomor versi sheet saat ini (None jika backend tidak mendukung versi)."""
+        return None
+
+    def load_versioned(self, sheet_name):
+        """Memuat isi sheet beserta versinya: (DataFrame, versi)."""
+        versi = self.version(sheet_name)
+        return self.load(sheet_name), versi
+
+    def replace(self, sheet_name, df, expected_version=None):
+        """Mengganti seluruh isi sheet dengan DataFrame (gagal jika versi tidak sama dengan expected_version)."""
+        raise NotImplementedError
+
+    def append(self, sheet_name, df):
+        """Menambahkan baris di akhir sheet."""
+        self._gabung_tulis_ulang(sheet_name, df, None)
+
+    def upsert(self, sheet_name, df, keys):
+        """Mengganti baris dengan kunci `keys` yang sama, menambahkan baris baru sisanya."""
+        self._gabung_tulis_ulang(sheet_name, df, keys)
+
+    def query_range(self, sheet_name, column, start, end):
+        """Mengambil baris dengan nilai tanggal `column` di antara start dan end (inklusif)."""
+        return filter_range(self.load(sheet_name), column, start, end)
+
+    def _gabung_tulis_ulang(self, sheet_name, df, keys):
+        """Baca (dengan versi), gabung per baris di memori, tulis ulang; diulang jika versi bentrok."""
+        def tulis():
+            df_existing, versi = self.load_versioned(sheet_name)
+            self.replace(sheet_name, merge_rows(df_existing, df, keys), expected_version=versi)
+        self._dengan_retry(tulis)
+
+    def _dengan_retry(self, fungsi):
+        """Menjalankan penulisan, mengulang dengan jeda acak bila terjadi VersionConflict."""
+        for percobaan in range(self.max_retries + 1):
+            try:
+                return fungsi()
+            except VersionConflict:
+                if percobaan == self.max_retries:
+                    raise
+                time.sleep(random.uniform(0, 0.05 * (2 ** percobaan)))
+
+
+# ===========================
+# Backend Google Sheets (gspread)
+# ===========================
+# Worksheet metadata berisi log klaim versi (append-only):
+# NAMA_SHEET | VERSI | DIUBAH | TOKEN | LEASE_SAMPAI | JENIS (klaim / lepas / bawa)
+VERSION_SHEET = "_VERSI"
+# Klaim berlaku sebagai lease selama LEASE_DETIK; penulis lain menunggu paling lama TUNGGU_LEASE detik
+LEASE_DETIK = 60
+TUNGGU_LEASE = 15
+# Log dirapikan (baris lama dihapus dari atas) bila lebih dari BATAS_LOG baris; SISA_LOG baris terakhir dibiarkan
+BATAS_LOG = 300
+SISA_LOG = 50
+
+
+def _baris_sheet(df, header):
+    """Mengubah DataFrame menjadi list baris sesuai urutan header (kosong untuk NaN)."""
+    rows = df.reindex(columns=header).astype(object)
+    return rows.where(rows.notna(), "").values.tolist()
+
+
+def _log_klaim(nilai):
+    """
+    Membaca log klaim: ({(sheet, versi): (token, lease_sampai)}, token yang sudah dilepas).
+
+    Pemenang satu (sheet, versi) adalah baris 'bawa' (salinan pemenang saat log dirapikan) bila ada, selain itu
+    baris klaim pertama. append_rows diurutkan secara atomik oleh Google, jadi tepat satu klaim yang menang.
+    Baris format lama (tanpa LEASE/JENIS) dibaca sebagai klaim yang sudah selesai.
+    """
+    pemenang, dilepas = {}, set()
+    for baris in nilai:
+        if not baris or not baris[0]:
+            continue
+        baris = list(baris) + [""] * (6 - len(baris))
+        sheet, versi, token, lease, jenis = baris[0], int(baris[1] or 0), baris[3], float(baris[4] or 0), baris[5]
+        if jenis == "lepas":
+            dilepas.add(token)
+        elif jenis == "bawa" or (sheet, versi) not in pemenang:
+            pemenang[(sheet, versi)] = (token, lease)
+    return pemenang, dilepas
+
+
+def _status_versi(pemenang, dilepas):
+    """Klaim terakhir tiap sheet: {sheet: (versi, token, lease_sampai, aktif)}."""
+    status = {}
+    for (sheet, versi), (token, lease) in pemenang.items():
+        if sheet not in status or versi > status[sheet][0]:
+            status[sheet] = (versi, token, lease, token not in dilepas and lease > time.time())
+    return status
+
+
+class GSheetsBackend(StorageBackend):
+    """Backend Google Sheets memakai client gspread (atau client tiruan yang kompatibel).
+
+    Versi sheet dicatat di worksheet `_VERSI` sebagai log klaim yang hanya di-append.
+    Sebelum menulis, penulis meng-append klaim versi berikutnya lalu membaca ulang log:
+    hanya klaim pertama untuk versi itu yang menang, dan klaim tersebut berlaku sebagai
+    lease sampai dilepas (atau kedaluwarsa). Selama lease aktif, penulis lain menunggu,
+    dan versi yang dilaporkan tetap versi sebelumnya sehingga pembaca tidak memakai isi
+    yang sedang ditulis. Sebelum `clear()` klaim dicek ulang. Dalam satu proses penulisan
+    juga diserialkan dengan lock (pembacaan tidak ikut terkunci).
+    """
+
+    def __init__(self, client, spreadsheet_id):
+        self.client = client
+        self.spreadsheet_id = spreadsheet_id
+        self.key = spreadsheet_id
+        self._worksheets = {}
+        self._lock = threading.Lock()
+        self._lock_tulis = threading.Lock()
+        self._panjang_log = 0
+
+    def _worksheet(self, sheet_name, buat=False):
+        # Simpan objek worksheet agar open_by_key + worksheet (2 request metadata) tidak diulang tiap baca
+        with self._lock:
+            if sheet_name not in self._worksheets:
+                ss = self.client.open_by_key(self.spreadsheet_id)
+                try:
+                    self._worksheets[sheet_name] = ss.worksheet(sheet_name)
+                except gspread.exceptions.WorksheetNotFound:
+                    if not buat:
+                        raise
+                    self._worksheets[sheet_name] = ss.add_worksheet(sheet_name, rows=100, cols=4)
+            return self._worksheets[sheet_name]
+
+    def load(self, sheet_name):
+        try:
+            ws = self._worksheet(sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            # Sama dengan backend lain: sheet yang belum ada dibaca sebagai DataFrame kosong
+            return pd.DataFrame()
+        baca = lambda: ws.get_all_records()
+        coalesce = getattr(self.client, "coalesce", None)
+        # Baca identik dari beberapa sesi yang bersamaan digabung menjadi satu request
+        records = coalesce(("load", self.spreadsheet_id, sheet_name), baca) if coalesce else baca()
+        return pd.DataFrame(records)
+
+    # --- Versi sheet (log klaim + lease) ---
+    def _baca_log(self):
+        nilai = self._worksheet(VERSION_SHEET, buat=True).get_all_values()
+        self._panjang_log = len(nilai)
+        return nilai
+
+    def _status(self, sheet_name):
+        return _status_versi(*_log_klaim(self._baca_log())).get(sheet_name, (0, "", 0.0, False))
+
+    def version(self, sheet_name):
+        versi, _, _, aktif = self._status(sheet_name)
+        # Versi yang masih ditulis belum dilaporkan; pembaca melihatnya berubah setelah lease dilepas
+        return versi - 1 if aktif else versi
+
+    def _klaim_versi(self, sheet_name, expected_version=None, tunggu=TUNGGU_LEASE):
+        """
+        Mengklaim versi berikutnya sebagai lease; mengembalikan (versi, token). Lease penulis lain ditunggu
+        paling lama `tunggu` detik; tanpa expected_version, klaim yang didahului penulis lain dicoba lagi.
+        VersionConflict jika versi tidak sama dengan expected_version atau waktu tunggu habis.
+        """
+        batas_tunggu = time.monotonic() + tunggu
+        while True:
+            versi, _, _, aktif = self._status(sheet_name)
+            if not aktif:
+                if expected_version is not None and versi != expected_version:
+                    raise VersionConflict(f"{sheet_name}: versi {versi}, diharapkan {expected_version}")
+                token = uuid.uuid4().hex[:12]
+                diubah = time.strftime("%Y-%m-%d %H:%M:%S")
+                self._worksheet(VERSION_SHEET).append_rows(
+                    [[sheet_name, versi + 1, diubah, token, round(time.time() + LEASE_DETIK, 3), "klaim"]],
+                    value_input_option="RAW",
+                )
+                pemenang, _ = _log_klaim(self._baca_log())
+                if pemenang.get((sheet_name, versi + 1), ("",))[0] == token:
+                    return versi + 1, token
+                if expected_version is not None:
+                    raise VersionConflict(f"{sheet_name}: klaim versi {versi + 1} didahului penulis lain")
+            if time.monotonic() > batas_tunggu:
+                raise VersionConflict(f"{sheet_name}: versi {versi} masih ditulis penulis lain")
+            time.sleep(random.uniform(0.2, 0.5) if aktif else random.uniform(0, 0.05))
+
+    def _pastikan_klaim(self, sheet_name, versi, token):
+        """Cek ulang sebelum operasi destruktif: klaim masih milik token ini, belum kedaluwarsa, dan belum dilampaui."""
+        versi_log, token_log, _, aktif = self._status(sheet_name)
+        if (versi_log, token_log) != (versi, token) or not aktif:
+            raise VersionConflict(f"{sheet_name}: lease versi {versi} sudah kedaluwarsa atau diambil penulis lain")
+
+    def _lepas_klaim(self, sheet_name, versi, token):
+        self._worksheet(VERSION_SHEET).append_rows(
+            [[sheet_name, versi, time.strftime("%Y-%m-%d %H:%M:%S"), token, 0, "lepas"]], value_input_option="RAW"
+        )
+
+    @contextmanager
+    def _klaim(self, sheet_name, expected_version=None, tunggu=TUNGGU_LEASE):
+        """Lease penulisan satu sheet; selalu dilepas, juga bila penulisan gagal di tengah."""
+        versi, token = self._klaim_versi(sheet_name, expected_version, tunggu)
+        try:
+            yield versi, token
+        finally:
+            self._lepas_klaim(sheet_name, versi, token)
+        if sheet_name != VERSION_SHEET and self._panjang_log > BATAS_LOG:
+            try:
+                self._rapikan_log()
+            except (VersionConflict, gspread.exceptions.APIError):
+                # Perapian bersifat oportunistik (mis. proses lain sedang merapikan); penulisan tetap berhasil
+                pass
+
+    def _rapikan_log(self):
+        """
+        Menghapus baris log lama dari atas (di bawah lease milik `_VERSI` sendiri, jadi hanya satu perapi).
+        Klaim terakhir tiap sheet yang ikut terhapus lebih dulu di-append ulang sebagai baris 'bawa'.
+        Penulis lain hanya meng-append di ujung, sehingga baris yang dihapus tetap sama dengan yang dibaca.
+        """
+        with self._klaim(VERSION_SHEET, tunggu=0):
+            ws = self._worksheet(VERSION_SHEET)
+            nilai = self._baca_log()
+            n_hapus = len(nilai) - SISA_LOG
+            if n_hapus <= 0:
+                return
+            semua = _status_versi(*_log_klaim(nilai))
+            sisa = _status_versi(*_log_klaim(nilai[n_hapus:]))
+            bawa = [
+                [sheet, versi, time.strftime("%Y-%m-%d %H:%M:%S"), token, lease if aktif else 0, "bawa"]
+                for sheet, (versi, token, lease, aktif) in semua.items()
+                if sisa.get(sheet, (None, None))[:2] != (versi, token)
+            ]
+            if bawa:
+                ws.append_rows(bawa, value_input_option="RAW")
+            ws.delete_rows(1, n_hapus)
+
+    # --- Penulisan ---
+    def _perluas_header(self, ws, header, kolom):
+        """Menambahkan kolom baru di ujung header; hanya baris 1 yang ditulis. Mengembalikan header lengkap."""
+        baru = [k for k in kolom if k not in header]
+        if not baru:
+            return list(header)
+        header = list(header) + baru
+        if len(header) > ws.col_count:
+            ws.add_cols(len(header) - ws.col_count)
+        ws.update(values=[header], range_name="A1", value_input_option="RAW")
+        return header
+
+    def replace(self, sheet_name, df, expected_version=None):
+        ws = self._worksheet(sheet_name, buat=True)
+        with self._lock_tulis, self._klaim(sheet_name, expected_version) as (versi, token):
+            # Cek ulang tepat sebelum clear: lease yang sudah kedaluwarsa tidak boleh menghapus tulisan penulis berikutnya
+            self._pastikan_klaim(sheet_name, versi, token)
+            ws.clear()
+            set_with_dataframe(ws, df, include_index=False)
+
+    def append(self, sheet_name, df):
+        ws = self._worksheet(sheet_name, buat=True)
+        # append_rows atomik di sisi Google; lease menjaga header dan urutan versi
+        with self._lock_tulis, self._klaim(sheet_name):
+            header = self._perluas_header(ws, ws.row_values(1), df.columns)
+            ws.append_rows(_baris_sheet(df, header), value_input_option="USER_ENTERED")
+
+    def upsert(self, sheet_name, df, keys):
+        if not keys:
+            self.append(sheet_name, df)
+            return
+        self._dengan_retry(lambda: self._upsert_per_baris(sheet_name, df, keys))
+
+    def _upsert_per_baris(self, sheet_name, df, keys):
+        """Upsert tingkat baris: baris dengan kunci lama ditimpa di tempat, kunci baru di-append."""
+        ws = self._worksheet(sheet_name, buat=True)
+        # Dibaca di bawah lease: posisi baris tetap valid sampai penulisan selesai
+        with self._lock_tulis, self._klaim(sheet_name):
+            nilai = ws.get_all_values()
+            df_existing = pd.DataFrame(nilai[1:], columns=nilai[0]) if nilai else pd.DataFrame()
+            header = self._perluas_header(ws, nilai[0] if nilai else [], df.columns)
+            posisi = dict(zip(_kunci_baris(df_existing, keys), range(2, len(nilai) + 1)))
+            update, tambah = [], []
+            for kunci, baris in zip(_kunci_baris(df, keys), _baris_sheet(df, header)):
+                if kunci in posisi:
+                    update.append({"range": f"A{posisi[kunci]}", "values": [baris]})
+                else:
+                    tambah.append(baris)
+            if update:
+                ws.batch_update(update, value_input_option="USER_ENTERED")
+            if tambah:
+                ws.append_rows(tambah, value_input_option="USER_ENTERED")
+
+
+# ===========================
+# Google Sheets Tiruan (In-Memory)
+# ===========================
+class FakeWorksheet:
+    """Worksheet tiruan yang meniru perilaku gspread.Worksheet (nilai disimpan sebagai teks)."""
+
+    def __init__(self, title, latency=0.0, rows=1000, cols=26):
+        self.title = title
+        self.latency = latency
+        self.row_count = rows
+        self.col_count = cols
+        self.api_calls = 0
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def _panggil_api(self, n_bytes=0):
+        # Setiap panggilan dihitung dan diberi jeda seperti request HTTP sungguhan
+        self.api_calls += 1
+        catat_api(n_bytes)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _ukuran(self):
+        return sum(len(nilai) for nilai in self._cells.values())
+
+    def _grid(self):
+        if not self._cells:
+            return []
+        n_baris = max(r for r, _ in self._cells)
+        n_kolom = max(c for _, c in self._cells)
+        grid = [[""] * n_kolom for _ in range(n_baris)]
+        for (r, c), nilai in self._cells.items():
+            grid[r - 1][c - 1] = nilai
+        # Sheets memotong kolom kosong di ujung setiap baris
+        for baris in grid:
+            while baris and baris[-1] == "":
+                baris.pop()
+        return grid
+
+    def get_all_values(self):
+        with self._lock:
+            self._panggil_api(self._ukuran())
+            grid = self._grid()
+        # gspread mengisi baris pendek dengan "" agar berbentuk persegi (pad_values=True)
+        lebar = max((len(baris) for baris in grid), default=0)
+        return [baris + [""] * (lebar - len(baris)) for baris in grid]
+
+    def get_all_records(self, head=1, default_blank=""):
+        with self._lock:
+            self._panggil_api(self._ukuran())
+            grid = self._grid()
+        if len(grid) < head:
+            return []
+        header = grid[head - 1]
+        records = []
+        for baris in grid[head:]:
+            baris = baris + [""] * (len(header) - len(baris))
+            nilai = numericise_all(baris[:len(header)], default_blank=default_blank)
+            records.append(dict(zip(header, nilai)))
+        return records
+
+    def row_values(self, row):
+        with self._lock:
+            self._panggil_api()
+            grid = self._grid()
+        return grid[row - 1] if len(grid) >= row else []
+
+    def clear(self):
+        with self._lock:
+            self._panggil_api()
+            self._cells.clear()
+
+    def resize(self, rows=None, cols=None):
+        with self._lock:
+            self._panggil_api()
+            if rows is not None:
+                self.row_count = rows
+            if cols is not None:
+                self.col_count = cols
+
+    def add_cols(self, cols):
+        with self._lock:
+            self._panggil_api()
+            self.col_count += cols
+
+    def delete_rows(self, start_index, end_index=None):
+        akhir = start_index if end_index is None else end_index
+        with self._lock:
+            self._panggil_api()
+            n = akhir - start_index + 1
+            self._cells = {
+                (r - n if r > akhir else r, c): nilai
+                for (r, c), nilai in self._cells.items() if not start_index <= r <= akhir
+            }
+
+    def update_cells(self, cell_list, value_input_option=None):
+        with self._lock:
+            self._panggil_api(sum(len(str(cell.value)) for cell in cell_list))
+            for cell in cell_list:
+                self._set(cell.row, cell.col, cell.value)
+
+    def update(self, values, range_name="A1", value_input_option=None):
+        with self._lock:
+            self._panggil_api(sum(len(str(nilai)) for baris in values for nilai in baris))
+            self._tulis_blok(range_name, values)
+
+    def batch_update(self, data, value_input_option=None):
+        with self._lock:
+            self._panggil_api(sum(len(str(nilai)) for blok in data for baris in blok["values"] for nilai in baris))
+            for blok in data:
+                self._tulis_blok(blok["range"], blok["values"])
+
+    def _tulis_blok(self, range_name, values):
+        baris_awal, kolom_awal = a1_to_rowcol(range_name.split(":")[0])
+        for i, baris in enumerate(values):
+            for j, nilai in enumerate(baris):
+                self._set(baris_awal + i, kolom_awal + j, nilai)
+
+    def append_rows(self, values, value_input_option=None):
+        with self._lock:
+            self._panggil_api(sum(len(str(nilai)) for baris in values for nilai in baris))
+            mulai = max((r for r, _ in self._cells), default=0) + 1
+            for i, baris in enumerate(values):
+                for j, nilai in enumerate(baris):
+                    self._set(mulai + i, j + 1, nilai)
+            self.row_count = max(self.row_count, mulai + len(values) - 1)
+
+    def _set(self, row, col, value):
+        teks = "" if value is None else str(value)
+        if teks == "":
+            self._cells.pop((row, col), None)
+        else:
+            self._cells[(row, col)] = teks
+
+
+class FakeSpreadsheet:
+    """Spreadsheet tiruan: kumpulan FakeWorksheet berdasarkan nama."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self._worksheets = {}
+
+    def worksheet(self, title):
+        if self.latency:
+            time.sleep(self.latency)
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title, rows=1000, cols=26):
+        ws = FakeWorksheet(title, latency=self.latency, rows=rows, cols=cols)
+        self._worksheets[title] = ws
+        return ws
+
+
+class FakeSheetsClient:
+    """Client tiruan yang meniru `gspread.Client.open_by_key`."""
+
+    def __init__(self, latency=0.0, sheet_names=()):
+        self.latency = latency
+        self._spreadsheets = {}
+        self._sheet_names = tuple(sheet_names)
+
+    def open_by_key(self, key):
+        if self.latency:
+            time.sleep(self.latency)
+        if key not in self._spreadsheets:
+            ss = FakeSpreadsheet(self.latency)
+            for nama in self._sheet_names:
+                ss.add_worksheet(nama)
+            self._spreadsheets[key] = ss
+        return self._spreadsheets[key]
+
+
+class FakeSheetsBackend(GSheetsBackend):
+    """Backend Google Sheets tiruan di memori, dengan latency per panggilan API (untuk test/benchmark)."""
+
+    def __init__(self, latency=0.0, sheet_names=("Sheet1", "CATATAN_HARIAN"), spreadsheet_id="fake-spreadsheet"):
+        super().__init__(FakeSheetsClient(latency, sheet_names), spreadsheet_id)
+
+    @property
+    def api_calls(self):
+        ss = self.client.open_by_key(self.spreadsheet_id)
+        return sum(ws.api_calls for ws in ss._worksheets.values())
+
+
+# ===========================
+# Backend SQLite Lokal
+# ===========================
+def _kutip(nama):
+    return '"' + str(nama).replace('"', '""') + '"'
+
+
+class SQLiteBackend(StorageBackend):
+    """Backend SQLite lokal: satu tabel per sheet, upsert dan range query dijalankan di SQL.
+
+    Setiap penulisan berjalan dalam satu transaksi (BEGIN IMMEDIATE) bersama
+    kenaikan versi di tabel `_versi`, sehingga upsert/append dari banyak
+    operator aman dijalankan bersamaan tanpa kehilangan baris.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.key = f"sqlite:{path}"
+
+    @contextmanager
+    def _connect(self, tulis=False):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            if not tulis:
+                yield con
+                return
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        finally:
+            con.close()
+
+    def _kolom_tabel(self, con, sheet_name):
+        return [baris[1] for baris in con.execute(f"PRAGMA table_info({_kutip(sheet_name)})")]
+
+    def _siapkan_tabel(self, con, sheet_name, df):
+        """Membuat tabel jika belum ada dan menambah kolom baru (ALTER TABLE) bila perlu."""
+        kolom = self._kolom_tabel(con, sheet_name)
+        if not kolom:
+            con.execute(pd.io.sql.get_schema(df, sheet_name))
+            return
+        for nama in df.columns:
+            if nama not in kolom:
+                con.execute(f"ALTER TABLE {_kutip(sheet_name)} ADD COLUMN {_kutip(nama)}")
+
+    def _tulis_baris(self, con, sheet_name, df):
+        if df.empty:
+            return
+        kolom = ", ".join(_kutip(k) for k in df.columns)
+        tanda = ", ".join("?" for _ in df.columns)
+        rows = df.astype(object)
+        rows = rows.where(rows.notna(), None)
+        con.executemany(f"INSERT INTO {_kutip(sheet_name)} ({kolom}) VALUES ({tanda})", rows.values.tolist())
+
+    def _naikkan_versi(self, con, sheet_name, expected_version=None):
+        con.execute("CREATE TABLE IF NOT EXISTS _versi (sheet TEXT PRIMARY KEY, versi INTEGER NOT NULL)")
+        baris = con.execute("SELECT versi FROM _versi WHERE sheet = ?", (sheet_name,)).fetchone()
+        versi = baris[0] if baris else 0
+        if expected_version is not None and versi != expected_version:
+            raise VersionConflict(f"{sheet_name}: versi {versi}, diharapkan {expected_version}")
+        con.execute("INSERT OR REPLACE INTO _versi (sheet, versi) VALUES (?, ?)", (sheet_name, versi + 1))
+        return versi + 1
+
+    def version(self, sheet_name):
+        with self._connect() as con:
+            try:
+                baris = con.execute("SELECT versi FROM _versi WHERE sheet = ?", (sheet_name,)).fetchone()
+            except sqlite3.OperationalError:
+                return 0
+            return baris[0] if baris else 0
+
+    def load(self, sheet_name):
+        with self._connect() as con:
+            if not self._kolom_tabel(con, sheet_name):
+                return pd.DataFrame()
+            return pd.read_sql_query(f"SELECT * FROM {_kutip(sheet_name)} ORDER BY rowid", con)
+
+    def load_versioned(self, sheet_name):
+        # Baca data dan versi dalam satu snapshot transaksi
+        with self._connect() as con:
+            con.execute("BEGIN")
+            try:
+                kolom = self._kolom_tabel(con, sheet_name)
+                df = pd.read_sql_query(f"SELECT * FROM {_kutip(sheet_name)} ORDER BY rowid", con) if kolom else pd.DataFrame()
+                try:
+                    baris = con.execute("SELECT versi FROM _versi WHERE sheet = ?", (sheet_name,)).fetchone()
+                except sqlite3.OperationalError:
+                    baris = None
+            finally:
+                con.execute("COMMIT")
+        return df, (baris[0] if baris else 0)
+
+    def replace(self, sheet_name, df, expected_version=None):
+        with self._connect(tulis=True) as con:
+            self._naikkan_versi(con, sheet_name, expected_version)
+            con.execute(f"DROP TABLE IF EXISTS {_kutip(sheet_name)}")
+            self._siapkan_tabel(con, sheet_name, df)
+            self._tulis_baris(con, sheet_name, df)
+
+    def append(self, sheet_name, df):
+        with self._connect(tulis=True) as con:
+            self._naikkan_versi(con, sheet_name)
+            self._siapkan_tabel(con, sheet_name, df)
+            self._tulis_baris(con, sheet_name, df)
+
+    def upsert(self, sheet_name, df, keys):
+        if not keys:
+            self.append(sheet_name, df)
+            return
+        with self._connect(tulis=True) as con:
+            self._naikkan_versi(con, sheet_name)
+            self._siapkan_tabel(con, sheet_name, df)
+            # Kunci dicocokkan persis seperti merge_rows (_kunci_baris menormalkan kolom TANGGAL*), agar
+            # "2024-01-05", Timestamp, dan "2024-01-05 00:00:00" tetap dianggap baris yang sama
+            lama = pd.read_sql_query(
+                f"SELECT rowid AS _rowid, {', '.join(_kutip(k) for k in keys)} FROM {_kutip(sheet_name)}", con
+            )
+            hapus = lama.loc[_kunci_baris(lama, keys).isin(_kunci_baris(df, keys)), "_rowid"]
+            con.executemany(f"DELETE FROM {_kutip(sheet_name)} WHERE rowid = ?", [(int(r),) for r in hapus])
+            self._tulis_baris(con, sheet_name, df)
+
+    def query_range(self, sheet_name, column, start, end):
+        awal = pd.Timestamp(start).strftime("%Y-%m-%d")
+        akhir = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        with self._connect() as con:
+            kolom = self._kolom_tabel(con, sheet_name)
+            if column not in kolom:
+                return pd.DataFrame(columns=kolom)
+            return pd.read_sql_query(
+                f"SELECT * FROM {_kutip(sheet_name)} WHERE {_kutip(column)} >= ? AND {_kutip(column)} < ? ORDER BY rowid",
+                con,
+                params=(awal, akhir),
+            )
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from rules import KANAL_TV
+
+
+# ===========================
+# Jadwal Sun Outage (Ephemeris Matahari, Offline)
+# ===========================
+# Lokasi stasiun pemancar (Telanaipura, Jambi) dan satelit penerima feed (Telkom-4, 108° BT)
+LINTANG = -1.6101
+BUJUR = 103.6131
+SATELIT_BUJUR = 108.0
+DIAMETER_ANTENA = 2.4  # meter
+FREKUENSI_GHZ = 4.0  # downlink C-band
+ZONA_WAKTU_JAM = 7  # WIB; DATETIME metering dicatat dalam waktu lokal
+SEMI_DIAMETER_MATAHARI = 0.25  # derajat
+RADIUS_BUMI_KM = 6378.137
+RADIUS_GEO_KM = 42164.0
+# Bacaan slot dianggap terdampak bila jendela outage jatuh dalam setengah slot (2 jam) dari waktu bacaan
+TOLERANSI_BACAAN = pd.Timedelta(hours=2)
+
+
+def lebar_beam(diameter_antena=DIAMETER_ANTENA, frekuensi_ghz=FREKUENSI_GHZ):
+    """Lebar beam 3 dB antena parabola (derajat): ~70 * lambda / D."""
+    return 70 * (0.299792458 / frekuensi_ghz) / diameter_antena
+
+
+def _enu_matahari(waktu_utc, lintang, bujur):
+    """
+    Vektor satuan arah matahari (East, North, Up) untuk array waktu UTC.
+    Algoritma ephemeris ringkas (Astronomical Almanac, akurasi ~0.01°) yang cukup untuk jendela outage.
+    """
+    n = (waktu_utc - np.datetime64("2000-01-01T12:00", "ns")) / np.timedelta64(1, "D")
+    L = np.radians((280.460 + 0.9856474 * n) % 360)
+    g = np.radians((357.528 + 0.9856003 * n) % 360)
+    bujur_ekliptika = L + np.radians(1.915) * np.sin(g) + np.radians(0.020) * np.sin(2 * g)
+    kemiringan = np.radians(23.439 - 0.0000004 * n)
+    asensio = np.arctan2(np.cos(kemiringan) * np.sin(bujur_ekliptika), np.cos(bujur_ekliptika))
+    deklinasi = np.arcsin(np.sin(kemiringan) * np.sin(bujur_ekliptika))
+    gmst = np.radians((280.46061837 + 360.98564736629 * n) % 360)
+    sudut_jam = gmst + np.radians(bujur) - asensio
+    phi = np.radians(lintang)
+    timur = -np.cos(deklinasi) * np.sin(sudut_jam)
+    utara = np.cos(phi) * np.sin(deklinasi) - np.sin(phi) * np.cos(deklinasi) * np.cos(sudut_jam)
+    atas = np.sin(phi) * np.sin(deklinasi) + np.cos(phi) * np.cos(deklinasi) * np.cos(sudut_jam)
+    return np.column_stack([timur, utara, atas])
+
+
+def _enu_satelit(lintang, bujur, satelit_bujur):
+    """Vektor satuan arah satelit geostasioner dari lokasi stasiun (ENU)."""
+    phi, lam, lam_sat = np.radians(lintang), np.radians(bujur), np.radians(satelit_bujur)
+    stasiun = RADIUS_BUMI_KM * np.array([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+    satelit = RADIUS_GEO_KM * np.array([np.cos(lam_sat), np.sin(lam_sat), 0.0])
+    dx, dy, dz = satelit - stasiun
+    enu = np.array([
+        -np.sin(lam) * dx + np.cos(lam) * dy,
+        -np.sin(phi) * np.cos(lam) * dx - np.sin(phi) * np.sin(lam) * dy + np.cos(phi) * dz,
+        np.cos(phi) * np.cos(lam) * dx + np.cos(phi) * np.sin(lam) * dy + np.sin(phi) * dz,
+    ])
+    return enu / np.linalg.norm(enu)
+
+
+def jadwal_sun_outage(tahun, lintang=LINTANG, bujur=BUJUR, satelit_bujur=SATELIT_BUJUR,
+                      diameter_antena=DIAMETER_ANTENA, frekuensi_ghz=FREKUENSI_GHZ, resolusi_menit=1):
+    """
+    Jendela sun outage satu tahun (waktu lokal): menit-menit saat jarak sudut matahari-satelit
+    <= setengah lebar beam + semi-diameter matahari, digabung per kejadian harian.
+    Seluruh tahun dihitung sekaligus sebagai array (~525 ribu titik per menit).
+    """
+    kolom = ["Tanggal", "Mulai", "Selesai", "Puncak", "Durasi (menit)", "Separasi Min (°)"]
+    zona = np.timedelta64(ZONA_WAKTU_JAM, "h")
+    awal = np.datetime64(f"{int(tahun)}-01-01T00:00", "ns") - zona
+    akhir = np.datetime64(f"{int(tahun) + 1}-01-01T00:00", "ns") - zona
+    waktu = np.arange(awal, akhir, np.timedelta64(int(resolusi_menit), "m"))
+    separasi = np.degrees(np.arccos(np.clip(
+        _enu_matahari(waktu, lintang, bujur) @ _enu_satelit(lintang, bujur, satelit_bujur), -1.0, 1.0)))
+    ambang = lebar_beam(diameter_antena, frekuensi_ghz) / 2 + SEMI_DIAMETER_MATAHARI
+    kena = np.flatnonzero(separasi <= ambang)
+    if len(kena) == 0:
+        return pd.DataFrame(columns=kolom)
+    nomor = np.cumsum(np.concatenate(([True], np.diff(kena) > 1)))
+    df = pd.DataFrame({"kejadian": nomor, "waktu": waktu[kena] + zona, "separasi": separasi[kena]})
+    kejadian = df.groupby("kejadian")
+    puncak = df.loc[kejadian["separasi"].idxmin()].set_index("kejadian")
+    hasil = pd.DataFrame({
+        "Mulai": kejadian["waktu"].min(),
+        "Selesai": kejadian["waktu"].max() + pd.Timedelta(minutes=int(resolusi_menit)),
+        "Puncak": puncak["waktu"],
+        "Separasi Min (°)": puncak["separasi"].round(3),
+    })
+    hasil["Tanggal"] = hasil["Mulai"].dt.normalize()
+    hasil["Durasi (menit)"] = ((hasil["Selesai"] - hasil["Mulai"]) / pd.Timedelta(minutes=1)).astype(int)
+    return hasil[kolom].reset_index(drop=True)
+
+
+def dalam_jendela(waktu, jadwal, toleransi=TOLERANSI_BACAAN):
+    """Penanda (array bool) waktu bacaan yang berjarak <= toleransi dari salah satu jendela outage."""
+    waktu = np.asarray(waktu, dtype="datetime64[ns]")
+    if jadwal.empty or len(waktu) == 0:
+        return np.zeros(len(waktu), dtype=bool)
+    mulai = jadwal["Mulai"].to_numpy(dtype="datetime64[ns]")
+    selesai = jadwal["Selesai"].to_numpy(dtype="datetime64[ns]")
+    toleransi = np.timedelta64(toleransi)
+    # Jendela terakhir yang dimulai sebelum waktu + toleransi; cocok bila belum selesai sebelum waktu - toleransi
+    indeks = np.searchsorted(mulai, waktu + toleransi, "right") - 1
+    aman = np.clip(indeks, 0, None)
+    return (indeks >= 0) & (selesai[aman] >= waktu - toleransi)
+
+
+def trouble_saat_outage(df, jadwal, toleransi=TOLERANSI_BACAAN):
+    """Bacaan metering dengan bitrate Trouble yang bertepatan dengan jendela sun outage."""
+    kolom = ["Waktu", "Kanal Trouble"]
+    if df.empty or "DATETIME" not in df.columns:
+        return pd.DataFrame(columns=kolom)
+    kolom_status = {kanal: f"STATUS {bitrate}" for kanal, bitrate in KANAL_TV.items() if f"STATUS {bitrate}" in df.columns}
+    if not kolom_status:
+        return pd.DataFrame(columns=kolom)
+    # DATETIME bisa berupa teks (baris yang baru disimpan) atau datetime (snapshot yang sudah disiapkan)
+    waktu = pd.to_datetime(df["DATETIME"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    trouble = df[list(kolom_status.values())].to_numpy() == "Trouble"
+    kena = trouble.any(axis=1) & dalam_jendela(waktu, jadwal, toleransi)
+    nama_kanal = np.array(list(kolom_status))
+    return pd.DataFrame({
+        "Waktu": waktu[kena],
+        "Kanal Trouble": [", ".join(nama_kanal[baris]) for baris in trouble[kena]],
+    }, columns=kolom)
@@ -0,0 +1,91 @@
+import pandas as pd
+
+from arsip import SHEET_MANIFEST, ArsipBackend, PartisiSheet
+from penilaian_ulang import KOLOM_VERSI, nilai_ulang_arsip
+from processing import tambah_kolom_turunan
+from rules import VERSI_RULES, batas_rules
+from storage import FakeSheetsBackend
+
+KUNCI = ["TANGGAL", "WAKTU"]
+
+
+def _metering(awal, hari, power=10500):
+    tanggal = pd.date_range(awal, periods=hari, freq="D")
+    return pd.DataFrame({
+        "TANGGAL": tanggal.strftime("%Y-%m-%d"),
+        "WAKTU": "08:00",
+        "POWER OUTPUT (WATT)": power,
+    })
+
+
+def _arsip_empat_bulan():
+    """Januari-April 2024 di sheet hot, lalu Januari & Februari dipindah ke partisi arsip."""
+    backend = FakeSheetsBackend(sheet_names=("Sheet1",))
+    backend.replace("Sheet1", tambah_kolom_turunan(_metering("2024-01-01", 121)))
+    storage = ArsipBackend(backend, PartisiSheet(backend), ["Sheet1"], bulan_aktif=2)
+    assert storage.arsipkan("Sheet1", sekarang=pd.Timestamp("2024-04-15")) == ["2024-01", "2024-02"]
+    return backend, storage
+
+
+def test_arsip_query_lintas_batas_dan_koreksi_ke_partisi():
+    backend, storage = _arsip_empat_bulan()
+    hot = storage.load("Sheet1")
+    assert pd.to_datetime(hot["TANGGAL"]).min() == pd.Timestamp("2024-03-01")
+    assert storage.manifest("Sheet1")[["BULAN", "BARIS"]].values.tolist() == [["2024-01", 31], ["2024-02", 29]]
+
+    # Rentang melewati batas arsip/hot: partisi Februari + hot Maret, tanpa baris ganda
+    df = storage.query_range("Sheet1", "TANGGAL", "2024-02-25", "2024-03-05")
+    assert sorted(df["TANGGAL"]) == [f"2024-02-{h}" for h in range(25, 30)] + [f"2024-03-0{h}" for h in range(1, 6)]
+
+    # Koreksi bacaan Februari masuk ke partisinya, bukan ke sheet hot
+    koreksi = tambah_kolom_turunan(_metering("2024-02-10", 1, power=9000))
+    storage.upsert("Sheet1", koreksi, KUNCI)
+    assert len(storage.load("Sheet1")) == len(hot)
+    februari = storage.partisi.baca("Sheet1", "2024-02")
+    assert len(februari) == 29
+    baris = februari[februari["TANGGAL"] == "2024-02-10"]
+    assert baris["POWER OUTPUT (WATT)"].tolist() == [9000]
+
+
+def test_manifest_berformat_lokal_tetap_dikenali():
+    backend, storage = _arsip_empat_bulan()
+    # Sheets (USER_ENTERED) mengembalikan BULAN/MULAI/AKHIR sebagai tanggal berformat lokal
+    backend.replace(SHEET_MANIFEST, pd.DataFrame({
+        "SHEET": ["Sheet1", "Sheet1"],
+        "BULAN": ["1/2/2024", "1/1/2024"],
+        "MULAI": ["1/2/2024", "1/1/2024"],
+        "AKHIR": ["29/2/2024", "31/1/2024"],
+        "BARIS": [29, 31],
+    }))
+    storage.lupakan_manifest()
+
+    manifest = storage.manifest("Sheet1")
+    assert manifest["BULAN"].tolist() == ["2024-01", "2024-02"]
+    assert manifest["MULAI"].tolist() == ["2024-01-01", "2024-02-01"]
+    assert storage.awal_hot("Sheet1") == pd.Timestamp("2024-03-01")
+    assert len(storage.query_range("Sheet1", "TANGGAL", "2024-01-01", "2024-04-30")) == 121
+
+    # Koreksi tetap diarahkan ke partisi; manifest ditulis ulang dalam format baku tanpa baris ganda
+    storage.upsert("Sheet1", tambah_kolom_turunan(_metering("2024-01-05", 1, power=9000)), KUNCI)
+    assert len(storage.load("Sheet1")) == 61
+    tersimpan = backend.load(SHEET_MANIFEST)
+    assert sorted(tersimpan["BULAN"].astype(str)) == ["2024-01", "2024-02"]
+
+
+def test_nilai_ulang_mencakup_partisi_arsip():
+    backend, storage = _arsip_empat_bulan()
+    # Partisi Januari dinilai dengan versi rules yang tidak dikenal
+    januari = storage.partisi.baca("Sheet1", "2024-01").assign(**{
+        KOLOM_VERSI: "r-lama", "STATUS POWER OUTPUT (WATT)": "Trouble", "STATUS TERBURUK": "Trouble",
+    })
+    storage.partisi.tulis("Sheet1", "2024-01", januari)
+
+    jumlah, ringkasan = nilai_ulang_arsip(storage, "Sheet1", {VERSI_RULES: batas_rules()})
+    assert jumlah == 31
+    januari = storage.partisi.baca("Sheet1", "2024-01")
+    assert len(januari) == 31
+    assert (januari[KOLOM_VERSI] == VERSI_RULES).all()
+    assert (januari["STATUS POWER OUTPUT (WATT)"] == "Normal").all()
+    assert ringkasan.set_index("Kolom").loc["POWER OUTPUT (WATT)", "Status Berubah"] == 31
+    # Partisi yang sudah memakai versi berlaku tidak ditulis ulang
+    assert nilai_ulang_arsip(storage, "Sheet1", {VERSI_RULES: batas_rules()})[0] == 0
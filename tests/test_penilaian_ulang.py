@@ -0,0 +1,76 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from gspread.utils import numericise_all
+
+import penilaian_ulang
+import rules
+from penilaian_ulang import KOLOM_VERSI, daftarkan_versi, nilai_ulang
+from processing import URUTAN_STATUS, tambah_kolom_turunan
+from rules import KOLOM_RULES, batas_rules, klasifikasi_data, versi_rules
+from storage import FakeSheetsBackend
+
+KUNCI = ["TANGGAL", "WAKTU"]
+
+
+def _metering(n=60):
+    """Bacaan metering sintetis yang menyebar di sekitar batas status Power Output & VSWR."""
+    acak = np.random.default_rng(7)
+    waktu = pd.date_range("2024-01-01", periods=n, freq="4h")
+    return pd.DataFrame({
+        "TANGGAL": waktu.strftime("%Y-%m-%d"),
+        "WAKTU": waktu.strftime("%H:%M"),
+        "POWER OUTPUT (WATT)": acak.choice([7500, 8500, 9500, 9999, 10500, 11000, 11900, 12500], n),
+        "VSWR": acak.choice([1.05, 1.2, 1.3, 1.45, 1.6, 2.0], n),
+    })
+
+
+def _ganti_rules(monkeypatch):
+    """Batas Normal Power Output dinaikkan ke 11000 W (rentang 10000-10999 jadi Warning)."""
+    baru = copy.deepcopy(rules.rules_param)
+    daftar = baru["Power Output (Watt)"]
+    daftar[0]["min"], daftar[1]["max"] = 11000, 10999
+    monkeypatch.setattr(rules, "rules_param", baru)
+    versi = versi_rules(batas_rules(baru))
+    monkeypatch.setattr(rules, "VERSI_RULES", versi)
+    monkeypatch.setattr(penilaian_ulang, "VERSI_RULES", versi)
+    return versi
+
+
+def test_versi_rules_tetap_teks_di_sheets():
+    for batas in ({}, batas_rules()):
+        versi = versi_rules(batas)
+        assert versi.startswith("r")
+        assert numericise_all([versi]) == [versi]
+
+
+def test_nilai_ulang_sama_dengan_klasifikasi_penuh(monkeypatch):
+    backend = FakeSheetsBackend()
+    backend.replace("Sheet1", tambah_kolom_turunan(_metering()))
+    versi_lama = rules.VERSI_RULES
+    daftarkan_versi(backend)
+
+    versi_baru = _ganti_rules(monkeypatch)
+    arsip = daftarkan_versi(backend)
+    assert set(arsip) == {versi_lama, versi_baru}
+
+    df_tulis, df_ringkasan = nilai_ulang(backend.load("Sheet1"), arsip)
+    # Semua baris versi lama ditulis dengan versi baru, walaupun statusnya tetap
+    assert len(df_tulis) == 60
+    assert (df_tulis[KOLOM_VERSI] == versi_baru).all()
+    assert df_ringkasan["Kolom"].tolist() == ["POWER OUTPUT (WATT)"]
+    backend.upsert("Sheet1", df_tulis, KUNCI)
+
+    df = backend.load("Sheet1")
+    penuh = klasifikasi_data(df)
+    for kolom in KOLOM_RULES:
+        if kolom in df.columns:
+            assert df[f"STATUS {kolom}"].tolist() == penuh[f"STATUS {kolom}"].tolist()
+    kode = np.stack([pd.Categorical(penuh[f"STATUS {k}"], categories=URUTAN_STATUS).codes
+                     for k in ("POWER OUTPUT (WATT)", "VSWR")]).max(axis=0)
+    assert df["STATUS TERBURUK"].tolist() == list(np.array(URUTAN_STATUS)[kode])
+
+    # Penilaian ulang selesai: versi di sheet seragam, tidak ada lagi yang perlu ditulis
+    assert (df[KOLOM_VERSI].astype(str) == versi_baru).all()
+    assert nilai_ulang(df, arsip)[0].empty
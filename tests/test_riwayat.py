@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from riwayat import JurnalRiwayat, RiwayatBackend, hash_baris
+from storage import FakeSheetsBackend
+
+KUNCI = ["TANGGAL", "WAKTU"]
+
+
+def _riwayat(tmp_path, interval=2):
+    backend = FakeSheetsBackend(sheet_names=("Sheet1",))
+    return backend, RiwayatBackend(backend, JurnalRiwayat(str(tmp_path), interval=interval), {"Sheet1": KUNCI})
+
+
+def _baris(tanggal, power, catatan="ok"):
+    return pd.DataFrame({"TANGGAL": tanggal, "WAKTU": "08:00", "POWER": power, "CATATAN": catatan})
+
+
+def _isi(df):
+    """Isi sheet sebagai multiset hash baris (urutan baris & format angka diabaikan)."""
+    return sorted(hash_baris(df).tolist())
+
+
+def test_hash_baris_angka_bulat_dan_float_sama():
+    bulat = hash_baris(pd.DataFrame({"X": [12, 13], "Y": ["a", "b"]}))
+    dengan_kosong = hash_baris(pd.DataFrame({"X": [12.0, np.nan], "Y": ["a", "b"]}))
+    teks = hash_baris(pd.DataFrame({"X": ["12", "13.0"], "Y": ["a", "b"]}))
+    assert bulat[0] == dengan_kosong[0]
+    assert bulat[1] != dengan_kosong[1]
+    assert (bulat == teks).all()
+    assert hash_baris(pd.DataFrame({"X": [12.5]}))[0] != hash_baris(pd.DataFrame({"X": [12]}))[0]
+
+
+def test_sinkron_sel_kosong_tidak_mencatat_perubahan_palsu(tmp_path):
+    backend, riwayat = _riwayat(tmp_path)
+    riwayat.replace("Sheet1", _baris(pd.date_range("2024-01-01", periods=20).strftime("%Y-%m-%d"), 10000))
+    # Operator menambah baris dengan POWER kosong langsung di Sheets: kolom terbaca sebagai float setelahnya
+    backend.append("Sheet1", _baris(["2024-02-01"], None))
+    riwayat.append("Sheet1", _baris(["2024-02-02"], 10500))
+
+    sinkron = riwayat.riwayat("Sheet1").set_index("Operasi").loc["sinkron"]
+    assert (sinkron["Tambah"], sinkron["Ubah"], sinkron["Hapus"]) == (1, 0, 0)
+
+
+def test_jurnal_checkpoint_dan_rollback(tmp_path):
+    backend, riwayat = _riwayat(tmp_path, interval=2)
+    awal = _baris(["2024-01-01", "2024-01-02", "2024-01-03"], [10000, 10100, 10200])
+    riwayat.replace("Sheet1", awal)
+    riwayat.append("Sheet1", _baris(["2024-01-04"], 10300))
+    riwayat.upsert("Sheet1", _baris(["2024-01-02"], 9000, "koreksi"), KUNCI)
+    riwayat.replace("Sheet1", backend.load("Sheet1").iloc[1:])
+
+    tabel = riwayat.riwayat("Sheet1")
+    assert tabel["Operasi"].tolist() == ["replace", "upsert", "append", "replace", "awal"]
+    assert tabel["Checkpoint"].tolist() == [True, False, True, False, True]
+    terakhir = tabel.iloc[0]
+    assert (terakhir["Tambah"], terakhir["Ubah"], terakhir["Hapus"]) == (0, 0, 1)
+
+    # Versi dibangun ulang dari checkpoint + delta oleh jurnal baru (tanpa cache memori)
+    jurnal = JurnalRiwayat(str(tmp_path), interval=2)
+    assert _isi(jurnal.bangun("Sheet1", 1)) == _isi(awal)
+    versi_3 = jurnal.bangun("Sheet1", 3)
+    assert len(versi_3) == 4
+    assert versi_3.set_index("TANGGAL").loc["2024-01-02", "CATATAN"] == "koreksi"
+    assert _isi(jurnal.bangun("Sheet1", 4)) == _isi(backend.load("Sheet1"))
+
+    # Rollback ke versi 1 mengembalikan isi backend dan tercatat sebagai versi baru
+    riwayat.rollback("Sheet1", 1)
+    assert _isi(backend.load("Sheet1")) == _isi(awal)
+    terbaru = riwayat.riwayat("Sheet1").iloc[0]
+    assert (terbaru["Versi"], terbaru["Operasi"]) == (5, "rollback ke v1")
+    assert (terbaru["Tambah"], terbaru["Ubah"], terbaru["Hapus"]) == (1, 1, 1)
@@ -0,0 +1,45 @@
+import threading
+
+import pandas as pd
+
+from disk_cache import DiskSnapshotCache
+from shared_store import SharedStore
+from storage import SQLiteBackend
+
+
+def test_invalidate_berlaku_di_proses_lain(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "uji.db"))
+    backend.replace("Sheet1", pd.DataFrame({"A": [1]}))
+    # Dua SharedStore dengan folder cache yang sama = dua proses worker di satu mesin
+    proses_1, proses_2 = (
+        SharedStore(backend, parse=lambda df: df, ttl=600, disk=DiskSnapshotCache(str(tmp_path / "cache")))
+        for _ in range(2)
+    )
+    proses_1.get("Sheet1")
+    proses_2.get("Sheet1")
+    assert proses_2.snapshot("Sheet1").umur < 600
+
+    proses_1.invalidate("Sheet1")
+    assert proses_2._sinkron_disk("Sheet1").umur >= 600
+
+
+def test_invalidate_menunggu_file_lock_sheet(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "uji.db"))
+    backend.replace("Sheet1", pd.DataFrame({"A": [1]}))
+    disk = DiskSnapshotCache(str(tmp_path / "cache"))
+    store = SharedStore(backend, parse=lambda df: df, ttl=600, disk=disk)
+    store.get("Sheet1")
+    sebelum = int(disk.meta("Sheet1").get("invalidasi", 0))
+
+    pekerja = threading.Thread(target=store.invalidate, args=("Sheet1",))
+    with disk.kunci("Sheet1"):
+        # Proses lain sedang me-refresh: invalidate harus menunggu, bukan menulis meta di tengahnya
+        pekerja.start()
+        pekerja.join(0.3)
+        assert pekerja.is_alive()
+        disk.tandai_dicek("Sheet1")
+    pekerja.join(5)
+
+    meta = disk.meta("Sheet1")
+    assert meta["dicek"] == 0.0
+    assert int(meta["invalidasi"]) == sebelum + 1
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import storage
+from storage import VERSION_SHEET, FakeSheetsClient, GSheetsBackend, StorageBackend
+
+
+def _backend_bersama(n, latency=0.001, sheets=("Sheet1",)):
+    """n GSheetsBackend (seperti n proses/replika) yang memakai satu spreadsheet tiruan yang sama."""
+    client = FakeSheetsClient(latency, tuple(sheets) + (VERSION_SHEET,))
+    backends = [GSheetsBackend(client, "uji") for _ in range(n)]
+    for backend in backends:
+        backend.max_retries = 100
+    return backends
+
+
+def _jalankan_bersamaan(fungsi, n):
+    mulai = threading.Barrier(n)
+    error = []
+
+    def kerja(i):
+        try:
+            mulai.wait()
+            fungsi(i)
+        except Exception as e:  # dikumpulkan agar gagal di thread utama
+            error.append(e)
+
+    threads = [threading.Thread(target=kerja, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not error, error
+
+
+def test_replace_dengan_versi_tidak_kehilangan_tulisan():
+    backends = _backend_bersama(4, latency=0.005)
+    backends[0].replace("Sheet1", pd.DataFrame({"ID": ["awal"], "NILAI": [0]}))
+
+    def tulis(i):
+        for j in range(2):
+            baris = pd.DataFrame({"ID": [f"w{i}-{j}"], "NILAI": [i * 10 + j]})
+            # Baca-gabung-tulis dengan expected_version, diulang saat VersionConflict
+            StorageBackend._gabung_tulis_ulang(backends[i], "Sheet1", baris, None)
+
+    _jalankan_bersamaan(tulis, 4)
+    df = backends[0].load("Sheet1")
+    assert sorted(df["ID"]) == sorted(["awal"] + [f"w{i}-{j}" for i in range(4) for j in range(2)])
+    assert backends[0].version("Sheet1") == 9
+
+
+def test_upsert_bersamaan_dengan_kolom_baru():
+    backends = _backend_bersama(3)
+    backends[0].upsert("Sheet1", pd.DataFrame({"TANGGAL": ["2024-01-01"], "WAKTU": ["00:00"]}), ["TANGGAL", "WAKTU"])
+
+    def tulis(i):
+        for j in range(7):
+            baris = pd.DataFrame({"TANGGAL": [f"2024-02-{j + 1:02d}"], "WAKTU": [f"{i:02d}:00"], f"KOLOM_{i}": [j]})
+            backends[i].upsert("Sheet1", baris, ["TANGGAL", "WAKTU"])
+
+    _jalankan_bersamaan(tulis, 3)
+    df = backends[0].load("Sheet1")
+    assert len(df) == 22
+    assert {"KOLOM_0", "KOLOM_1", "KOLOM_2"} <= set(df.columns)
+    for i in range(3):
+        milik = (df["WAKTU"] == f"{i:02d}:00") & (df["TANGGAL"] != "2024-01-01")
+        assert (df.loc[milik, f"KOLOM_{i}"] != "").all()
+
+
+def test_append_sheet_baru_tiap_versi_satu_pemenang():
+    backends = _backend_bersama(4, sheets=())
+
+    def tulis(i):
+        for j in range(3):
+            backends[i].append("CATATAN", pd.DataFrame({"ISI": [f"{i}-{j}"]}))
+
+    _jalankan_bersamaan(tulis, 4)
+    assert len(backends[0].load("CATATAN")) == 12
+    assert backends[0].version("CATATAN") == 12
+
+
+def test_log_versi_dirapikan_tanpa_mengubah_versi(monkeypatch):
+    monkeypatch.setattr(storage, "BATAS_LOG", 20)
+    monkeypatch.setattr(storage, "SISA_LOG", 5)
+    backend = _backend_bersama(1, latency=0.0, sheets=("Sheet1", "LAIN"))[0]
+    backend.append("LAIN", pd.DataFrame({"ISI": ["x"]}))
+    for i in range(30):
+        backend.append("Sheet1", pd.DataFrame({"ISI": [str(i)]}))
+    assert len(backend._worksheet(VERSION_SHEET).get_all_values()) <= 20 + 5
+    assert backend.version("Sheet1") == 30
+    assert backend.version("LAIN") == 1
+
+
+def test_lease_kedaluwarsa_tidak_boleh_clear(monkeypatch):
+    monkeypatch.setattr(storage, "LEASE_DETIK", 0.5)
+    backend_a, backend_b = _backend_bersama(2, latency=0.0)
+    versi, token = backend_a._klaim_versi("Sheet1")
+    # A macet melewati lease-nya, lalu B mengklaim versi berikutnya
+    time.sleep(0.6)
+    backend_b.replace("Sheet1", pd.DataFrame({"ID": ["b"]}))
+    with pytest.raises(storage.VersionConflict):
+        backend_a._pastikan_klaim("Sheet1", versi, token)
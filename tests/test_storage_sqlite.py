@@ -0,0 +1,15 @@
+import pandas as pd
+
+from storage import SQLiteBackend, merge_rows
+
+
+def test_upsert_kunci_tanggal_dinormalkan_seperti_merge_rows(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "uji.db"))
+    awal = pd.DataFrame({"TANGGAL": ["2024-01-05", "2024-01-06"], "WAKTU": ["08:00", "08:00"], "V": [1, 2]})
+    baru = pd.DataFrame({"TANGGAL": ["2024-01-05 00:00:00"], "WAKTU": ["08:00"], "V": [3]})
+    backend.append("Sheet1", awal)
+    backend.upsert("Sheet1", baru, ["TANGGAL", "WAKTU"])
+
+    df = backend.load("Sheet1")
+    assert len(df) == len(merge_rows(awal, baru, ["TANGGAL", "WAKTU"])) == 2
+    assert sorted(df["V"]) == [2, 3]
@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rules import ceklist_rules
+
+
+# ===========================
+# Indeks Transisi Kondisi Perangkat Ceklist (MTBF / MTTR)
+# ===========================
+KONDISI_VALID = ["Normal", "Warning", "Trouble"]
+# Kondisi yang dihitung sebagai gangguan; Warning -> Trouble berturut-turut adalah satu gangguan
+KONDISI_GANGGUAN = ["Warning", "Trouble"]
+
+
+def _episode(waktu, kondisi):
+    """Run kondisi berurutan (vektor): daftar episode {Kondisi, Mulai, Terakhir, Cek}."""
+    valid = np.isin(kondisi, KONDISI_VALID)
+    waktu, kondisi = waktu[valid], kondisi[valid]
+    if len(kondisi) == 0:
+        return []
+    awal = np.flatnonzero(np.concatenate(([True], kondisi[1:] != kondisi[:-1])))
+    akhir = np.concatenate((awal[1:], [len(kondisi)])) - 1
+    return [
+        {"Kondisi": kondisi[i], "Mulai": pd.Timestamp(waktu[i]), "Terakhir": pd.Timestamp(waktu[j]),
+         "Selesai": None, "Cek": int(j - i + 1)}
+        for i, j in zip(awal, akhir)
+    ]
+
+
+def _jam(selisih):
+    return selisih / pd.Timedelta(hours=1)
+
+
+class IndeksTransisi:
+    """
+    Per perangkat ceklist: episode kondisi (kapan mulai, kapan berakhir, berapa kali dicek) dari histori CATATAN_HARIAN.
+
+    Catatan baru yang lebih akhir dari catatan terakhir cukup memperpanjang episode berjalan atau menutupnya
+    dan membuka episode baru; histori hanya dipindai ulang bila ada catatan sisipan/ubahan di tengah.
+    """
+
+    def __init__(self, perangkat=None):
+        self.perangkat = list(perangkat or ceklist_rules)
+        self.revisi = None
+        self.terakhir = None
+        self._lock = threading.Lock()
+        self.episode = {p: [] for p in self.perangkat}
+
+    def bangun(self, df, revisi=None):
+        """Membangun ulang indeks dari seluruh catatan."""
+        with self._lock:
+            self.episode = {p: [] for p in self.perangkat}
+            self.terakhir = None
+            self._masukkan(df)
+            self.revisi = revisi
+
+    def perbarui(self, df_baru, revisi=None):
+        """Menambahkan catatan baru; False (indeks tidak berubah) bila ada catatan tidak lebih akhir dari indeks."""
+        with self._lock:
+            if "TANGGAL_WAKTU" in df_baru.columns and self.terakhir is not None:
+                waktu = pd.to_datetime(df_baru["TANGGAL_WAKTU"], errors="coerce")
+                if (waktu <= self.terakhir).any():
+                    return False
+            self._masukkan(df_baru)
+            self.revisi = revisi
+            return True
+
+    def sinkron(self, df, revisi, delta=None):
+        """Menerapkan delta bila revisi tepat satu di depan dan catatannya berurutan; selain itu bangun ulang."""
+        if delta is not None and self.revisi is not None and revisi == self.revisi + 1 and self.perbarui(delta, revisi):
+            return
+        if revisi != self.revisi:
+            self.bangun(df, revisi)
+
+    def _masukkan(self, df):
+        if df.empty or "TANGGAL_WAKTU" not in df.columns:
+            return
+        df = df.assign(TANGGAL_WAKTU=pd.to_datetime(df["TANGGAL_WAKTU"], errors="coerce")).dropna(subset=["TANGGAL_WAKTU"])
+        # Catatan ganda pada shift yang sama: yang terakhir disimpan dipakai
+        df = df.sort_values("TANGGAL_WAKTU", kind="stable").drop_duplicates("TANGGAL_WAKTU", keep="last")
+        if df.empty:
+            return
+        waktu = df["TANGGAL_WAKTU"].to_numpy()
+        for p in self.perangkat:
+            kolom = f"{p}_KONDISI"
+            if kolom not in df.columns:
+                continue
+            riwayat = self.episode[p]
+            for ep in _episode(waktu, df[kolom].astype(str).to_numpy()):
+                if riwayat and riwayat[-1]["Kondisi"] == ep["Kondisi"]:
+                    riwayat[-1]["Terakhir"] = ep["Terakhir"]
+                    riwayat[-1]["Cek"] += ep["Cek"]
+                    continue
+                if riwayat:
+                    riwayat[-1]["Selesai"] = ep["Mulai"]
+                riwayat.append(ep)
+        self.terakhir = pd.Timestamp(waktu[-1])
+
+    def riwayat(self, perangkat):
+        """Episode kondisi satu perangkat (terbaru di atas) dengan durasi dalam jam."""
+        with self._lock:
+            df = pd.DataFrame([dict(ep) for ep in self.episode.get(perangkat, [])],
+                              columns=["Kondisi", "Mulai", "Terakhir", "Selesai", "Cek"])
+        if df.empty:
+            return df.assign(**{"Durasi (jam)": []})
+        selesai = pd.to_datetime(df["Selesai"]).fillna(df["Terakhir"])
+        df["Durasi (jam)"] = _jam(selesai - df["Mulai"]).round(1)
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def statistik(self):
+        """MTBF, MTTR, jumlah gangguan, dan streak kondisi saat ini untuk setiap perangkat."""
+        baris = []
+        with self._lock:
+            for p in self.perangkat:
+                riwayat = self.episode[p]
+                if not riwayat:
+                    continue
+                uptime = pd.Timedelta(0)
+                perbaikan = []
+                gangguan = 0
+                mulai_gangguan = None
+                for ep in riwayat:
+                    selesai = ep["Selesai"] or ep["Terakhir"]
+                    if ep["Kondisi"] in KONDISI_GANGGUAN:
+                        if mulai_gangguan is None:
+                            mulai_gangguan = ep["Mulai"]
+                            gangguan += 1
+                        continue
+                    uptime += selesai - ep["Mulai"]
+                    if mulai_gangguan is not None:
+                        perbaikan.append(ep["Mulai"] - mulai_gangguan)
+                        mulai_gangguan = None
+                kini = riwayat[-1]
+                baris.append({
+                    "Perangkat": p,
+                    "Kondisi Saat Ini": kini["Kondisi"],
+                    "Sejak": kini["Mulai"],
+                    "Streak (cek)": kini["Cek"],
+                    "Streak (hari)": round(_jam(kini["Terakhir"] - kini["Mulai"]) / 24, 1),
+                    "Transisi": len(riwayat) - 1,
+                    "Gangguan": gangguan,
+                    "MTBF (jam)": round(_jam(uptime) / gangguan, 1) if gangguan else None,
+                    "MTTR (jam)": round(_jam(sum(perbaikan, pd.Timedelta(0))) / len(perbaikan), 1) if perbaikan else None,
+                })
+        return pd.DataFrame(baris, columns=[
+            "Perangkat", "Kondisi Saat Ini", "Sejak", "Streak (cek)", "Streak (hari)",
+            "Transisi", "Gangguan", "MTBF (jam)", "MTTR (jam)",
+        ])